@@ -0,0 +1,7 @@
+"""Load tests driven against the real URLconf
+
+The workloads run the shopping journey of the API (browse, add to cart,
+checkout, order status update) over a seeded dataset, either in process
+with the test client or over HTTP through a local WSGI server, and report
+the latency percentiles, throughput and queries of each endpoint.
+"""
@@ -0,0 +1,149 @@
+"""Ways of sending the benchmark requests to the application"""
+
+import json
+from http.client import HTTPConnection, HTTPResponse
+from threading import Thread, local
+from types import TracebackType
+from typing import Any, NamedTuple, Self
+from urllib.parse import urlencode
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+
+from rest_framework.test import APIClient
+
+
+class Result(NamedTuple):
+    """Status, decoded JSON body and query count of a response"""
+
+    status: int
+    body: Any
+    queries: int | None
+
+
+def _decode(content: bytes, content_type: str) -> Any:
+    """Decode a JSON response body, other bodies are dropped"""
+    if content and content_type.startswith("application/json"):
+        return json.loads(content)
+    return None
+
+
+def _queries(header: str | None) -> int | None:
+    """Read the X-DB-Query-Count header sent by QueryCountMiddleware"""
+    return int(header) if header is not None else None
+
+
+class ClientDriver:
+    """Send the requests in process with the test client, no network involved"""
+
+    name: str = "client"
+
+    def __init__(self) -> None:
+        self._local: local = local()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc: BaseException | None,
+        _traceback: TracebackType | None,
+    ) -> None:
+        return None
+
+    def request(
+        self, method: str, path: str, data: Any = None, token: str | None = None
+    ) -> Result:
+        """Send a request, JSON encoded unless it is a GET"""
+        client: APIClient | None = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = APIClient(raise_request_exception=False)
+
+        headers: dict[str, str] = {"HTTP_AUTHORIZATION": f"Token {token}"} if token else {}
+        if method == "GET":
+            response = client.get(path, data, **headers)
+        else:
+            response = getattr(client, method.lower())(path, data, format="json", **headers)
+
+        return Result(
+            response.status_code,
+            _decode(response.content, response.get("Content-Type", "")),
+            _queries(response.get("X-DB-Query-Count")),
+        )
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    """Request handler that does not log every request"""
+
+    def log_message(self, *_args: Any) -> None:
+        return None
+
+
+class WSGIServerDriver:
+    """Send the requests over HTTP to a threaded WSGI server of this process"""
+
+    name: str = "wsgi"
+
+    def __init__(self) -> None:
+        self.server: ThreadedWSGIServer | None = None
+        self.thread: Thread | None = None
+        self.address: tuple[str, int] = ("127.0.0.1", 0)
+
+    def __enter__(self) -> Self:
+        application: WSGIHandler = get_wsgi_application()
+        self.server = ThreadedWSGIServer(self.address, QuietWSGIRequestHandler)
+        self.server.set_app(application)
+        self.address = self.server.server_address[:2]
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc: BaseException | None,
+        _traceback: TracebackType | None,
+    ) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def request(
+        self, method: str, path: str, data: Any = None, token: str | None = None
+    ) -> Result:
+        """Send a request, JSON encoded unless it is a GET"""
+        headers: dict[str, str] = {"Accept": "application/json"}
+        if token:
+            headers["Authorization"] = f"Token {token}"
+
+        body: bytes | None = None
+        if method == "GET":
+            if data:
+                path = f"{path}?{urlencode(data)}"
+        elif data is not None:
+            body = json.dumps(data).encode()
+            headers["Content-Type"] = "application/json"
+
+        connection: HTTPConnection = HTTPConnection(*self.address, timeout=60)
+        try:
+            connection.request(method, path, body, headers)
+            response: HTTPResponse = connection.getresponse()
+            content: bytes = response.read()
+        finally:
+            connection.close()
+
+        return Result(
+            response.status,
+            _decode(content, response.getheader("Content-Type", "")),
+            _queries(response.getheader("X-DB-Query-Count")),
+        )
+
+
+DRIVERS: dict[str, type[ClientDriver] | type[WSGIServerDriver]] = {
+    ClientDriver.name: ClientDriver,
+    WSGIServerDriver.name: WSGIServerDriver,
+}
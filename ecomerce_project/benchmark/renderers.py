@@ -0,0 +1,80 @@
+"""Encoding and decoding time of the JSON renderers on real payloads"""
+
+import io
+from time import perf_counter
+from typing import Any, Callable
+
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from ecomerce_project.renderers import FastJSONParser, FastJSONRenderer
+from products.models import Product
+from products.serializers import ProductSerializer
+from users.models import User
+from users.serializers import UserSerializer
+
+# (renderer, parser) of each implementation compared
+IMPLEMENTATIONS: dict[str, tuple[type[BaseRenderer], type[BaseParser]]] = {
+    "stock": (JSONRenderer, JSONParser),
+    "fast": (FastJSONRenderer, FastJSONParser),
+}
+
+
+def product_list_payload(page_size: int) -> dict[str, Any]:
+    """Return a page of the products list as ProductListView sends it"""
+    products = Product.objects.select_related("category").order_by("pk")[:page_size]
+    return {
+        "next": "http://testserver/products/?cursor=cD0xMDA%3D",
+        "previous": None,
+        "results": ProductSerializer(products, many=True).data,
+    }
+
+
+def user_list_payload(count: int) -> list[Any]:
+    """Return count users as UserListView sends them"""
+    users = (
+        User.objects.select_related("address")
+        .prefetch_related("groups", "user_permissions")
+        .order_by("pk")[:count]
+    )
+    return UserSerializer(users, many=True).data
+
+
+def _best(function: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest of repeat calls, in milliseconds"""
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return min(timings) * 1000
+
+
+def time_payload(payload: Any, repeat: int) -> dict[str, dict[str, float]]:
+    """Return the render and parse times, and the size, of each implementation"""
+    results: dict[str, dict[str, float]] = {}
+    for name, (renderer_class, parser_class) in IMPLEMENTATIONS.items():
+        renderer: BaseRenderer = renderer_class()
+        parser: BaseParser = parser_class()
+        rendered: bytes = renderer.render(payload)
+        results[name] = {
+            "render_ms": round(_best(lambda: renderer.render(payload), repeat), 3),
+            "parse_ms": round(
+                _best(lambda: parser.parse(io.BytesIO(rendered)), repeat), 3
+            ),
+            "bytes": len(rendered),
+        }
+    return results
+
+
+def format_timings(name: str, results: dict[str, dict[str, float]]) -> list[str]:
+    """Return the lines comparing the implementations on a payload"""
+    stock, fast = results["stock"], results["fast"]
+    lines: list[str] = [name]
+    for label, key in (("render", "render_ms"), ("parse", "parse_ms")):
+        speedup: float = stock[key] / fast[key] if fast[key] else 0.0
+        lines.append(
+            f"  {label:<7} stock {stock[key]:>9.3f}ms  fast {fast[key]:>9.3f}ms  x{speedup:.1f}"
+        )
+    lines.append(f"  size    stock {stock['bytes']:>9} B   fast {fast['bytes']:>9} B")
+    return lines
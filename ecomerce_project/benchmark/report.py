@@ -0,0 +1,108 @@
+"""Latency, throughput and queries summary of the benchmark samples"""
+
+from math import ceil
+from typing import Any, Iterable
+
+from ecomerce_project.benchmark.workload import Sample
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[max(ceil(fraction * len(values)) - 1, 0)]
+
+
+def _summary(samples: list[Sample], wall: float) -> dict[str, Any]:
+    """Summarize the samples of one endpoint, or of all of them"""
+    durations: list[float] = sorted(sample.duration * 1000 for sample in samples)
+    # The failed requests stop early, they would lower the queries per request
+    queries: list[int] = [
+        sample.queries
+        for sample in samples
+        if sample.queries is not None and sample.status < 400
+    ]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample.status >= 400),
+        "requests_per_second": round(len(samples) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(durations) / len(durations), 3) if durations else 0.0,
+        "p50_ms": round(percentile(durations, 0.50), 3),
+        "p95_ms": round(percentile(durations, 0.95), 3),
+        "p99_ms": round(percentile(durations, 0.99), 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def summarize(samples: Iterable[Sample], wall: float) -> dict[str, Any]:
+    """Summarize the samples of a run, in total and for each endpoint
+
+    The requests per second of an endpoint are its share of the throughput
+    of the whole mixed workload.
+    """
+    endpoints: dict[str, list[Sample]] = {}
+    for sample in samples:
+        endpoints.setdefault(sample.endpoint, []).append(sample)
+
+    return {
+        "wall_seconds": round(wall, 3),
+        "total": _summary([sample for group in endpoints.values() for sample in group], wall),
+        "endpoints": {
+            endpoint: _summary(group, wall) for endpoint, group in sorted(endpoints.items())
+        },
+    }
+
+
+def format_report(report: dict[str, Any]) -> list[str]:
+    """Return the lines of a table with the summary of each endpoint"""
+    header: str = (
+        f"{'endpoint':<40} {'reqs':>6} {'err':>4} {'req/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}"
+    )
+    lines: list[str] = [header, "-" * len(header)]
+    rows: list[tuple[str, dict[str, Any]]] = [
+        *report["endpoints"].items(),
+        ("TOTAL", report["total"]),
+    ]
+    for endpoint, summary in rows:
+        queries: Any = summary["queries_per_request"]
+        lines.append(
+            f"{endpoint:<40} {summary['requests']:>6} {summary['errors']:>4} "
+            f"{summary['requests_per_second']:>8} {summary['p50_ms']:>9} "
+            f"{summary['p95_ms']:>9} {summary['p99_ms']:>9} "
+            f"{'-' if queries is None else queries:>8}"
+        )
+    return lines
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], tolerance: float
+) -> tuple[list[str], list[str]]:
+    """Diff a run against a baseline
+
+    Returns the lines of the diff and the endpoints that regressed: their p95
+    latency grew by more than tolerance percent or they run more queries.
+    """
+    lines: list[str] = []
+    regressions: list[str] = []
+    before: dict[str, dict[str, Any]] = baseline["report"]["endpoints"]
+
+    for endpoint, summary in current["report"]["endpoints"].items():
+        if endpoint not in before:
+            lines.append(f"{endpoint}: new endpoint")
+            continue
+        old: dict[str, Any] = before[endpoint]
+        change: float = (
+            (summary["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        )
+        more_queries: bool = (summary["queries_per_request"] or 0) > (
+            old["queries_per_request"] or 0
+        )
+        lines.append(
+            f"{endpoint}: p95 {old['p95_ms']} -> {summary['p95_ms']} ms ({change:+.1f}%), "
+            f"queries {old['queries_per_request']} -> {summary['queries_per_request']}"
+        )
+        if change > tolerance or more_queries:
+            regressions.append(endpoint)
+
+    return lines, regressions
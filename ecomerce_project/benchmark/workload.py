@@ -0,0 +1,128 @@
+"""Mixed shopping workload sent through a benchmark driver"""
+
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from time import perf_counter
+from typing import Any, NamedTuple, Protocol
+
+from django.urls import reverse
+
+from ecomerce_project.benchmark.drivers import Result
+from ecomerce_project.seeding import ADJECTIVES, NOUNS, Dataset
+
+
+class Driver(Protocol):
+    """Anything able to send a request to the application"""
+
+    def request(
+        self, method: str, path: str, data: Any = None, token: str | None = None
+    ) -> Result: ...
+
+
+class Sample(NamedTuple):
+    """Measure of a single request"""
+
+    endpoint: str
+    duration: float
+    status: int
+    queries: int | None
+
+
+class Session:
+    """Journey of a shopper: browse, fill a cart, check out and follow the order"""
+
+    def __init__(self, driver: Driver, dataset: Dataset, shopper: tuple[int, str], seed: int) -> None:
+        self.driver: Driver = driver
+        self.dataset: Dataset = dataset
+        self.user_id, self.token = shopper
+        self.rng: Random = Random(seed)
+        self.samples: list[Sample] = []
+
+    def send(
+        self, method: str, url_name: str, data: Any = None, args: tuple = ()
+    ) -> Result:
+        """Send a request and record its measure under METHOD url_name"""
+        start: float = perf_counter()
+        result: Result = self.driver.request(
+            method, reverse(url_name, args=args), data, self.token
+        )
+        self.samples.append(
+            Sample(f"{method} {url_name}", perf_counter() - start, result.status, result.queries)
+        )
+        return result
+
+    def run(self) -> list[Sample]:
+        """Run the whole journey, stopping at the first step that fails"""
+        rng: Random = self.rng
+        products: list[int] = self.dataset.product_ids
+
+        self.send("GET", "categories-list")
+        if self.dataset.category_ids:
+            self.send("GET", "products-list", {"category": rng.choice(self.dataset.category_ids)})
+        self.send("GET", "products-list", {"ordering": "price", "page_size": 20})
+        self.send("GET", "products-search", {"q": rng.choice(NOUNS)})
+        self.send("GET", "products-autocomplete", {"q": rng.choice(ADJECTIVES)[:3]})
+        for product_id in rng.sample(products, min(2, len(products))):
+            self.send("GET", "product-detail", args=(product_id,))
+
+        cart: Result = self.send("POST", "create_shopping_cart")
+        if cart.status != 201 or not products:
+            return self.samples
+        cart_id: int = cart.body["id"]
+
+        self.send(
+            "POST",
+            "add_products_to_cart",
+            {"product_id": rng.choice(products), "quantity": rng.randint(1, 3)},
+            args=(cart_id,),
+        )
+        self.send(
+            "POST",
+            "bulk_add_products_to_cart",
+            {
+                "items": [
+                    {"product_id": product_id, "quantity": rng.randint(1, 3)}
+                    for product_id in rng.sample(products, min(3, len(products)))
+                ]
+            },
+            args=(cart_id,),
+        )
+        self.send("GET", "shopping_cart", args=(cart_id,))
+
+        order: Result = self.send("POST", "create_order", {"cart": cart_id})
+        if order.status != 201:
+            return self.samples
+        order_id: int = order.body["id"]
+
+        self.send("PUT", "order_detail", {"status": "Processing"}, args=(order_id,))
+        self.send("GET", "order_detail", args=(order_id,))
+        return self.samples
+
+
+def run_workload(
+    driver: Driver, dataset: Dataset, sessions: int, concurrency: int = 1, seed: int = 0
+) -> tuple[list[Sample], float]:
+    """Run sessions shopper journeys, concurrency at a time
+
+    Every session uses a different shopper of the dataset, as a user has a
+    single cart. Returns the samples and the wall time of the run.
+    """
+    if sessions > len(dataset.shoppers):
+        raise ValueError(
+            f"{sessions} sessions need as many shoppers, the dataset has {len(dataset.shoppers)}."
+        )
+
+    journeys: list[Session] = [
+        Session(driver, dataset, shopper, seed + index)
+        for index, shopper in enumerate(dataset.shoppers[:sessions])
+    ]
+
+    start: float = perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results: list[list[Sample]] = list(executor.map(Session.run, journeys))
+    else:
+        results = [journey.run() for journey in journeys]
+    wall: float = perf_counter() - start
+
+    return [sample for samples in results for sample in samples], wall
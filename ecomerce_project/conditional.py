@@ -0,0 +1,96 @@
+"""Conditional GETs: ETag and Last-Modified validators and 304 responses
+
+The views compute the validators from a cheap version signal (updated_at
+columns, cache versions) and call not_modified before serializing, so a
+client holding the current version gets an empty 304. A deleted row takes
+its updated_at with it, so the lists also take the last deletion time of
+their table into their Last-Modified. That time is kept in the cache, so
+it is only used when the cache is shared by the workers: with a cache
+local to each process, the lists are validated by their ETag alone.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils import timezone
+from django.utils.http import http_date, quote_etag
+
+from rest_framework.request import Request
+
+
+def make_etag(*parts: Any) -> str:
+    """Return a strong, quoted ETag for the given version parts"""
+    digest: str = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def not_modified(
+    request: Request, etag: str | None = None, last_modified: datetime | None = None
+) -> HttpResponseBase | None:
+    """Return the 304 response if the client has the current version
+
+    If-None-Match is checked first, If-Modified-Since only without it.
+    """
+    response: HttpResponseBase | None = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    return set_validators(response, etag, last_modified) if response else None
+
+
+def set_validators(
+    response: HttpResponseBase,
+    etag: str | None = None,
+    last_modified: datetime | None = None,
+) -> HttpResponseBase:
+    """Add the ETag and Last-Modified headers to a response"""
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def cache_is_shared() -> bool:
+    """Tell if the default cache is seen by every worker, not local to each one"""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _deleted_at_key(table: str) -> str:
+    """Return the cache key of the last deletion time of a table"""
+    return f"conditional:{table}:deleted_at"
+
+
+def deleted_at(table: str) -> datetime | None:
+    """Return the last time a row of the table was deleted
+
+    A missing time (never set or evicted) starts from now, so it never goes
+    back before a deletion. None if the cache is not shared: each worker
+    would start its own time and answer 304 to a client that saw the
+    deletion through another one.
+    """
+    if not cache_is_shared():
+        return None
+    key: str = _deleted_at_key(table)
+    value: datetime | None = cache.get(key)
+    if value is None:
+        cache.add(key, timezone.now(), timeout=None)
+        value = cache.get(key, timezone.now())
+    return value
+
+
+def record_deletion(table: str) -> None:
+    """Set the last deletion time of a table once the transaction commits"""
+    transaction.on_commit(
+        lambda: cache.set(_deleted_at_key(table), timezone.now(), timeout=None)
+    )
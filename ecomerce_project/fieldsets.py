@@ -0,0 +1,88 @@
+"""Sparse fieldsets: ?fields=id,name,price narrows the output and the SQL
+
+A view reads the requested names with requested_fields, passes them to a
+serializer using DynamicFieldsMixin and loads its rows with project, which
+defers the columns and skips the relations no requested field needs.
+"""
+
+from typing import Any, Iterable
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+
+from rest_framework.request import Request
+from rest_framework.serializers import BaseSerializer
+
+FIELDS_PARAM: str = "fields"
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin keeping only the fields given in its fields argument"""
+
+    def __init__(
+        self, *args: Any, fields: Iterable[str] | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def requested_fields(
+    request: Request, serializer_class: type[BaseSerializer]
+) -> list[str] | None:
+    """Return the field names of ?fields=, None when it is not given
+
+    Raises ValueError when a name is not a readable field of the serializer.
+    """
+    value: str | None = request.query_params.get(FIELDS_PARAM)
+    if value is None:
+        return None
+
+    names: list[str] = list(
+        dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+    )
+    if not names:
+        raise ValueError("The fields parameter needs at least one field name.")
+    readable: set[str] = {
+        name for name, field in serializer_class().fields.items() if not field.write_only
+    }
+    unknown: list[str] = [name for name in names if name not in readable]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+    return names
+
+
+def project(
+    queryset: QuerySet,
+    fields: Iterable[str] | None,
+    select_related: Iterable[str] = (),
+    prefetch_related: Iterable[str] = (),
+    required: Iterable[str] = (),
+) -> QuerySet:
+    """Return the queryset loading only what the given fields need
+
+    The relations are joined or prefetched only when they are requested,
+    and the columns of the fields that are not requested are deferred, except
+    the required ones the view itself uses. Without fields everything is
+    loaded.
+    """
+    wanted: set[str] | None = None if fields is None else {*fields, *required}
+    joins: list[str] = [name for name in select_related if wanted is None or name in wanted]
+    # select_related() without names would join every foreign key
+    if joins:
+        queryset = queryset.select_related(*joins)
+    queryset = queryset.prefetch_related(
+        *[name for name in prefetch_related if wanted is None or name in wanted]
+    )
+    if wanted is None:
+        return queryset
+
+    columns: list[str] = [queryset.model._meta.pk.name]
+    for name in wanted:
+        try:
+            if queryset.model._meta.get_field(name).concrete:
+                columns.append(name)
+        except FieldDoesNotExist:
+            continue
+    return queryset.only(*columns)
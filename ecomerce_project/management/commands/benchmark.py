@@ -0,0 +1,154 @@
+"""Run the benchmark workload against a throwaway database"""
+
+import json
+import subprocess
+from dataclasses import asdict, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from ecomerce_project.benchmark.drivers import DRIVERS
+from ecomerce_project.benchmark.report import compare, format_report, summarize
+from ecomerce_project.benchmark.workload import run_workload
+from ecomerce_project.seeding import Dataset, DatasetSize, seed_dataset
+
+
+def current_commit() -> str | None:
+    """Return the git commit of the working tree, if there is one"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Run the benchmark workload against a throwaway database"""
+
+    help = (
+        "Seed a throwaway test database, run the shopping workload through the "
+        "test client or a local WSGI server and report the p50/p95/p99 latency, "
+        "requests per second and queries per request of each endpoint."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        defaults: DatasetSize = DatasetSize()
+        parser.add_argument("--driver", choices=sorted(DRIVERS), default="client")
+        parser.add_argument("--sessions", type=int, default=50, help="Shopper journeys to run")
+        parser.add_argument("--warmup", type=int, default=5, help="Journeys run before measuring")
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument("--categories", type=int, default=defaults.categories)
+        parser.add_argument("--products", type=int, default=defaults.products)
+        parser.add_argument("--carts", type=int, default=defaults.carts)
+        parser.add_argument("--orders", type=int, default=defaults.orders)
+        parser.add_argument("--save", help="Write the report to this JSON file")
+        parser.add_argument("--compare", help="Diff the report against this JSON baseline")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=10.0,
+            help="p95 growth in percent tolerated by --compare before failing",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        baseline: dict[str, Any] | None = None
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+
+        # Every journey needs its own shopper, a user without a cart
+        size: DatasetSize = DatasetSize(
+            users=max(
+                options["users"], options["carts"] + options["warmup"] + options["sessions"]
+            ),
+            categories=options["categories"],
+            products=options["products"],
+            carts=options["carts"],
+            orders=min(options["orders"], options["carts"]),
+        )
+
+        with TemporaryDirectory() as directory:
+            report: dict[str, Any] = self._run(size, options, Path(directory))
+
+        result: dict[str, Any] = {
+            "commit": current_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "driver": options["driver"],
+                "sessions": options["sessions"],
+                "concurrency": options["concurrency"],
+                "seed": options["seed"],
+                "dataset": asdict(size),
+                "database": connections["default"].vendor,
+            },
+            "report": report,
+        }
+
+        for line in format_report(report):
+            self.stdout.write(line)
+
+        if options["save"]:
+            Path(options["save"]).write_text(json.dumps(result, indent=2), encoding="utf-8")
+            self.stdout.write(f"Report saved to {options['save']}")
+
+        if baseline is not None:
+            lines, regressions = compare(baseline, result, options["tolerance"])
+            self.stdout.write(f"Compared to {baseline.get('commit') or options['compare']}:")
+            for line in lines:
+                self.stdout.write(f"  {line}")
+            if regressions:
+                raise CommandError(f"Regressions in {', '.join(regressions)}.")
+
+    def _run(self, size: DatasetSize, options: dict[str, Any], directory: Path) -> dict[str, Any]:
+        """Seed a test database, run the workload on it and summarize it"""
+        # In-memory SQLite databases cannot be shared with the server threads
+        for connection in connections.all():
+            test_settings: dict[str, Any] = connection.settings_dict.setdefault("TEST", {})
+            if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+                test_settings["NAME"] = str(directory / f"benchmark_{connection.alias}.sqlite3")
+
+        setup_test_environment()
+        old_config: list = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write(f"Seeding {size}")
+            dataset: Dataset = seed_dataset(size, seed=options["seed"])
+
+            with override_settings(
+                QUERY_COUNT_HEADERS=True, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "127.0.0.1"]
+            ), DRIVERS[options["driver"]]() as driver:
+                run_workload(
+                    driver,
+                    replace(dataset, shoppers=dataset.shoppers[: options["warmup"]]),
+                    options["warmup"],
+                    options["concurrency"],
+                    options["seed"],
+                )
+                samples, wall = run_workload(
+                    driver,
+                    replace(dataset, shoppers=dataset.shoppers[options["warmup"] :]),
+                    options["sessions"],
+                    options["concurrency"],
+                    options["seed"],
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        return summarize(samples, wall)
@@ -0,0 +1,68 @@
+"""Compare the stock and the fast JSON renderers on the list payloads"""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from ecomerce_project.benchmark.renderers import (
+    format_timings,
+    product_list_payload,
+    time_payload,
+    user_list_payload,
+)
+from ecomerce_project.renderers import orjson
+from ecomerce_project.seeding import DatasetSize, seed_dataset
+
+
+class Command(BaseCommand):
+    """Compare the stock and the fast JSON renderers on the list payloads"""
+
+    help = (
+        "Seed a throwaway test database and time the stock DRF JSON renderer "
+        "and parser against the orjson ones on a page of ProductListView and "
+        "on the UserListView payload."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--page-size", type=int, default=500, help="Products per page")
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20, help="Runs of each timing")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if orjson is None:
+            self.stderr.write("orjson is not installed, both renderers use the json module.")
+
+        setup_test_environment()
+        old_config: list = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed_dataset(
+                DatasetSize(
+                    users=options["users"],
+                    products=options["page_size"],
+                    carts=0,
+                    orders=0,
+                ),
+                seed=options["seed"],
+                collect=False,
+            )
+            payloads: dict[str, Any] = {
+                f"ProductListView ({options['page_size']} products)": product_list_payload(
+                    options["page_size"]
+                ),
+                f"UserListView ({options['users']} users)": user_list_payload(
+                    options["users"]
+                ),
+            }
+            for name, payload in payloads.items():
+                for line in format_timings(name, time_payload(payload, options["repeat"])):
+                    self.stdout.write(line)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
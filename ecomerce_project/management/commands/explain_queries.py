@@ -0,0 +1,125 @@
+"""Replay a log of SQL queries through EXPLAIN and flag the full table scans"""
+
+import json
+import re
+import sys
+from collections import Counter
+from contextlib import nullcontext
+from typing import Any, ContextManager, Iterable, Iterator, TextIO
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DatabaseError, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+# Line written by the django.db.backends logger at DEBUG level
+BACKENDS_LOG_LINE: re.Pattern = re.compile(
+    r"^\((?P<duration>[\d.]+)\) (?P<sql>.+?); args=.*?(?:; alias=\w+)?$"
+)
+SQLITE_SCAN: re.Pattern = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW)(\S+)")
+EXPLAINABLE: tuple[str, ...] = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def read_queries(lines: Iterable[str]) -> Iterator[tuple[str, list[Any]]]:
+    """Yield the (sql, params) of each query of a log
+
+    Understands the lines of the django.db.backends logger, JSON objects with
+    "sql" and "params" keys and plain SQL statements, one per line.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            entry: dict[str, Any] = json.loads(line)
+            yield entry["sql"], list(entry.get("params") or [])
+            continue
+        match: re.Match | None = BACKENDS_LOG_LINE.match(line)
+        yield (match.group("sql") if match else line.rstrip(";")), []
+
+
+def full_scans(
+    connection: BaseDatabaseWrapper, sql: str, params: list[Any]
+) -> list[str]:
+    """Return the tables a query reads with a full scan"""
+    with connection.cursor() as cursor:
+        # Logged queries have their values inlined, without params a literal %
+        # in them is not taken for a placeholder
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or None)
+            # SEARCH steps use an index, SCAN steps without one read every row
+            return [
+                match.group(1)
+                for *_ids, detail in cursor.fetchall()
+                if (match := SQLITE_SCAN.match(detail)) and "INDEX" not in detail
+            ]
+
+        if connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params or None)
+            plan: Any = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables: list[str] = []
+            nodes: list[dict[str, Any]] = [plan[0]["Plan"]]
+            while nodes:
+                node: dict[str, Any] = nodes.pop()
+                if node.get("Node Type") == "Seq Scan":
+                    tables.append(node["Relation Name"])
+                nodes.extend(node.get("Plans", []))
+            return tables
+
+    raise CommandError(f"EXPLAIN is not supported for {connection.vendor}.")
+
+
+class Command(BaseCommand):
+    """Replay a log of SQL queries through EXPLAIN and flag the full table scans"""
+
+    help = (
+        "Replay logged SQL queries through EXPLAIN and report the ones doing "
+        "full table scans. Reads django.db.backends log lines, JSON lines "
+        'with "sql" and "params", or one SQL statement per line.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "logs", nargs="+", help="Query log files, - reads the standard input"
+        )
+        parser.add_argument(
+            "--database", default="default", help="Database to explain the queries on"
+        )
+        parser.add_argument(
+            "--fail-on-scan",
+            action="store_true",
+            help="Exit with an error if any query does a full table scan",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        connection: BaseDatabaseWrapper = connections[options["database"]]
+        queries: Counter = Counter()
+
+        for path in options["logs"]:
+            # The standard input is not closed, the command did not open it
+            log: ContextManager[TextIO] = (
+                nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8")
+            )
+            with log as lines:
+                for sql, params in read_queries(lines):
+                    if sql.lstrip().upper().startswith(EXPLAINABLE):
+                        queries[(sql, json.dumps(params, default=str))] += 1
+
+        flagged: int = 0
+        for (sql, params), count in queries.most_common():
+            try:
+                tables: list[str] = full_scans(connection, sql, json.loads(params))
+            except DatabaseError as error:
+                self.stderr.write(f"Could not explain: {sql}\n  {error}")
+                continue
+            if tables:
+                flagged += 1
+                self.stdout.write(
+                    self.style.WARNING(f"FULL SCAN on {', '.join(tables)} ({count}x)")
+                )
+                self.stdout.write(f"  {sql}")
+
+        self.stdout.write(f"{len(queries)} distinct queries, {flagged} with full scans.")
+        if flagged and options["fail_on_scan"]:
+            raise CommandError(f"{flagged} queries do full table scans.")
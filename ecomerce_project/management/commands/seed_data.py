@@ -0,0 +1,67 @@
+"""Fill the database with a large synthetic dataset"""
+
+from time import perf_counter
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import IntegrityError
+
+from ecomerce_project.seeding import PASSWORD, DatasetSize, seed_dataset
+
+
+class Command(BaseCommand):
+    """Fill the database with a large synthetic dataset"""
+
+    help = (
+        "Generate users, addresses, categories, products, carts and orders with "
+        "batched bulk inserts. The same --seed always generates the same data. "
+        f'Every user has the password "{PASSWORD}".'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        defaults: DatasetSize = DatasetSize()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument("--categories", type=int, default=defaults.categories)
+        parser.add_argument("--products", type=int, default=defaults.products)
+        parser.add_argument(
+            "--carts", type=int, default=defaults.carts, help="Users with a filled cart"
+        )
+        parser.add_argument(
+            "--orders", type=int, default=defaults.orders, help="Carts checked out"
+        )
+        parser.add_argument("--items-per-cart", type=int, default=defaults.items_per_cart)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Rows inserted by each query"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        size: DatasetSize = DatasetSize(
+            users=options["users"],
+            categories=options["categories"],
+            products=options["products"],
+            carts=min(options["carts"], options["users"]),
+            orders=min(options["orders"], options["carts"], options["users"]),
+            items_per_cart=options["items_per_cart"],
+        )
+        start: float = perf_counter()
+
+        def progress(table: str, count: int) -> None:
+            self.stdout.write(f"{table}: {count} ({perf_counter() - start:.1f}s)")
+
+        try:
+            seed_dataset(
+                size,
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+                collect=False,
+                progress=progress if options["verbosity"] > 0 else None,
+            )
+        except IntegrityError as error:
+            raise CommandError(
+                f"The data could not be seeded, is the database empty? {error}"
+            ) from error
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded {size} in {perf_counter() - start:.1f}s.")
+        )
@@ -0,0 +1,99 @@
+"""Middleware counting the SQL queries of each request"""
+
+import logging
+from contextlib import ExitStack
+from functools import cache
+from time import perf_counter
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.urls import URLResolver, get_resolver
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request runs more queries than the budget of its url"""
+
+
+@cache
+def get_query_budgets() -> dict[str, int | None]:
+    """Return the query budget of each url name
+
+    The budgets are declared in a query_budgets dict next to the urlpatterns
+    of each urls module, mapping the url names to the maximum number of
+    queries a request to them may run. None declares a url whose queries
+    grow with the size of the request, like an upload processed in batches.
+    """
+    budgets: dict[str, int | None] = {}
+    resolvers: list[URLResolver] = [get_resolver()]
+    while resolvers:
+        resolver: URLResolver = resolvers.pop()
+        budgets.update(getattr(resolver.urlconf_module, "query_budgets", {}))
+        resolvers.extend(
+            pattern for pattern in resolver.url_patterns if isinstance(pattern, URLResolver)
+        )
+    return budgets
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries and their time"""
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.duration: float = 0.0
+
+    def __call__(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        start: float = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - start
+
+
+class QueryCountMiddleware:
+    """Count the queries of each request and check them against its budget
+
+    In debug mode, or with QUERY_COUNT_HEADERS set, the count, the time spent
+    in the database and the budget are sent in the X-DB-Query-Count,
+    X-DB-Query-Time and X-DB-Query-Budget response headers. A request over
+    the budget of its url name is logged, or raises QueryBudgetExceeded when
+    QUERY_BUDGET_RAISE is set, which the tests do to fail on N+1 regressions.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        counter: QueryCounter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response: HttpResponse = self.get_response(request)
+
+        url_name: str | None = (
+            request.resolver_match.view_name if request.resolver_match else None
+        )
+        budget: int | None = get_query_budgets().get(url_name) if url_name else None
+
+        if settings.DEBUG or settings.QUERY_COUNT_HEADERS:
+            response["X-DB-Query-Count"] = str(counter.count)
+            response["X-DB-Query-Time"] = f"{counter.duration * 1000:.3f}ms"
+            if budget is not None:
+                response["X-DB-Query-Budget"] = str(budget)
+
+        if budget is not None and counter.count > budget:
+            message: str = (
+                f"{request.method} {request.path} ({url_name}) ran {counter.count} "
+                f"queries, its budget is {budget}."
+            )
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
@@ -0,0 +1,141 @@
+"""In-process cache of the small reference tables, looked up by id and by name
+
+Categories and order statuses are a handful of rows read on almost every
+request and very rarely written. Each process keeps all of their rows in
+memory and reloads them when the version counter stored in the shared
+cache changes. The counter is bumped by the post_save and post_delete
+signals of the model, so every worker sees the change on its next lookup.
+
+The rows are also reloaded REFERENCE_CACHE_MAX_AGE seconds after they were
+loaded, so the workers converge even when the counter is not shared, like
+with the local memory cache, or when a write went around the signals.
+"""
+
+from threading import Lock
+from time import monotonic, time_ns
+from typing import Any, NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+
+
+class _Rows(NamedTuple):
+    """The rows of a table indexed by primary key and by name, swapped at once"""
+
+    by_id: dict[Any, Model]
+    by_name: dict[str, Model]
+
+
+class ReferenceCache:
+    """All the rows of a reference table, indexed by primary key and by name"""
+
+    def __init__(self, model_label: str, name_field: str) -> None:
+        self.model_label: str = model_label
+        self.name_field: str = name_field
+        self._version: int | None = None
+        self._expires_at: float = 0.0
+        self._rows: _Rows = _Rows({}, {})
+        self._lock: Lock = Lock()
+
+        post_save.connect(self.invalidate, sender=model_label, weak=False)
+        post_delete.connect(self.invalidate, sender=model_label, weak=False)
+
+    @property
+    def model(self) -> type[Model]:
+        """Return the model of the reference table"""
+        return apps.get_model(self.model_label)
+
+    def _version_key(self) -> str:
+        """Return the cache key of the version counter of the table"""
+        return f"reference:{self.model_label}:version"
+
+    def _current_version(self) -> int:
+        """Return the current version of the table
+
+        A missing counter starts from the current time in nanoseconds, so it
+        never goes back to a version loaded before.
+        """
+        version: int | None = cache.get(self._version_key())
+        if version is None:
+            cache.add(self._version_key(), time_ns(), timeout=None)
+            version = cache.get(self._version_key(), time_ns())
+        return version
+
+    def _load(self) -> _Rows:
+        """Return the rows, loaded again if the table changed or they are too old"""
+        version: int = self._current_version()
+        if version == self._version and monotonic() < self._expires_at:
+            return self._rows
+        with self._lock:
+            rows: list[Model] = list(self.model.objects.order_by("pk"))
+            loaded: _Rows = _Rows(
+                {row.pk: row for row in rows},
+                {getattr(row, self.name_field): row for row in rows},
+            )
+            self._rows = loaded
+            self._version = version
+            self._expires_at = monotonic() + settings.REFERENCE_CACHE_MAX_AGE
+        return loaded
+
+    def invalidate(self, **_kwargs: Any) -> None:
+        """Make every process load the table again on its next lookup
+
+        The counter is bumped when the current transaction commits, so no
+        process loads the old rows under the new version.
+        """
+        self._version = None
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self) -> None:
+        """Bump the version counter of the table"""
+        self._version = None
+        try:
+            cache.incr(self._version_key())
+        except ValueError:
+            cache.add(self._version_key(), time_ns(), timeout=None)
+
+    def _lookup(self, index: str, key: Any, **lookup: Any) -> Model | None:
+        """Find a row in one of the indexes, or in the database on a miss
+
+        A row missing from the cache may have been created by a process
+        whose cache is not shared with this one. If the database has it the
+        table is loaded again on the next lookup.
+        """
+        row: Model | None = getattr(self._load(), index).get(key)
+        if row is None:
+            row = self.model.objects.filter(**lookup).first()
+            if row is not None:
+                self._version = None
+        return row
+
+    def all(self) -> list[Model]:
+        """Return all the rows, ordered by primary key"""
+        return list(self._load().by_id.values())
+
+    def get(self, pk: Any) -> Model | None:
+        """Return the row with the given primary key"""
+        return self._lookup("by_id", pk, pk=pk) if pk is not None else None
+
+    def get_by_name(self, name: str) -> Model | None:
+        """Return the row with the given name"""
+        if not isinstance(name, str):
+            return None
+        return self._lookup("by_name", name, **{self.name_field: name})
+
+    def get_or_404(self, pk: Any = None, name: str | None = None) -> Model:
+        """Return the row with the given primary key or name, or raise Http404"""
+        row: Model | None = self.get(pk) if name is None else self.get_by_name(name)
+        if row is None:
+            raise Http404(f"No {self.model._meta.object_name} matches the given query.")
+        return row
+
+
+category_cache: ReferenceCache = ReferenceCache("products.Category", "category_name")
+order_status_cache: ReferenceCache = ReferenceCache(
+    "shopping_and_payments.OrderStatus", "name"
+)
@@ -0,0 +1,77 @@
+"""JSON renderer and parser backed by orjson
+
+orjson encodes the serialized lists several times faster than the json
+module used by the stock DRF classes. When it is not installed both classes
+fall back to the stock ones, so the API keeps working, only slower.
+"""
+
+from typing import Any, Mapping
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+# Characters valid in JSON but not in JavaScript strings, DRF escapes them
+_LINE_SEPARATORS: tuple[tuple[bytes, bytes], ...] = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson
+
+    datetime, date, time and UUID are encoded by orjson itself, the other
+    types DRF knows (Decimal, lazy strings, querysets...) go through the
+    default method of the DRF encoder. Indented output, asked for with
+    "; indent=" in the Accept header, is left to the stock renderer.
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        rendered: bytes = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+        for character, escaped in _LINE_SEPARATORS:
+            if character in rendered:
+                rendered = rendered.replace(character, escaped)
+        return rendered
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson, which only reads UTF-8"""
+
+    def parse(
+        self,
+        stream: Any,
+        media_type: str | None = None,
+        parser_context: Mapping[str, Any] | None = None,
+    ) -> Any:
+        encoding: str = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as error:
+            raise ParseError(f"JSON parse error - {error}") from error
@@ -0,0 +1,237 @@
+"""Cache of the rendered responses of anonymous GETs, purged by tags
+
+Each response is stored with the versions of its tags, like "product:7",
+and a hit is only served while all of them are unchanged, so purging a tag
+drops exactly the responses tagged with it without knowing their keys. A
+hit is answered from the stored bytes: no query, serializer or renderer.
+
+The versions of the tags known before the data is read are taken first, so
+a purge that happens while the response is being built is not missed.
+
+The views wrapped with coalesce build each response in a single flight:
+on a miss one worker builds it while the others wait for it, and an entry
+that expired, but was not purged, is served stale for
+RESPONSE_CACHE_STALE_TIMEOUT more seconds while one worker builds it again.
+A response that is not cached, like a 404 or a 304, is marked for
+SINGLE_FLIGHT_WAIT_TIMEOUT seconds, so the workers waiting for it, and the
+next ones, build theirs at the same time instead of one after the other.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseBase
+from django.utils.http import parse_http_date_safe
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ecomerce_project.conditional import not_modified
+from ecomerce_project.single_flight import Flight, SingleFlight
+
+# Response headers stored with the content
+STORED_HEADERS: tuple[str, ...] = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ResponseCache:
+    """Rendered responses of anonymous JSON GETs, keyed by their full url"""
+
+    def __init__(self, prefix: str = "response") -> None:
+        self.prefix: str = prefix
+        self.flights: SingleFlight = SingleFlight(f"{prefix}:flight")
+
+    def _tag_key(self, tag: str) -> str:
+        """Return the cache key of the version of a tag"""
+        return f"{self.prefix}:tag:{tag}"
+
+    def _key(self, request: Request) -> str:
+        """Return the cache key of the response to a request
+
+        The host and the scheme are part of it, the pages link to each
+        other with absolute urls.
+        """
+        digest: str = hashlib.md5(
+            f"{request.scheme}://{request.get_host()}{request.get_full_path()}"
+            f"|{request.accepted_media_type}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def _uncached_key(self, key: str) -> str:
+        """Return the cache key of the mark of a response that is not cached"""
+        return f"{key}:uncached"
+
+    def cacheable(self, request: Request) -> bool:
+        """Tell if the response to a request is the same for every client"""
+        return (
+            request.method == "GET"
+            and not request.user.is_authenticated
+            and getattr(request, "accepted_renderer", None) is not None
+            and request.accepted_renderer.format == "json"
+        )
+
+    def versions(self, *tags: str) -> dict[str, Any]:
+        """Return the current version of each tag, starting the missing ones"""
+        keys: dict[str, str] = {self._tag_key(tag): tag for tag in tags}
+        found: dict[str, Any] = cache.get_many(keys)
+        for key in keys.keys() - found.keys():
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        return {tag: found[key] for key, tag in keys.items()}
+
+    def purge(self, *tags: str) -> None:
+        """Drop every response tagged with any of the tags
+
+        The tags change when the current transaction commits: a response
+        built before from the old rows would be cached under the new versions.
+        """
+        if tags:
+            transaction.on_commit(lambda: self._purge_now(tags))
+
+    def _purge_now(self, tags: tuple[str, ...]) -> None:
+        """Give new versions to the tags"""
+        version: str = uuid4().hex
+        cache.set_many({self._tag_key(tag): version for tag in tags}, timeout=None)
+
+    def _entry(self, request: Request) -> dict[str, Any] | None:
+        """Return the cached entry of a request, unless one of its tags was purged"""
+        entry: dict[str, Any] | None = cache.get(self._key(request))
+        if entry is None:
+            return None
+        tags: dict[str, Any] = entry["tags"]
+        current: dict[str, Any] = cache.get_many([self._tag_key(tag) for tag in tags])
+        if any(current.get(self._tag_key(tag)) != version for tag, version in tags.items()):
+            return None
+        return entry
+
+    def _serve(self, request: Request, entry: dict[str, Any], state: str) -> HttpResponseBase:
+        """Return the response stored in an entry, or a 304 if the client has it"""
+        headers: dict[str, str] = entry["headers"]
+        last_modified: int | None = parse_http_date_safe(headers.get("Last-Modified", ""))
+        cached: HttpResponseBase | None = not_modified(
+            request,
+            headers.get("ETag"),
+            datetime.fromtimestamp(last_modified, timezone.utc) if last_modified else None,
+        )
+        response: HttpResponseBase = cached or HttpResponse(
+            entry["content"], content_type=headers.get("Content-Type")
+        )
+        for header in ("ETag", "Last-Modified"):
+            if header in headers:
+                response[header] = headers[header]
+        response["X-Response-Cache"] = state
+        return response
+
+    def get(self, request: Request) -> HttpResponseBase | None:
+        """Return the cached response to a request, if it is still fresh"""
+        if not self.cacheable(request):
+            return None
+        entry: dict[str, Any] | None = self._entry(request)
+        if entry is None or entry["fresh_until"] <= time.time():
+            return None
+        return self._serve(request, entry, "hit")
+
+    def set(
+        self, request: Request, response: Response, versions: dict[str, Any], *tags: str
+    ) -> Response:
+        """Store the response once it is rendered, tagged with versions and tags
+
+        versions are the ones taken before the data of the response was read,
+        the versions of the other tags are taken now.
+        """
+        if not self.cacheable(request) or response.status_code != 200:
+            return response
+
+        entry_tags: dict[str, Any] = {**self.versions(*tags), **versions}
+        key: str = self._key(request)
+
+        def store(rendered: Response) -> None:
+            cache.set(
+                key,
+                {
+                    "tags": entry_tags,
+                    "content": rendered.content,
+                    "fresh_until": time.time() + settings.RESPONSE_CACHE_TIMEOUT,
+                    "headers": {
+                        header: rendered[header]
+                        for header in STORED_HEADERS
+                        if rendered.has_header(header)
+                    },
+                },
+                settings.RESPONSE_CACHE_TIMEOUT + settings.RESPONSE_CACHE_STALE_TIMEOUT,
+            )
+
+        response.add_post_render_callback(store)
+        response["X-Response-Cache"] = "miss"
+        return response
+
+    def coalesce(self, view: Callable[..., HttpResponseBase]) -> Callable[..., HttpResponseBase]:
+        """Serve a view method from the cache, building each response in a single flight
+
+        A stale entry is served while another worker builds it again. On a
+        miss the others wait for the worker building it and are served its
+        response, or build it themselves if it was not cached, or if they
+        waited SINGLE_FLIGHT_WAIT_TIMEOUT seconds. The view still takes the
+        versions of its tags and stores its response with set.
+        """
+
+        def finish(key: str, flight: Flight, response: HttpResponseBase | None) -> None:
+            """Mark the response if set did not cache it, then release the key"""
+            if response is None or response.get("X-Response-Cache") != "miss":
+                cache.set(self._uncached_key(key), True, settings.SINGLE_FLIGHT_WAIT_TIMEOUT)
+            flight.release()
+
+        @wraps(view)
+        def wrapper(
+            view_self: Any, request: Request, *args: Any, **kwargs: Any
+        ) -> HttpResponseBase:
+            if not self.cacheable(request):
+                return view(view_self, request, *args, **kwargs)
+
+            key: str = self._key(request)
+            entry: dict[str, Any] | None = self._entry(request)
+            if entry is not None and entry["fresh_until"] > time.time():
+                return self._serve(request, entry, "hit")
+
+            if entry is None and cache.get(self._uncached_key(key)):
+                return view(view_self, request, *args, **kwargs)
+
+            flight: Flight | None = self.flights.acquire(key, wait=0 if entry else None)
+            if flight is None:
+                if entry is not None:
+                    return self._serve(request, entry, "stale")
+                return view(view_self, request, *args, **kwargs)
+
+            # The worker that held the key may have cached the response, or
+            # marked it as not cached
+            hit: HttpResponseBase | None = self.get(request)
+            if hit is not None:
+                flight.release()
+                return hit
+            if entry is None and cache.get(self._uncached_key(key)):
+                flight.release()
+                return view(view_self, request, *args, **kwargs)
+            try:
+                response: HttpResponseBase = view(view_self, request, *args, **kwargs)
+            except BaseException:
+                # Like Http404, rendered by the exception handler and not cached
+                finish(key, flight, None)
+                raise
+            # Held until the response is rendered and stored
+            if isinstance(response, Response) and not response.is_rendered:
+                response.add_post_render_callback(lambda _rendered: finish(key, flight, response))
+            else:
+                finish(key, flight, response)
+            return response
+
+        return wrapper
+
+
+response_cache: ResponseCache = ResponseCache()
@@ -0,0 +1,167 @@
+"""Serializer-free rendering of read-only lists
+
+A RowMapper reads the fields of a serializer once and builds a function
+turning a values_list() row into the dict the serializer would return, with
+the same keys, order and values, so the JSON output does not change. The
+lists are then fetched as tuples and never become model instances. The
+function is made of closures over the column indexes, one per field.
+
+Plain model fields, primary key relations and nested model serializers are
+supported, anything else (method fields, many=True, dotted sources) raises
+TypeError when the mapper is built.
+"""
+
+from functools import cache
+from operator import itemgetter
+from typing import Any, Callable, Iterable
+
+from django.db.models import Model, QuerySet
+
+from rest_framework import serializers
+
+# Fields whose to_representation returns the database value unchanged
+_IDENTITY_FIELDS: tuple[type[serializers.Field], ...] = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+)
+
+
+RowFunction = Callable[[tuple], Any]
+
+
+def _converted(index: int, convert: Callable[[Any], Any]) -> RowFunction:
+    """Return a function converting a column of the row, unless it is None"""
+
+    def read(row: tuple) -> Any:
+        value: Any = row[index]
+        return None if value is None else convert(value)
+
+    return read
+
+
+def _nested(index: int, map_related: RowFunction) -> RowFunction:
+    """Return a function mapping a related row, None if the foreign key is"""
+
+    def read(row: tuple) -> Any:
+        return None if row[index] is None else map_related(row)
+
+    return read
+
+
+def _mapping(names: list[str], readers: list[RowFunction]) -> RowFunction:
+    """Return a function building the dict of the names and their readers"""
+    fields: tuple[tuple[str, RowFunction], ...] = tuple(zip(names, readers))
+
+    def map_row(row: tuple) -> dict[str, Any]:
+        return {name: read(row) for name, read in fields}
+
+    return map_row
+
+
+class RowMapper:
+    """Turn values_list() rows into the dicts a serializer returns
+
+    columns are the lookups to pass to values_list(), in the order the
+    built function reads them.
+    """
+
+    def __init__(self, serializer: serializers.Serializer) -> None:
+        self.model: type[Model] = serializer.Meta.model
+        self.columns: list[str] = []
+        self._map_row: RowFunction = self._build(serializer, "")
+
+    def _column(self, lookup: str) -> int:
+        """Return the index of a new column of the row"""
+        self.columns.append(lookup)
+        return len(self.columns) - 1
+
+    def _build(self, serializer: serializers.Serializer, prefix: str) -> RowFunction:
+        """Return the function mapping a serializer, its lookups under prefix"""
+        names: list[str] = []
+        readers: list[RowFunction] = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise TypeError(f"The source of {name} is not supported.")
+            lookup: str = prefix + field.source
+
+            if isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise TypeError(f"The many=True field {name} is not supported.")
+                # The foreign key tells if there is a related row at all
+                related: int = self._column(lookup)
+                read: RowFunction = _nested(related, self._build(field, lookup + "__"))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField) and not field.pk_field:
+                read = itemgetter(self._column(lookup))
+            elif isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField)):
+                raise TypeError(f"The relation {name} is not supported.")
+            elif isinstance(field, serializers.SerializerMethodField):
+                raise TypeError(f"The method field {name} is not supported.")
+            elif isinstance(field, _IDENTITY_FIELDS):
+                read = itemgetter(self._column(lookup))
+            else:
+                read = _converted(self._column(lookup), field.to_representation)
+            names.append(name)
+            readers.append(read)
+        return _mapping(names, readers)
+
+    def __call__(self, row: tuple) -> dict[str, Any]:
+        return self._map_row(row)
+
+    def map(self, rows: Iterable[tuple]) -> list[dict[str, Any]]:
+        """Return the dicts of the rows"""
+        return list(map(self._map_row, rows))
+
+    def rows(self, queryset: QuerySet, *extra: str) -> QuerySet:
+        """Return the queryset as named rows of the columns, then of extra
+
+        The extra lookups, like the sort keys a cursor needs, are only added
+        when they are not already columns, and are read by name.
+        """
+        extra_columns: list[str] = [lookup for lookup in extra if lookup not in self.columns]
+        return queryset.values_list(*self.columns, *extra_columns, named=True)
+
+    def map_instances(self, instances: Iterable[Model]) -> list[dict[str, Any]]:
+        """Return the dicts of model instances, which are already loaded"""
+        getters: list[Callable[[Model], Any]] = [
+            self._instance_getter(lookup) for lookup in self.columns
+        ]
+        return [
+            self._map_row(tuple(getter(instance) for getter in getters))
+            for instance in instances
+        ]
+
+    def _instance_getter(self, lookup: str) -> Callable[[Model], Any]:
+        """Return a function reading a lookup from an instance like the query"""
+        *path, last = lookup.split("__")
+        model: type[Model] = self.model
+        for part in path:
+            model = model._meta.get_field(part).related_model
+        # The foreign keys give their id, as values_list() does
+        attname: str = model._meta.get_field(last).attname
+
+        def getter(instance: Model) -> Any:
+            value: Any = instance
+            for part in path:
+                value = getattr(value, part)
+                if value is None:
+                    return None
+            return getattr(value, attname)
+
+        return getter
+
+
+@cache
+def get_row_mapper(
+    serializer_class: type[serializers.Serializer], fields: tuple[str, ...] | None = None
+) -> RowMapper:
+    """Return the mapper of a serializer class, built the first time only
+
+    fields narrows the serializers using DynamicFieldsMixin.
+    """
+    serializer: serializers.Serializer = (
+        serializer_class() if fields is None else serializer_class(fields=fields)
+    )
+    return RowMapper(serializer)
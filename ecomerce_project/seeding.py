@@ -0,0 +1,246 @@
+"""Synthetic dataset generation with bulk inserts
+
+The same seed always generates the same dataset, so benchmark runs made on
+different commits measure the same data. The inserts rely on bulk_create
+setting the primary keys of the rows, which PostgreSQL and SQLite do.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from itertools import batched
+from random import Random
+from typing import Callable, Iterator
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from rest_framework.authtoken.models import Token
+
+from ecomerce_project.reference_cache import category_cache, order_status_cache
+from ecomerce_project.response_cache import response_cache
+from products.autocomplete import product_name_index
+from products.cache_tags import CATEGORIES_TAG, PRODUCTS_TAG
+from products.models import Category, Product
+from shopping_and_payments.models import (
+    CartItem,
+    OrderLine,
+    OrderStatus,
+    ShoppingCart,
+    ShopOrder,
+)
+from users.models import Address, User
+
+# Password of every generated user, hashed only once for all of them
+PASSWORD: str = "seeded-password"
+ORDER_STATUSES: tuple[str, ...] = ("Pending", "Processing", "Completed", "Cancelled")
+
+ADJECTIVES: tuple[str, ...] = (
+    "Light", "Classic", "Waterproof", "Organic", "Vintage", "Compact",
+    "Wireless", "Leather", "Cotton", "Running", "Smart", "Wooden",
+)
+NOUNS: tuple[str, ...] = (
+    "shoes", "jacket", "socks", "lamp", "headphones", "backpack",
+    "watch", "mug", "chair", "keyboard", "bottle", "scarf",
+)
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    """Number of rows of each table in a generated dataset
+
+    Only the first carts users get a cart with items, and only the first
+    orders of those carts are checked out. The users left without a cart
+    are the shoppers available to the benchmark workloads.
+    """
+
+    users: int = 100
+    categories: int = 10
+    products: int = 1000
+    carts: int = 50
+    orders: int = 25
+    items_per_cart: int = 3
+
+
+@dataclass
+class Dataset:
+    """Ids of the generated rows the workloads need"""
+
+    category_ids: list[int] = field(default_factory=list)
+    product_ids: list[int] = field(default_factory=list)
+    # (user id, token key) of the users without a cart
+    shoppers: list[tuple[int, str]] = field(default_factory=list)
+
+
+def _token_key(rng: Random) -> str:
+    """Return a deterministic token key"""
+    return f"{rng.getrandbits(160):040x}"
+
+
+def _generate_products(
+    rng: Random, size: DatasetSize, category_ids: list[int]
+) -> Iterator[Product]:
+    """Yield the products of the dataset one at a time"""
+    for i in range(1, size.products + 1):
+        yield Product(
+            name=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            description=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} for every day",
+            price=round(rng.uniform(1, 500), 2),
+            quantity_in_stock=rng.randint(1_000, 100_000),
+            category_id=rng.choice(category_ids) if category_ids else None,
+        )
+
+
+def seed_dataset(
+    size: DatasetSize,
+    seed: int = 0,
+    batch_size: int = 1000,
+    collect: bool = True,
+    progress: Callable[[str, int], None] | None = None,
+) -> Dataset:
+    """Fill an empty database with a synthetic dataset
+
+    The rows are generated and inserted batch_size at a time, each batch in
+    its own transaction, so only one batch of model instances is in memory
+    at any time. Besides that only the product ids are kept, to fill the
+    carts, and with collect the ids the benchmark workloads need. Turn
+    collect off to keep the memory bounded for millions of users.
+
+    Every user gets the same password, hashed only once. progress is called
+    with the name of a table and the number of rows inserted in it so far.
+    """
+    rng: Random = Random(seed)
+    dataset: Dataset = Dataset()
+    report: Callable[[str, int], None] = progress or (lambda _table, _count: None)
+
+    with transaction.atomic():
+        status_ids: list[int] = [
+            OrderStatus.objects.get_or_create(name=name)[0].pk for name in ORDER_STATUSES
+        ]
+        category_ids: list[int] = [
+            category.pk
+            for category in Category.objects.bulk_create(
+                [Category(category_name=f"category{i}") for i in range(1, size.categories + 1)],
+                batch_size=batch_size,
+            )
+        ]
+    dataset.category_ids = category_ids
+    report("categories", len(category_ids))
+
+    product_ids: array = array("q")
+    for batch in batched(_generate_products(rng, size, category_ids), batch_size):
+        with transaction.atomic():
+            product_ids.extend(product.pk for product in Product.objects.bulk_create(batch))
+        report("products", len(product_ids))
+    if collect:
+        dataset.product_ids = product_ids.tolist()
+
+    password: str = make_password(PASSWORD)
+    for first in range(0, size.users, batch_size):
+        indexes: range = range(first, min(first + batch_size, size.users))
+        with transaction.atomic():
+            users: list[User] = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"user{i + 1}",
+                        email=f"user{i + 1}@example.com",
+                        password=password,
+                    )
+                    for i in indexes
+                ]
+            )
+            tokens: list[Token] = Token.objects.bulk_create(
+                [Token(key=_token_key(rng), user=user) for user in users]
+            )
+            Address.objects.bulk_create(
+                [
+                    Address(
+                        user=user,
+                        street=f"{rng.randint(1, 999)} Main street",
+                        city=f"City {rng.randint(1, 100)}",
+                        state="CA",
+                        zip_code=f"{rng.randint(10000, 99999)}",
+                        number=str(rng.randint(1, 99)),
+                    )
+                    for user in users
+                ]
+            )
+            _seed_carts(rng, size, indexes, users, product_ids, status_ids)
+
+        if collect:
+            dataset.shoppers.extend(
+                (token.user.pk, token.key)
+                for i, token in zip(indexes, tokens)
+                if i >= size.carts
+            )
+        report("users", indexes.stop)
+
+    # bulk_create does not send the signals keeping the in-process caches fresh
+    category_cache.invalidate()
+    order_status_cache.invalidate()
+    product_name_index.reset()
+    response_cache.purge(PRODUCTS_TAG, CATEGORIES_TAG)
+
+    return dataset
+
+
+def _seed_carts(
+    rng: Random,
+    size: DatasetSize,
+    indexes: range,
+    users: list[User],
+    product_ids: array,
+    status_ids: list[int],
+) -> None:
+    """Create the carts, and the orders, of a batch of users"""
+    carts: list[ShoppingCart] = ShoppingCart.objects.bulk_create(
+        [ShoppingCart(user=user) for i, user in zip(indexes, users) if i < size.carts]
+    )
+    if not carts:
+        return
+
+    items: list[CartItem] = [
+        CartItem(cart=cart, product_id=product_id, quantity=rng.randint(1, 3))
+        for cart in carts
+        for product_id in rng.sample(product_ids, min(size.items_per_cart, len(product_ids)))
+    ]
+    CartItem.objects.bulk_create(items)
+
+    # The first users of the batch are the ones whose cart is checked out
+    ordered: set[int] = {cart.pk for i, cart in zip(indexes, carts) if i < size.orders}
+    if not ordered:
+        return
+
+    products: dict[int, tuple[str, float]] = {
+        pk: (name, price)
+        for pk, name, price in Product.objects.filter(
+            pk__in={item.product_id for item in items if item.cart.pk in ordered}
+        ).values_list("pk", "name", "price")
+    }
+    totals: dict[int, float] = {}
+    for item in items:
+        if item.cart.pk in ordered:
+            totals[item.cart.pk] = (
+                totals.get(item.cart.pk, 0) + products[item.product_id][1] * item.quantity
+            )
+
+    orders: list[ShopOrder] = ShopOrder.objects.bulk_create(
+        [
+            ShopOrder(cart=cart, status_id=rng.choice(status_ids), total=totals.get(cart.pk, 0))
+            for cart in carts
+            if cart.pk in ordered
+        ]
+    )
+    order_ids: dict[int, int] = {order.cart_id: order.pk for order in orders}
+    OrderLine.objects.bulk_create(
+        [
+            OrderLine(
+                order_id=order_ids[item.cart.pk],
+                product_id=item.product_id,
+                product_name=products[item.product_id][0],
+                unit_price=products[item.product_id][1],
+                quantity=item.quantity,
+            )
+            for item in items
+            if item.cart.pk in ordered
+        ]
+    )
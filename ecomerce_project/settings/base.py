@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework.authtoken",
     # My apps
+    "ecomerce_project",
     "users",
     "products",
     "shopping_and_payments",
@@ -51,9 +52,73 @@ REST_FRAMEWORK = {
     ),
     "DEFAUTLT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated"),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
+    "DEFAULT_RENDERER_CLASSES": (
+        "ecomerce_project.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "ecomerce_project.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
+# Cache used for the read models. Local memory per process by default,
+# point it to a shared backend (Memcached, Redis, database) in production.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Seconds a shopping cart read model stays in the cache
+CART_CACHE_TIMEOUT = 300
+
+# Seconds a rendered anonymous catalog response stays in the cache, the
+# writes purge it before
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Seconds an expired, but not purged, catalog response is still served
+# while one worker builds it again
+RESPONSE_CACHE_STALE_TIMEOUT = 60
+
+# Seconds a worker holds the lock to build a cached value, and seconds the
+# other workers wait for it before building the value themselves
+SINGLE_FLIGHT_LOCK_TIMEOUT = 10
+SINGLE_FLIGHT_WAIT_TIMEOUT = 5
+
+# Seconds before the in-process copy of the reference tables (categories,
+# order statuses) is loaded again, even if their version did not change
+REFERENCE_CACHE_MAX_AGE = 60
+
+# Seconds before the in-process autocomplete index is rebuilt from the
+# database, to pick up the product changes made by other processes
+AUTOCOMPLETE_MAX_AGE = 600
+
+# Rows fetched from the database at a time by the products export
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows written to the database at a time by the products import
+IMPORT_BATCH_SIZE = 1000
+
+# Products changed by each UPDATE or DELETE of the bulk products endpoint
+BULK_UPDATE_BATCH_SIZE = 1000
+
+# How the checkout locks the product rows: "wait", "nowait" or "skip_locked".
+# Switch to "skip_locked" during flash sales to fail fast on contended products.
+CHECKOUT_LOCK_MODE = "wait"
+
+# Raise instead of logging when a request runs more queries than the budget
+# declared for its url. The test runner turns it on.
+QUERY_BUDGET_RAISE = False
+
+# Send the query count headers outside debug mode too, the benchmarks use them
+QUERY_COUNT_HEADERS = False
+
+TEST_RUNNER = "ecomerce_project.testing.QueryBudgetTestRunner"
+
 MIDDLEWARE = [
+    "ecomerce_project.middleware.QueryCountMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -0,0 +1,92 @@
+"""Single-flight locks: one worker at a time computes the value of a key
+
+A key is held with a lock local to the process, so its threads wait on a
+condition instead of polling, and with a lock in the shared cache, taken
+with cache.add, so only one process computes it. Both locks expire after
+SINGLE_FLIGHT_LOCK_TIMEOUT seconds, so a worker that dies while holding a
+key does not block it for good.
+"""
+
+import time
+from threading import Condition
+from typing import Any
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds between two tries to take the lock of the shared cache
+POLL_INTERVAL: float = 0.05
+
+
+class Flight:
+    """The locks of a key held by one worker, released once"""
+
+    def __init__(self, group: "SingleFlight", key: str, token: str) -> None:
+        self.group: "SingleFlight" = group
+        self.key: str = key
+        self.token: str = token
+        self.released: bool = False
+
+    def release(self, *_args: Any) -> None:
+        """Let the next worker take the key"""
+        if not self.released:
+            self.released = True
+            self.group._release(self)
+
+
+class SingleFlight:
+    """Locks of keys, held by one thread of one process at a time"""
+
+    def __init__(self, prefix: str = "flight") -> None:
+        self.prefix: str = prefix
+        self._condition: Condition = Condition()
+        # Token and deadline of the keys held by the threads of this process
+        self._held: dict[str, tuple[str, float]] = {}
+
+    def _lock_key(self, key: str) -> str:
+        """Return the cache key of the shared lock of a key"""
+        return f"{self.prefix}:{key}"
+
+    def acquire(self, key: str, wait: float | None = None) -> Flight | None:
+        """Take the key, waiting at most wait seconds for the worker holding it
+
+        wait defaults to SINGLE_FLIGHT_WAIT_TIMEOUT and 0 does not wait.
+        Returns None if the key is still held by another worker.
+        """
+        lock_timeout: float = settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+        deadline: float = time.monotonic() + (
+            settings.SINGLE_FLIGHT_WAIT_TIMEOUT if wait is None else wait
+        )
+        token: str = uuid4().hex
+
+        with self._condition:
+            while True:
+                now: float = time.monotonic()
+                held: tuple[str, float] | None = self._held.get(key)
+                if held is None or held[1] <= now:
+                    break
+                if now >= deadline:
+                    return None
+                self._condition.wait(min(held[1], deadline) - now)
+            self._held[key] = (token, time.monotonic() + lock_timeout)
+
+        while not cache.add(self._lock_key(key), token, timeout=lock_timeout):
+            if time.monotonic() + POLL_INTERVAL > deadline:
+                self._release_local(key, token)
+                return None
+            time.sleep(POLL_INTERVAL)
+        return Flight(self, key, token)
+
+    def _release(self, flight: Flight) -> None:
+        """Release the shared lock, if it was not taken over, then the local one"""
+        if cache.get(self._lock_key(flight.key)) == flight.token:
+            cache.delete(self._lock_key(flight.key))
+        self._release_local(flight.key, flight.token)
+
+    def _release_local(self, key: str, token: str) -> None:
+        """Release the local lock of a key and wake up its waiting threads"""
+        with self._condition:
+            if self._held.get(key, (None,))[0] == token:
+                del self._held[key]
+            self._condition.notify_all()
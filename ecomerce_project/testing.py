@@ -0,0 +1,23 @@
+"""Test utilities shared by the apps"""
+
+from typing import Any
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """Test runner failing the requests over the query budget of their url
+
+    QueryCountMiddleware raises QueryBudgetExceeded during the tests, so an
+    N+1 regression fails the test making the request.
+    """
+
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        super().setup_test_environment(**kwargs)
+        self._query_budget_settings = override_settings(QUERY_BUDGET_RAISE=True)
+        self._query_budget_settings.enable()
+
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        self._query_budget_settings.disable()
+        super().teardown_test_environment(**kwargs)
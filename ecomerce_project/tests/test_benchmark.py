@@ -0,0 +1,80 @@
+"""Test for the benchmark workload and its report"""
+
+from typing import Any, override
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from ecomerce_project.benchmark.drivers import ClientDriver
+from ecomerce_project.benchmark.report import compare, percentile, summarize
+from ecomerce_project.benchmark.workload import Sample, run_workload
+from ecomerce_project.seeding import Dataset, DatasetSize, seed_dataset
+from products.autocomplete import product_name_index
+from products.models import Product
+from shopping_and_payments.models import CartItem, ShopOrder
+from users.models import User
+
+
+class BenchmarkTest(TestCase):
+    """Test the seeded dataset, the workload and the report"""
+
+    @override
+    def setUp(self) -> None:
+        product_name_index.reset()
+        return super().setUp()
+
+    @override
+    def tearDown(self) -> None:
+        cache.clear()
+        return super().tearDown()
+
+    def test_seed_dataset(self) -> None:
+        """Test that the dataset has the requested size and is deterministic"""
+        size: DatasetSize = DatasetSize(users=8, products=20, carts=4, orders=2)
+
+        with transaction.atomic():
+            seed_dataset(size, seed=3)
+            names: list[str] = list(Product.objects.order_by("pk").values_list("name", flat=True))
+            transaction.set_rollback(True)
+
+        dataset: Dataset = seed_dataset(size, seed=3)
+
+        self.assertEqual(User.objects.count(), 8)
+        self.assertEqual(CartItem.objects.count(), 4 * size.items_per_cart)
+        self.assertEqual(ShopOrder.objects.count(), 2)
+        self.assertEqual(len(dataset.shoppers), 4)
+        self.assertEqual(list(Product.objects.order_by("pk").values_list("name", flat=True)), names)
+
+    @override_settings(QUERY_COUNT_HEADERS=True)
+    def test_workload_with_the_test_client(self) -> None:
+        """Test that a journey goes through every endpoint without errors"""
+        dataset: Dataset = seed_dataset(DatasetSize(users=6, products=30, carts=2, orders=1))
+
+        with ClientDriver() as driver:
+            samples, wall = run_workload(driver, dataset, sessions=2)
+        report: dict[str, Any] = summarize(samples, wall)
+
+        self.assertEqual(report["total"]["errors"], 0)
+        self.assertIn("POST create_order", report["endpoints"])
+        self.assertIn("PUT order_detail", report["endpoints"])
+        self.assertTrue(
+            all(summary["queries_per_request"] for summary in report["endpoints"].values())
+        )
+
+        with self.assertRaises(ValueError):
+            run_workload(driver, dataset, sessions=5)
+
+    def test_report(self) -> None:
+        """Test the percentiles and the comparison with a baseline"""
+        self.assertEqual(percentile([float(value) for value in range(1, 101)], 0.95), 95.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+        def run(duration: float, queries: int) -> dict[str, Any]:
+            samples: list[Sample] = [Sample("GET products-list", duration, 200, queries)] * 10
+            return {"report": summarize(samples, 1.0)}
+
+        baseline: dict[str, Any] = run(0.010, 2)
+        self.assertEqual(compare(baseline, run(0.0105, 2), tolerance=10)[1], [])
+        self.assertEqual(compare(baseline, run(0.020, 2), tolerance=10)[1], ["GET products-list"])
+        self.assertEqual(compare(baseline, run(0.010, 3), tolerance=10)[1], ["GET products-list"])
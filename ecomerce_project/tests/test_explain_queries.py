@@ -0,0 +1,61 @@
+"""Test for the explain_queries management command"""
+
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+
+class ExplainQueriesTest(TestCase):
+    """Test that the logged queries doing full scans are flagged"""
+
+    def _explain(self, log: str, *args: str) -> str:
+        """Run the command on a log and return its output"""
+        output: StringIO = StringIO()
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "queries.log"
+            path.write_text(log, encoding="utf-8")
+            call_command("explain_queries", str(path), *args, stdout=output, stderr=StringIO())
+        return output.getvalue()
+
+    def test_flag_full_scans(self) -> None:
+        """Test that only the queries without an index are flagged"""
+        log: str = "\n".join(
+            [
+                # django.db.backends log line, searched by the unique index
+                "(0.000) SELECT id FROM products_category WHERE category_name = 'shoes'; args=('shoes',); alias=default",
+                # JSON line, searched by the primary key
+                '{"sql": "SELECT name FROM products_product WHERE id = %s", "params": [1]}',
+                # Plain SQL, no index on the description
+                "SELECT id FROM products_product WHERE description LIKE '%wool%';",
+                "SELECT id FROM products_product WHERE description LIKE '%wool%';",
+                # Not explained
+                "INSERT INTO products_category (category_name) VALUES ('shoes');",
+            ]
+        )
+
+        output: str = self._explain(log)
+
+        self.assertIn("FULL SCAN on products_product (2x)", output)
+        self.assertNotIn("products_category", output)
+        self.assertIn("3 distinct queries, 1 with full scans.", output)
+
+    def test_indexed_lookups_are_not_flagged(self) -> None:
+        """Test that the lookups of the hot paths use their indexes"""
+        log: str = "\n".join(
+            [
+                "SELECT id FROM shopping_and_payments_orderstatus WHERE name = 'Pending'",
+                "SELECT id FROM shopping_and_payments_cartitem WHERE cart_id = 1 AND product_id = 2",
+                "SELECT id FROM shopping_and_payments_shoporder WHERE status_id = 1 ORDER BY order_date",
+            ]
+        )
+
+        self.assertIn("3 distinct queries, 0 with full scans.", self._explain(log))
+
+    def test_fail_on_scan(self) -> None:
+        """Test that the command fails when asked to and a query is flagged"""
+        with self.assertRaises(CommandError):
+            self._explain("SELECT * FROM products_product", "--fail-on-scan")
@@ -0,0 +1,57 @@
+"""Test for the query count middleware and the query budgets"""
+
+from importlib import import_module
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import URLPattern, reverse
+
+from rest_framework.test import APITestCase
+
+from ecomerce_project.middleware import QueryBudgetExceeded, get_query_budgets
+
+APPS_URLS: tuple[str, ...] = ("users.urls", "products.urls", "shopping_and_payments.urls")
+
+
+class QueryBudgetTest(APITestCase):
+    """Test that the requests are counted and checked against their budget"""
+
+    def test_every_route_has_a_budget(self) -> None:
+        """Test that a budget is declared for every named route of the apps"""
+        for module_name in APPS_URLS:
+            module = import_module(module_name)
+            for pattern in module.urlpatterns:
+                if isinstance(pattern, URLPattern) and pattern.name:
+                    with self.subTest(url=pattern.name):
+                        self.assertIn(pattern.name, module.query_budgets)
+                        self.assertIn(pattern.name, get_query_budgets())
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self) -> None:
+        """Test that the count, time and budget are sent in debug mode"""
+        response = self.client.get(reverse("product-detail", args=[1]))
+
+        self.assertEqual(response["X-DB-Query-Count"], "1")
+        self.assertTrue(response["X-DB-Query-Time"].endswith("ms"))
+        self.assertEqual(
+            response["X-DB-Query-Budget"], str(get_query_budgets()["product-detail"])
+        )
+
+    def test_no_headers_without_debug(self) -> None:
+        """Test that the headers are not sent outside debug mode"""
+        response = self.client.get(reverse("product-detail", args=[1]))
+
+        self.assertNotIn("X-DB-Query-Count", response)
+
+    def test_over_budget_fails_the_tests(self) -> None:
+        """Test that a request over its budget raises during the tests"""
+        with patch.dict(get_query_budgets(), {"products-list": 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("products-list"))
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_over_budget_is_logged(self) -> None:
+        """Test that a request over its budget is logged outside the tests"""
+        with patch.dict(get_query_budgets(), {"products-list": 0}):
+            with self.assertLogs("ecomerce_project.middleware", "WARNING"):
+                self.client.get(reverse("products-list"))
@@ -0,0 +1,84 @@
+"""Test for the reference tables cache"""
+
+from typing import override
+
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase, override_settings
+
+from ecomerce_project.reference_cache import category_cache, order_status_cache
+from products.models import Category
+from shopping_and_payments.models import OrderStatus
+
+
+class ReferenceCacheTest(TestCase):
+    """Test the lookups and the invalidation of the reference cache"""
+
+    @override
+    def tearDown(self) -> None:
+        cache.clear()
+        return super().tearDown()
+
+    def test_lookups_by_id_and_name_are_served_from_memory(self) -> None:
+        """Test that only the first lookup reads the table"""
+        shoes: Category = Category.objects.create(category_name="shoes")
+        Category.objects.create(category_name="shirts")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(category_cache.get(shoes.pk), shoes)
+            self.assertEqual(category_cache.get_by_name("shoes"), shoes)
+            self.assertEqual(
+                [category.category_name for category in category_cache.all()],
+                ["shoes", "shirts"],
+            )
+
+    def test_writes_invalidate_the_cache(self) -> None:
+        """Test that saved and deleted rows are seen on the next lookup"""
+        pending: OrderStatus = OrderStatus.objects.create(name="pending")
+        self.assertEqual(order_status_cache.get_by_name("pending"), pending)
+
+        pending.name = "processing"
+        pending.save()
+        self.assertIsNone(order_status_cache.get_by_name("pending"))
+        self.assertEqual(order_status_cache.get(pending.pk).name, "processing")
+
+        pending.delete()
+        self.assertEqual(order_status_cache.all(), [])
+
+    def test_other_processes_converge_through_the_version(self) -> None:
+        """Test that a bumped version reloads a cache loaded before"""
+        category_cache.get_by_name("shoes")
+        # A row written by another process, without signals in this one
+        Category.objects.bulk_create([Category(category_name="shoes")])
+        category_cache.invalidate()
+
+        with self.assertNumQueries(1):
+            self.assertIsNotNone(category_cache.get_by_name("shoes"))
+
+    @override_settings(REFERENCE_CACHE_MAX_AGE=0)
+    def test_rows_reloaded_after_max_age(self) -> None:
+        """Test that old rows are loaded again even if the version did not change"""
+        category_cache.all()
+        # A row written by a process whose version bump is not seen by this one
+        Category.objects.bulk_create([Category(category_name="shoes")])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(category_cache.all()), 1)
+
+    def test_version_bumped_on_commit(self) -> None:
+        """Test that other processes only reload the table once the write commits"""
+        category_cache.all()
+        version: int = cache.get(category_cache._version_key())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(category_name="shoes")
+            self.assertEqual(cache.get(category_cache._version_key()), version)
+
+        self.assertNotEqual(cache.get(category_cache._version_key()), version)
+
+    def test_get_or_404(self) -> None:
+        """Test that missing rows raise Http404"""
+        with self.assertRaises(Http404):
+            category_cache.get_or_404(name="missing")
+        with self.assertRaises(Http404):
+            category_cache.get_or_404(pk=1)
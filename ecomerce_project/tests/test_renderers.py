@@ -0,0 +1,98 @@
+"""Test for the orjson renderer and parser"""
+
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ecomerce_project import renderers
+from ecomerce_project.benchmark.renderers import (
+    format_timings,
+    product_list_payload,
+    time_payload,
+    user_list_payload,
+)
+from ecomerce_project.renderers import FastJSONParser, FastJSONRenderer
+from ecomerce_project.seeding import DatasetSize, seed_dataset
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """Test that the fast renderer and parser behave like the stock ones"""
+
+    payload: dict = {
+        "price": Decimal("10.50"),
+        "created_at": datetime(2024, 7, 1, 12, 30, tzinfo=timezone.utc),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "errors": {1: {"price": "A valid number is required."}},
+        "name": "Shoes ñ",
+        "results": [1, 2.5, None, True],
+    }
+
+    def test_render(self) -> None:
+        """Test that the output decodes to the same data as the stock one"""
+        rendered: bytes = FastJSONRenderer().render(self.payload)
+
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(self.payload)))
+        self.assertEqual(json.loads(rendered)["created_at"], "2024-07-01T12:30:00Z")
+        self.assertIn(b"\\u2028", rendered)
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_render_indented(self) -> None:
+        """Test that indented output is left to the stock renderer"""
+        rendered: bytes = FastJSONRenderer().render(
+            {"a": 1}, "application/json; indent=4", {}
+        )
+
+        self.assertEqual(rendered, b'{\n    "a": 1\n}')
+
+    def test_parse(self) -> None:
+        """Test that the body is decoded and invalid JSON is rejected"""
+        parser: FastJSONParser = FastJSONParser()
+
+        self.assertEqual(parser.parse(io.BytesIO(b'{"ids": [1, 2]}')), {"ids": [1, 2]})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"ids": [1, 2'))
+
+        body: bytes = '{"name": "é"}'.encode("latin-1")
+        self.assertEqual(
+            parser.parse(io.BytesIO(body), parser_context={"encoding": "latin-1"}),
+            JSONParser().parse(io.BytesIO(body), parser_context={"encoding": "latin-1"}),
+        )
+
+    def test_without_orjson(self) -> None:
+        """Test that the stock json module is used when orjson is missing"""
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(
+                FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload)
+            )
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b"[1]")), [1])
+
+
+class RendererBenchmarkTest(TestCase):
+    """Test the payloads and the timings of the renderers benchmark"""
+
+    def test_time_payloads(self) -> None:
+        """Test that both payloads are timed with both implementations"""
+        seed_dataset(DatasetSize(users=3, products=5, carts=0, orders=0))
+
+        products: dict[str, Any] = product_list_payload(4)
+        users: list[Any] = user_list_payload(10)
+        self.assertEqual(len(products["results"]), 4)
+        self.assertEqual(len(users), 3)
+
+        results: dict[str, dict[str, float]] = time_payload(products, repeat=1)
+        self.assertEqual(set(results), {"stock", "fast"})
+        self.assertEqual(results["stock"]["bytes"], results["fast"]["bytes"])
+
+        lines: list[str] = format_timings("ProductListView", results)
+        self.assertEqual(lines[0], "ProductListView")
+        self.assertTrue(lines[1].startswith("  render"))
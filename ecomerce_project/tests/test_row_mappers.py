@@ -0,0 +1,90 @@
+"""Test for the serializer-free row mappers"""
+
+from typing import Any
+
+from django.test import TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from ecomerce_project.row_mappers import RowMapper, get_row_mapper
+from products.models import Category, Product
+from products.serializers import CategorySerializer, ProductSerializer
+from shopping_and_payments.serializers import ShopOrderSerializer
+from users.models import Address, User
+from users.serializers import AddressSerializer
+
+
+class RowMapperTest(TestCase):
+    """Test that the mapped rows render like the serializers"""
+
+    def assertSameJSON(self, mapped: Any, serialized: Any) -> None:
+        """Check that both render to the same bytes"""
+        renderer: JSONRenderer = JSONRenderer()
+        self.assertEqual(renderer.render(mapped), renderer.render(serialized))
+
+    def test_products(self) -> None:
+        """Test the nested category, missing or not, and the null columns"""
+        category: Category = Category.objects.create(category_name="shoes")
+        Product.objects.create(
+            name="Boots", description="Warm", price=80.5, quantity_in_stock=2, category=category
+        )
+        Product.objects.create(name="Socks", price=5, quantity_in_stock=0)
+        products = Product.objects.select_related("category").order_by("pk")
+
+        mapper: RowMapper = get_row_mapper(ProductSerializer)
+
+        self.assertEqual(
+            mapper.columns,
+            [
+                "id",
+                "category",
+                "category__id",
+                "category__category_name",
+                "name",
+                "description",
+                "price",
+                "quantity_in_stock",
+            ],
+        )
+        self.assertSameJSON(
+            mapper.map(mapper.rows(Product.objects.order_by("pk"))),
+            ProductSerializer(products, many=True).data,
+        )
+
+        narrow: RowMapper = get_row_mapper(ProductSerializer, ("id", "price"))
+        self.assertSameJSON(
+            narrow.map(narrow.rows(Product.objects.order_by("pk"), "name")),
+            ProductSerializer(products, many=True, fields=("id", "price")).data,
+        )
+
+    def test_categories_from_instances(self) -> None:
+        """Test that loaded instances are mapped like rows"""
+        Category.objects.bulk_create(
+            [Category(category_name="shoes"), Category(category_name="hats")]
+        )
+        categories: list[Category] = list(Category.objects.order_by("pk"))
+
+        mapped: list[dict[str, Any]] = get_row_mapper(CategorySerializer).map_instances(
+            categories
+        )
+
+        self.assertSameJSON(mapped, CategorySerializer(categories, many=True).data)
+
+    def test_addresses(self) -> None:
+        """Test the primary key relation, set or not"""
+        user: User = User.objects.create_user(username="user", email="user@test.com")
+        Address.objects.create(
+            user=user, street="Main", city="Town", state="CA", zip_code="1", number="2"
+        )
+        Address.objects.create(street="Side", city="Town", state="CA", zip_code="1", number="3")
+        mapper: RowMapper = get_row_mapper(AddressSerializer)
+
+        self.assertSameJSON(
+            mapper.map(mapper.rows(Address.objects.order_by("pk"))),
+            AddressSerializer(Address.objects.order_by("pk"), many=True).data,
+        )
+
+    def test_unsupported_serializer(self) -> None:
+        """Test that a many=True field is refused when the mapper is built"""
+        with self.assertRaises(TypeError):
+            RowMapper(ShopOrderSerializer())
@@ -0,0 +1,63 @@
+"""Test for the seed_data management command"""
+
+from io import StringIO
+from typing import override
+
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ecomerce_project.seeding import PASSWORD
+from products.models import Product
+from shopping_and_payments.models import CartItem, OrderLine, ShoppingCart, ShopOrder
+from users.models import Address, User
+
+
+class SeedDataTest(TestCase):
+    """Test that the dataset is generated in batches"""
+
+    @override
+    def tearDown(self) -> None:
+        cache.clear()
+        return super().tearDown()
+
+    def _seed(self) -> str:
+        """Seed a small dataset in batches of two rows"""
+        output: StringIO = StringIO()
+        call_command(
+            "seed_data",
+            users=7,
+            products=9,
+            carts=5,
+            orders=3,
+            items_per_cart=2,
+            batch_size=2,
+            stdout=output,
+        )
+        return output.getvalue()
+
+    def test_seed_data(self) -> None:
+        """Test that every table gets the requested rows"""
+        output: str = self._seed()
+
+        self.assertIn("products: 9", output)
+        self.assertEqual(User.objects.count(), 7)
+        self.assertEqual(Address.objects.count(), 7)
+        self.assertEqual(Product.objects.count(), 9)
+        self.assertEqual(ShoppingCart.objects.count(), 5)
+        self.assertEqual(CartItem.objects.count(), 10)
+        self.assertEqual(ShopOrder.objects.count(), 3)
+        self.assertEqual(OrderLine.objects.count(), 6)
+        self.assertIsNotNone(authenticate(username="user7", password=PASSWORD))
+
+        for order in ShopOrder.objects.all():
+            self.assertAlmostEqual(order.total, order.total_price())
+
+    def test_seed_data_twice(self) -> None:
+        """Test that seeding a database already seeded fails cleanly"""
+        self._seed()
+
+        with self.assertRaises(CommandError):
+            self._seed()
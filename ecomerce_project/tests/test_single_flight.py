@@ -0,0 +1,71 @@
+"""Test for the single-flight locks"""
+
+import time
+from threading import Thread
+from typing import override
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ecomerce_project.single_flight import Flight, SingleFlight
+
+
+class SingleFlightTest(SimpleTestCase):
+    """Test that a key is computed by one worker at a time"""
+
+    @override
+    def tearDown(self) -> None:
+        cache.clear()
+        return super().tearDown()
+
+    def test_concurrent_misses_compute_once(self) -> None:
+        """Test that the threads waiting for a key find its value computed"""
+        flights: SingleFlight = SingleFlight("test")
+        values: dict[str, int] = {}
+        computed: list[int] = []
+
+        def read() -> None:
+            flight: Flight | None = flights.acquire("key")
+            if "key" not in values:
+                time.sleep(0.05)
+                computed.append(1)
+                values["key"] = 1
+            flight.release()
+
+        threads: list[Thread] = [Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(computed, [1])
+
+    def test_held_key(self) -> None:
+        """Test that a held key is refused without waiting, and taken once released"""
+        flights: SingleFlight = SingleFlight("test")
+        flight: Flight | None = flights.acquire("key")
+
+        self.assertIsNone(flights.acquire("key", wait=0))
+        self.assertIsNotNone(flights.acquire("other", wait=0))
+
+        flight.release()
+        flight.release()
+        self.assertIsNotNone(flights.acquire("key", wait=0))
+
+    def test_held_by_another_process(self) -> None:
+        """Test that the lock of the shared cache is waited for too"""
+        cache.add("test:key", "token", timeout=None)
+        flights: SingleFlight = SingleFlight("test")
+
+        self.assertIsNone(flights.acquire("key", wait=0.1))
+
+        cache.delete("test:key")
+        self.assertIsNotNone(flights.acquire("key", wait=0))
+
+    @override_settings(SINGLE_FLIGHT_LOCK_TIMEOUT=0.1)
+    def test_expired_lock_is_taken_over(self) -> None:
+        """Test that a worker dying with a key does not hold it for good"""
+        flights: SingleFlight = SingleFlight("test")
+        flights.acquire("key")
+
+        self.assertIsNotNone(flights.acquire("key", wait=1))
@@ -0,0 +1,265 @@
+"""In-process prefix index for the products name autocomplete"""
+
+from bisect import bisect_left, bisect_right, insort
+from heapq import nlargest
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Count
+
+from products.models import Product
+
+# Prefixes up to this length match too many names to rank them on every
+# keystroke, so their suggestions are memoized until the index changes.
+MEMOIZED_PREFIX_LENGTH: int = 2
+
+# Entries per bucket of the sorted index, a bucket is split at twice this
+BUCKET_SIZE: int = 1000
+
+# A name key, the product found by it, its name and its popularity, sorted by
+# key and product id
+Entry = tuple[str, int, str, int]
+
+
+def _name_keys(name: str) -> list[str]:
+    """Return the keys a name is found by, one starting at each word"""
+    words: list[str] = name.casefold().split()
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+
+class _Snapshot(NamedTuple):
+    """One version of the index, never changed once published
+
+    The entries are kept in sorted buckets, firsts holds the first entry of
+    each one, so a write copies one bucket and the lists of buckets instead
+    of the whole index.
+    """
+
+    buckets: list[list[Entry]]
+    firsts: list[Entry]
+    # Filled by the searches of this version only
+    memo: dict[tuple[str, int], list[tuple[int, str]]]
+
+
+_EMPTY: _Snapshot = _Snapshot([], [], {})
+
+
+def _bucket_of(firsts: list[Entry], entry: Entry | tuple[str, int]) -> int:
+    """Return the index of the bucket an entry belongs to"""
+    return max(bisect_right(firsts, entry) - 1, 0)
+
+
+def _insert(snapshot: _Snapshot, entry: Entry) -> _Snapshot:
+    """Return a new snapshot with an entry added"""
+    if not snapshot.buckets:
+        return _Snapshot([[entry]], [entry], {})
+    buckets: list[list[Entry]] = list(snapshot.buckets)
+    firsts: list[Entry] = list(snapshot.firsts)
+    position: int = _bucket_of(firsts, entry)
+    bucket: list[Entry] = list(buckets[position])
+    insort(bucket, entry)
+    if len(bucket) > 2 * BUCKET_SIZE:
+        buckets[position : position + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+        firsts[position : position + 1] = [bucket[0], bucket[BUCKET_SIZE]]
+    else:
+        buckets[position] = bucket
+        firsts[position] = bucket[0]
+    return _Snapshot(buckets, firsts, {})
+
+
+def _delete(snapshot: _Snapshot, key: str, pk: int) -> _Snapshot:
+    """Return a new snapshot without the entry of a key and a product"""
+    if not snapshot.buckets:
+        return snapshot
+    # (key, pk) sorts before its entry, which may be the first of a bucket
+    position: int = bisect_left(snapshot.firsts, (key, pk))
+    if position == len(snapshot.firsts) or snapshot.firsts[position][:2] != (key, pk):
+        position = max(position - 1, 0)
+    bucket: list[Entry] = snapshot.buckets[position]
+    index: int = bisect_left(bucket, (key, pk))
+    if index == len(bucket) or bucket[index][:2] != (key, pk):
+        return snapshot
+    buckets: list[list[Entry]] = list(snapshot.buckets)
+    firsts: list[Entry] = list(snapshot.firsts)
+    bucket = bucket[:index] + bucket[index + 1 :]
+    if bucket:
+        buckets[position] = bucket
+        firsts[position] = bucket[0]
+    else:
+        del buckets[position]
+        del firsts[position]
+    return _Snapshot(buckets, firsts, {})
+
+
+class ProductNameIndex:
+    """Sorted buckets of the products name keys searched with bisect
+
+    Every word of a name starts a key, so "Running shoes" is suggested both
+    for "run" and for "sho". Suggestions are ranked by popularity, the number
+    of carts holding the product. The index is built from the database on
+    first use, kept up to date by the product signals of this process and
+    rebuilt after AUTOCOMPLETE_MAX_AGE seconds to pick up the changes made
+    by other processes and the new popularity scores.
+
+    The writes copy the buckets they change and publish a new snapshot, so a
+    search reads one snapshot without locking. One thread at a time rebuilds
+    the index, the others search the previous snapshot meanwhile. Every
+    write gets a generation number, and the writes made while the index was
+    being read from the database are applied again to the new index.
+    """
+
+    __slots__ = (
+        "_snapshot",
+        "_products",
+        "_built_at",
+        "_generation",
+        "_reset_generation",
+        "_writes",
+        "_builds",
+        "_lock",
+        "_build_lock",
+    )
+
+    def __init__(self) -> None:
+        self._snapshot: _Snapshot = _EMPTY
+        # Name and popularity of the indexed products, only read by the writes
+        self._products: dict[int, tuple[str, int]] = {}
+        self._built_at: float | None = None
+        self._generation: int = 0
+        self._reset_generation: int = 0
+        # Writes made while a build runs: generation, id, and name or None
+        self._writes: list[tuple[int, int, str | None]] = []
+        self._builds: int = 0
+        self._lock: Lock = Lock()
+        self._build_lock: Lock = Lock()
+
+    def build(self) -> None:
+        """Build the index from the database"""
+        with self._lock:
+            self._builds += 1
+            started: int = self._generation
+        try:
+            products: dict[int, tuple[str, int]] = {
+                pk: (name, popularity)
+                for pk, name, popularity in Product.objects.annotate(
+                    popularity=Count("cartitem")
+                )
+                .values_list("pk", "name", "popularity")
+                .iterator(chunk_size=10_000)
+            }
+            entries: list[Entry] = sorted(
+                (key, pk, name, popularity)
+                for pk, (name, popularity) in products.items()
+                for key in _name_keys(name)
+            )
+            buckets: list[list[Entry]] = [
+                entries[start : start + BUCKET_SIZE]
+                for start in range(0, len(entries), BUCKET_SIZE)
+            ]
+            snapshot: _Snapshot = _Snapshot(buckets, [bucket[0] for bucket in buckets], {})
+
+            with self._lock:
+                # A reset while reading, like an import, makes the rows outdated
+                if self._reset_generation <= started:
+                    self._snapshot, self._products = snapshot, products
+                    for generation, pk, name in self._writes:
+                        if generation > started:
+                            self._apply(pk, name)
+                    self._built_at = monotonic()
+        finally:
+            with self._lock:
+                self._builds -= 1
+                if not self._builds:
+                    self._writes.clear()
+
+    def _build_if_stale(self) -> None:
+        """Build the index if it is missing or too old, in one thread at a time
+
+        A missing index is waited for, an old one keeps being searched while
+        another thread builds the new one.
+        """
+        built_at: float | None = self._built_at
+        if built_at is not None and monotonic() - built_at <= settings.AUTOCOMPLETE_MAX_AGE:
+            return
+        if not self._build_lock.acquire(blocking=built_at is None):
+            return
+        try:
+            # Another thread may have built it while this one waited
+            if self._built_at == built_at:
+                self.build()
+        finally:
+            self._build_lock.release()
+
+    def reset(self) -> None:
+        """Empty the index, it will be built again on the next search"""
+        with self._lock:
+            self._generation += 1
+            self._reset_generation = self._generation
+            self._snapshot, self._products = _EMPTY, {}
+            self._built_at = None
+
+    def update(self, pk: int, name: str) -> None:
+        """Add a product to the index or change its name"""
+        self._write(pk, name)
+
+    def remove(self, pk: int) -> None:
+        """Take a product out of the index"""
+        self._write(pk, None)
+
+    def _write(self, pk: int, name: str | None) -> None:
+        """Apply a write to the index, and record it for the running builds"""
+        with self._lock:
+            self._generation += 1
+            if self._builds:
+                self._writes.append((self._generation, pk, name))
+            if self._built_at is not None:
+                self._apply(pk, name)
+
+    def _apply(self, pk: int, name: str | None) -> None:
+        """Change the name of a product, None removes it, the lock must be held"""
+        snapshot: _Snapshot = self._snapshot
+        popularity: int = 0
+        if pk in self._products:
+            old_name, popularity = self._products.pop(pk)
+            for key in _name_keys(old_name):
+                snapshot = _delete(snapshot, key, pk)
+        if name is not None:
+            self._products[pk] = (name, popularity)
+            for key in _name_keys(name):
+                snapshot = _insert(snapshot, (key, pk, name, popularity))
+        self._snapshot = _Snapshot(snapshot.buckets, snapshot.firsts, {})
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """Return the (id, name) of the most popular products matching a prefix"""
+        prefix = " ".join(prefix.casefold().split())
+        if not prefix:
+            return []
+
+        self._build_if_stale()
+        snapshot: _Snapshot = self._snapshot
+
+        memoized: list[tuple[int, str]] | None = snapshot.memo.get((prefix, limit))
+        if memoized is not None:
+            return memoized
+
+        end: tuple[str] = (prefix + "\U0010ffff",)
+        matches: dict[int, tuple[str, int]] = {}
+        position: int = _bucket_of(snapshot.firsts, (prefix,))
+        while position < len(snapshot.buckets) and snapshot.firsts[position] < end:
+            bucket: list[Entry] = snapshot.buckets[position]
+            start: int = bisect_left(bucket, (prefix,))
+            for _key, pk, name, popularity in bucket[start : bisect_left(bucket, end, start)]:
+                matches[pk] = (name, popularity)
+            position += 1
+
+        best: list[int] = nlargest(limit, matches, key=lambda pk: (matches[pk][1], -pk))
+        suggestions: list[tuple[int, str]] = [(pk, matches[pk][0]) for pk in best]
+
+        if len(prefix) <= MEMOIZED_PREFIX_LENGTH:
+            snapshot.memo[(prefix, limit)] = suggestions
+        return suggestions
+
+
+product_name_index: ProductNameIndex = ProductNameIndex()
@@ -0,0 +1,192 @@
+"""Bulk price and stock updates and bulk deletes of products
+
+Repricing runs and stock syncs send hundreds of thousands of rows at once,
+so the rows are validated without serializers and each batch is written
+with a single UPDATE ... SET price = CASE id WHEN ... END statement.
+"""
+
+import math
+from functools import partial
+from itertools import batched
+from typing import Any, Iterable
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from products.cache_tags import purge_products
+from products.importer import integer_range
+from products.models import Product
+from shopping_and_payments.cart_cache import bump_cart_versions, carts_holding
+
+# Fields a bulk update can change, with their type
+BULK_UPDATE_FIELDS: dict[str, type] = {"price": float, "quantity_in_stock": int}
+
+
+def _parse_id(value: Any) -> int:
+    """Return a product id or raise ValueError"""
+    high: int = integer_range("id")[1]
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= high:
+        raise ValueError(f"A valid positive integer no greater than {high} is required.")
+    return value
+
+
+def _parse_value(name: str, kind: type, value: Any) -> Any:
+    """Return the value of a field converted to its type, or raise ValueError
+
+    The integers are checked against the range of their column and the
+    numbers too large for a float are rejected, both would overflow in the
+    UPDATE.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("A valid number is required.")
+    if kind is int:
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError("A valid integer is required.")
+        low, high = integer_range(name)
+        if not low <= value <= high:
+            raise ValueError(f"Ensure this value is between {low} and {high}.")
+        return int(value)
+    try:
+        number: float = float(value)
+    except OverflowError:
+        number = math.inf
+    if not math.isfinite(number) or number < 0:
+        raise ValueError("A valid positive number is required.")
+    return number
+
+
+def parse_bulk_updates(
+    items: Any,
+) -> tuple[dict[int, dict[str, Any]], dict[int, dict[str, str]]]:
+    """Validate the items of a bulk update
+
+    Returns the changes by product id, the last item wins when an id is
+    repeated, and the errors by index of the invalid items.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("A non-empty list of items is required.")
+
+    updates: dict[int, dict[str, Any]] = {}
+    errors: dict[int, dict[str, str]] = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {"non_field_errors": "Expected an object."}
+            continue
+
+        item_errors: dict[str, str] = {}
+        changes: dict[str, Any] = {}
+        pk: int = 0
+        try:
+            pk = _parse_id(item.get("id"))
+        except ValueError as error:
+            item_errors["id"] = str(error)
+
+        for name, kind in BULK_UPDATE_FIELDS.items():
+            if item.get(name) is None:
+                continue
+            try:
+                changes[name] = _parse_value(name, kind, item[name])
+            except ValueError as error:
+                item_errors[name] = str(error)
+
+        if not changes and not item_errors:
+            item_errors["non_field_errors"] = (
+                f"At least one of {', '.join(BULK_UPDATE_FIELDS)} is required."
+            )
+        if item_errors:
+            errors[index] = item_errors
+        else:
+            updates.setdefault(pk, {}).update(changes)
+
+    return updates, errors
+
+
+def parse_bulk_ids(ids: Any) -> list[int]:
+    """Validate the ids of a bulk delete"""
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("A non-empty list of ids is required.")
+    return [_parse_id(pk) for pk in ids]
+
+
+def _update_batch(changes: dict[int, dict[str, Any]]) -> int:
+    """Run the UPDATE of a batch and return the number of updated rows
+
+    The statement is written by hand: resolving a Case(When(...)) per row
+    through the ORM costs more than running the whole UPDATE.
+    """
+    table: str = connection.ops.quote_name(Product._meta.db_table)
+    pk_column: str = connection.ops.quote_name(Product._meta.pk.column)
+    assignments: list[str] = []
+    params: list[Any] = []
+    for name in BULK_UPDATE_FIELDS:
+        whens: list[tuple[int, Any]] = [
+            (pk, item[name]) for pk, item in changes.items() if name in item
+        ]
+        if not whens:
+            continue
+        column: str = connection.ops.quote_name(Product._meta.get_field(name).column)
+        assignments.append(
+            f"{column} = CASE {pk_column} "
+            + " ".join(["WHEN %s THEN %s"] * len(whens))
+            + f" ELSE {column} END"
+        )
+        params.extend(value for when in whens for value in when)
+
+    # auto_now is only applied by save(), the statement sets it itself
+    updated_at: Any = Product._meta.get_field("updated_at")
+    assignments.append(f"{connection.ops.quote_name(updated_at.column)} = %s")
+    params.append(updated_at.get_db_prep_value(timezone.now(), connection))
+    params.extend(changes)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {', '.join(assignments)} "
+            f"WHERE {pk_column} IN ({', '.join(['%s'] * len(changes))})",
+            params,
+        )
+        return cursor.rowcount
+
+
+@transaction.atomic
+def bulk_update_products(
+    updates: dict[int, dict[str, Any]], batch_size: int = 1000
+) -> tuple[int, list[int]]:
+    """Apply the changes by id, batch_size products per UPDATE
+
+    All the batches run in one transaction. Returns the number of updated
+    products and the ids that do not exist.
+    """
+    updated: int = 0
+    not_found: list[int] = []
+    for batch in batched(updates, batch_size):
+        existing: set[int] = set(
+            Product.objects.filter(pk__in=batch).values_list("pk", flat=True)
+        )
+        not_found.extend(pk for pk in batch if pk not in existing)
+        if existing:
+            updated += _update_batch({pk: updates[pk] for pk in batch if pk in existing})
+            # The raw UPDATE does not send the signals purging the responses
+            purge_products(existing)
+    return updated, sorted(not_found)
+
+
+@transaction.atomic
+def bulk_delete_products(ids: Iterable[int], batch_size: int = 1000) -> tuple[int, list[int]]:
+    """Delete the products by id, batch_size at a time, in one transaction
+
+    Returns the number of deleted products and the ids that do not exist.
+    """
+    deleted: int = 0
+    not_found: list[int] = []
+    for batch in batched(dict.fromkeys(ids), batch_size):
+        existing: set[int] = set(
+            Product.objects.filter(pk__in=batch).values_list("pk", flat=True)
+        )
+        not_found.extend(pk for pk in batch if pk not in existing)
+        # The cascade deletes the cart items without bumping their carts
+        cart_ids: set[int] = carts_holding(existing)
+        deleted += Product.objects.filter(pk__in=existing).delete()[1].get(
+            Product._meta.label, 0
+        )
+        transaction.on_commit(partial(bump_cart_versions, cart_ids))
+    return deleted, sorted(not_found)
@@ -0,0 +1,37 @@
+"""Response cache tags of the catalog and their purges
+
+The product lists are tagged with PRODUCTS_TAG and the categories shown in
+them, a product detail with its product and category, and the categories
+list with CATEGORIES_TAG.
+"""
+
+from typing import Any, Iterable
+
+from ecomerce_project.response_cache import response_cache
+
+PRODUCTS_TAG: str = "products"
+CATEGORIES_TAG: str = "categories"
+
+
+def product_tag(pk: Any) -> str:
+    """Return the tag of the responses showing a product"""
+    return f"product:{pk}"
+
+
+def category_tag(pk: Any) -> str:
+    """Return the tag of the responses showing a category"""
+    return f"category:{pk}"
+
+
+def purge_products(ids: Iterable[Any]) -> None:
+    """Purge the responses showing the products, and every product list
+
+    The writes that bypass the model signals, bulk_create() and update(),
+    must call it themselves.
+    """
+    response_cache.purge(PRODUCTS_TAG, *[product_tag(pk) for pk in ids])
+
+
+def purge_category(pk: Any) -> None:
+    """Purge the responses showing a category, and the categories list"""
+    response_cache.purge(CATEGORIES_TAG, category_tag(pk))
@@ -0,0 +1,113 @@
+"""Streaming export of the products catalog
+
+The products are read with QuerySet.iterator(), which uses a server side
+cursor on PostgreSQL and fetches chunk_size rows at a time elsewhere, and
+written out as soon as they are read. Only one chunk of rows and one
+output buffer are in memory at any time, whatever the size of the catalog.
+"""
+
+import csv
+import json
+import zlib
+from typing import Any, Callable, Iterable, Iterator
+
+from django.db.models import QuerySet
+
+from products.models import Product
+
+EXPORT_FIELDS: tuple[str, ...] = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "quantity_in_stock",
+    "category",
+)
+
+# Bytes gathered before handing a piece of the export to the server
+BUFFER_SIZE: int = 64 * 1024
+
+
+class _Echo:
+    """File-like object returning what is written to it, for csv.writer"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_rows(queryset: QuerySet, chunk_size: int) -> Iterator[tuple[Any, ...]]:
+    """Yield the exported values of each product, the category by name"""
+    return (
+        queryset.order_by("pk")
+        .values_list(
+            "id",
+            "name",
+            "description",
+            "price",
+            "quantity_in_stock",
+            "category__category_name",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def csv_lines(rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    """Yield a CSV header and a line for each row"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    """Yield a JSON object on its own line for each row"""
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n"
+
+
+# Line writer and content type of each export format
+EXPORT_FORMATS: dict[str, tuple[Callable[[Iterable], Iterator[str]], str]] = {
+    "csv": (csv_lines, "text/csv"),
+    "ndjson": (ndjson_lines, "application/x-ndjson"),
+}
+COMPRESSIONS: tuple[str, ...] = ("gzip",)
+
+
+def _buffered(lines: Iterable[str]) -> Iterator[bytes]:
+    """Join the lines into pieces of about BUFFER_SIZE bytes"""
+    buffer: list[bytes] = []
+    size: int = 0
+    for line in lines:
+        data: bytes = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzipped(pieces: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a stream of bytes into a gzip stream"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for piece in pieces:
+        compressed: bytes = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_products(
+    export_format: str,
+    compress: str | None = None,
+    chunk_size: int = 2000,
+    queryset: QuerySet | None = None,
+) -> Iterator[bytes]:
+    """Stream the products in the given format, optionally compressed"""
+    write_lines, _content_type = EXPORT_FORMATS[export_format]
+    rows: Iterator[tuple[Any, ...]] = export_rows(
+        Product.objects.all() if queryset is None else queryset, chunk_size
+    )
+    pieces: Iterator[bytes] = _buffered(write_lines(rows))
+    return _gzipped(pieces) if compress == "gzip" else pieces
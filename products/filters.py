@@ -0,0 +1,73 @@
+"""Filters and facet counts for the products list"""
+
+from typing import Any
+
+from django.db.models import Count, Q, QuerySet
+
+# Lower bounds of the price facet buckets, the last one has no upper bound
+PRICE_BUCKETS: tuple[int, ...] = (0, 10, 25, 50, 100, 250, 500)
+
+
+def filter_products(queryset: QuerySet, filters: dict[str, Any]) -> QuerySet:
+    """Apply the validated filters of ProductFilterSerializer to a queryset"""
+    if filters.get("category") is not None:
+        queryset = queryset.filter(category_id=filters["category"])
+    if filters.get("price__gte") is not None:
+        queryset = queryset.filter(price__gte=filters["price__gte"])
+    if filters.get("price__lte") is not None:
+        queryset = queryset.filter(price__lte=filters["price__lte"])
+    if filters.get("in_stock") is True:
+        queryset = queryset.filter(quantity_in_stock__gt=0)
+    elif filters.get("in_stock") is False:
+        queryset = queryset.filter(quantity_in_stock__lte=0)
+    return queryset
+
+
+def _price_range(index: int) -> tuple[int, int | None]:
+    """Return the lower and upper bounds of a price bucket"""
+    upper: int | None = (
+        PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None
+    )
+    return PRICE_BUCKETS[index], upper
+
+
+def product_facets(queryset: QuerySet) -> dict[str, Any]:
+    """Count the products of a queryset by category, price bucket and stock
+
+    Takes two queries whatever the number of categories or buckets: a
+    GROUP BY for the categories and one aggregate for everything else.
+    """
+    queryset = queryset.order_by()
+
+    categories: list[dict[str, Any]] = [
+        {"id": category_id, "category_name": category_name, "count": count}
+        for category_id, category_name, count in queryset.values_list(
+            "category_id", "category__category_name"
+        )
+        .annotate(count=Count("id"))
+        .order_by("category_id")
+    ]
+
+    aggregates: dict[str, Count] = {"total": Count("id")}
+    aggregates["in_stock"] = Count("id", filter=Q(quantity_in_stock__gt=0))
+    for index in range(len(PRICE_BUCKETS)):
+        lower, upper = _price_range(index)
+        condition: Q = Q(price__gte=lower)
+        if upper is not None:
+            condition &= Q(price__lt=upper)
+        aggregates[f"price_{index}"] = Count("id", filter=condition)
+    counts: dict[str, int] = queryset.aggregate(**aggregates)
+
+    return {
+        "total": counts["total"],
+        "in_stock": counts["in_stock"],
+        "categories": categories,
+        "price": [
+            {
+                "min": _price_range(index)[0],
+                "max": _price_range(index)[1],
+                "count": counts[f"price_{index}"],
+            }
+            for index in range(len(PRICE_BUCKETS))
+        ],
+    }
@@ -0,0 +1,294 @@
+"""Bulk import of products from CSV or NDJSON files
+
+The file is read as a stream and the valid rows are written batch_size at
+a time: the rows with an id are upserted with a single INSERT ... ON
+CONFLICT (id) DO UPDATE and the ones without an id are inserted. Invalid
+rows are reported with their line number and do not stop the import.
+"""
+
+import csv
+import json
+import math
+from dataclasses import dataclass, field
+from itertools import batched
+from typing import Any, Iterable, Iterator
+
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, transaction
+
+from ecomerce_project.reference_cache import category_cache
+from products.autocomplete import product_name_index
+from products.cache_tags import purge_products
+from products.models import Category, Product
+
+IMPORT_FORMATS: tuple[str, ...] = ("csv", "ndjson")
+UPDATE_FIELDS: tuple[str, ...] = (
+    "name",
+    "description",
+    "price",
+    "quantity_in_stock",
+    "category",
+    "updated_at",
+)
+NAME_MAX_LENGTH: int = Product._meta.get_field("name").max_length
+
+
+class RowError(ValueError):
+    """Raised when a row of the file is not a valid product"""
+
+    def __init__(self, errors: dict[str, str]) -> None:
+        self.errors: dict[str, str] = errors
+        super().__init__(errors)
+
+
+@dataclass
+class ImportResult:
+    """Counts of an import and the errors of its invalid rows
+
+    Only the first max_errors errors are kept, error_count has all of them.
+    """
+
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    max_errors: int = 1000
+
+    def add_error(self, line: int, errors: dict[str, str]) -> None:
+        """Record the errors of a row"""
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result as it is sent in the responses"""
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield the line number and the values of each row of a CSV file"""
+    reader: csv.DictReader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield the line number and the values of each object of a NDJSON file
+
+    A line that is not a JSON object is yielded as None.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row: Any = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+def decode_lines(lines: Iterable[str | bytes], result: ImportResult) -> Iterator[str]:
+    """Yield the lines of the file as text
+
+    A line that is not UTF-8 is reported and read as a blank line, so the
+    next rows keep their line numbers. A file that cannot be read any
+    further, like a truncated gzip stream, is reported and ends the import
+    with the rows read before it saved.
+    """
+    iterator: Iterator[str | bytes] = iter(lines)
+    number: int = 0
+    while True:
+        try:
+            line: str | bytes = next(iterator)
+        except StopIteration:
+            return
+        except (OSError, EOFError):
+            result.add_error(number + 1, {"non_field_errors": "The file could not be read."})
+            return
+        number += 1
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8")
+            except UnicodeDecodeError:
+                result.add_error(number, {"non_field_errors": "The line is not valid UTF-8."})
+                line = "\n"
+        yield line
+
+
+def integer_range(field_name: str) -> tuple[int, int]:
+    """Return the smallest and largest integer the column of a field stores"""
+    internal_type: str = Product._meta.get_field(field_name).get_internal_type()
+    return connection.ops.integer_field_range(internal_type)
+
+
+def _blank(value: Any) -> bool:
+    """Tell if a value is missing, CSV files have empty strings for them"""
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+class ProductRowParser:
+    """Turn the rows of a file into unsaved products
+
+    Each category name is resolved once through the reference cache, the
+    next rows with the same name reuse the result.
+    """
+
+    def __init__(self) -> None:
+        self.categories: dict[str, Category | None] = {}
+        self.id_range: tuple[int, int] = integer_range("id")
+        self.quantity_range: tuple[int, int] = integer_range("quantity_in_stock")
+
+    def category(self, name: str) -> Category | None:
+        """Return the category with the given name"""
+        if name not in self.categories:
+            self.categories[name] = category_cache.get_by_name(name)
+        return self.categories[name]
+
+    def parse(self, row: dict[str, Any] | None) -> Product:
+        """Return the product of a row or raise RowError"""
+        if row is None:
+            raise RowError({"non_field_errors": "Expected a JSON object."})
+
+        errors: dict[str, str] = {}
+        values: dict[str, Any] = {}
+
+        if not _blank(row.get("id")):
+            try:
+                values["id"] = int(row["id"])
+                if not 1 <= values["id"] <= self.id_range[1]:
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors["id"] = (
+                    f"A valid positive integer no greater than {self.id_range[1]} is required."
+                )
+
+        name: Any = row.get("name")
+        if _blank(name):
+            errors["name"] = "This field is required."
+        elif len(str(name)) > NAME_MAX_LENGTH:
+            errors["name"] = f"Ensure this field has no more than {NAME_MAX_LENGTH} characters."
+        else:
+            values["name"] = str(name).strip()
+
+        description: Any = row.get("description")
+        values["description"] = None if _blank(description) else str(description)
+
+        try:
+            values["price"] = float(row.get("price"))
+            if not math.isfinite(values["price"]) or values["price"] < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors["price"] = "A valid positive number is required."
+
+        try:
+            quantity: Any = row.get("quantity_in_stock")
+            if isinstance(quantity, float) or isinstance(quantity, bool):
+                raise ValueError
+            values["quantity_in_stock"] = int(quantity)
+            low, high = self.quantity_range
+            if not low <= values["quantity_in_stock"] <= high:
+                errors["quantity_in_stock"] = (
+                    f"Ensure this value is between {low} and {high}."
+                )
+        except (TypeError, ValueError):
+            errors["quantity_in_stock"] = "A valid integer is required."
+
+        category_name: Any = row.get("category")
+        values["category"] = None
+        if not _blank(category_name):
+            values["category"] = self.category(str(category_name).strip())
+            if values["category"] is None:
+                errors["category"] = f"Category {category_name} does not exist."
+
+        if errors:
+            raise RowError(errors)
+        return Product(**values)
+
+
+def _save_batch(batch: tuple[tuple[int, Product], ...], result: ImportResult) -> None:
+    """Insert the new products of a batch and upsert the ones with an id
+
+    A batch the database rejects is saved again one row at a time, so only
+    the rows it rejects are reported.
+    """
+    new: list[Product] = [product for _line, product in batch if product.pk is None]
+    # The last row of the file wins when an id is repeated
+    upserts: dict[int, Product] = {
+        product.pk: product for _line, product in batch if product.pk is not None
+    }
+
+    try:
+        with transaction.atomic():
+            existing: int = Product.objects.filter(pk__in=upserts).count() if upserts else 0
+            if upserts:
+                Product.objects.bulk_create(
+                    list(upserts.values()),
+                    update_conflicts=True,
+                    unique_fields=["id"],
+                    update_fields=list(UPDATE_FIELDS),
+                )
+            if new:
+                Product.objects.bulk_create(new)
+    except (DatabaseError, OverflowError) as error:
+        if len(batch) > 1:
+            for row in batch:
+                _save_batch((row,), result)
+        else:
+            result.add_error(
+                batch[0][0], {"non_field_errors": f"The row could not be saved: {error}"}
+            )
+        return
+
+    # bulk_create does not send the signals purging the cached responses
+    purge_products(upserts)
+
+    result.created += len(new) + len(upserts) - existing
+    result.updated += existing
+
+
+def _reset_sequence() -> None:
+    """Move the id sequence past the ids given in the file, on PostgreSQL"""
+    statements: list[str] = connection.ops.sequence_reset_sql(no_style(), [Product])
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def import_products(
+    lines: Iterable[str | bytes],
+    import_format: str,
+    batch_size: int = 1000,
+    max_errors: int = 1000,
+) -> ImportResult:
+    """Import the products of a CSV or NDJSON file
+
+    The columns are id (optional, updates the product with that id), name,
+    description, price, quantity_in_stock and category (its name). Lines of
+    bytes are decoded as UTF-8.
+    """
+    result: ImportResult = ImportResult(max_errors=max_errors)
+    parser: ProductRowParser = ProductRowParser()
+
+    def valid_rows() -> Iterator[tuple[int, Product]]:
+        for line, row in READERS[import_format](decode_lines(lines, result)):
+            try:
+                yield line, parser.parse(row)
+            except RowError as error:
+                result.add_error(line, error.errors)
+
+    for batch in batched(valid_rows(), batch_size):
+        _save_batch(batch, result)
+
+    _reset_sequence()
+    # bulk_create does not send the signals keeping the autocomplete fresh
+    product_name_index.reset()
+    return result
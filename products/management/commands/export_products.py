@@ -0,0 +1,46 @@
+"""Export the products catalog to a file"""
+
+import sys
+from typing import Any, BinaryIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from products.export import COMPRESSIONS, EXPORT_FORMATS, export_products
+
+
+class Command(BaseCommand):
+    """Export the products catalog to a file"""
+
+    help = (
+        "Stream the products, with their category name, to a CSV or NDJSON "
+        "file. The memory use does not depend on the size of the catalog."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "output", nargs="?", default="-", help="File to write, - for the standard output"
+        )
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--compress", choices=COMPRESSIONS)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help="Rows fetched from the database at a time",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        output: BinaryIO = (
+            sys.stdout.buffer if options["output"] == "-" else open(options["output"], "wb")
+        )
+        try:
+            for piece in export_products(
+                options["format"], options["compress"], options["chunk_size"]
+            ):
+                output.write(piece)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+            else:
+                output.flush()
@@ -0,0 +1,67 @@
+"""Import products from a CSV or NDJSON file"""
+
+import gzip
+import sys
+from contextlib import nullcontext
+from typing import Any, ContextManager, TextIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from products.importer import IMPORT_FORMATS, ImportResult, import_products
+
+
+class Command(BaseCommand):
+    """Import products from a CSV or NDJSON file"""
+
+    help = (
+        "Create or update products from a CSV or NDJSON file read as a stream. "
+        "The rows with an id update that product, the others are created. "
+        "Invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "input", help="File to read, - for the standard input, .gz files are decompressed"
+        )
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Format of the file, guessed from its extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.IMPORT_BATCH_SIZE,
+            help="Rows written by each query",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path: str = options["input"]
+        import_format: str | None = options["format"]
+        if import_format is None:
+            extension: str = path.removesuffix(".gz").rsplit(".", 1)[-1]
+            if extension not in IMPORT_FORMATS:
+                raise CommandError("Cannot guess the format of the file, use --format.")
+            import_format = extension
+
+        source: ContextManager[TextIO]
+        if path == "-":
+            # The standard input is not closed, the command did not open it
+            source = nullcontext(sys.stdin)
+        elif path.endswith(".gz"):
+            source = gzip.open(path, "rt", encoding="utf-8", newline="")
+        else:
+            source = open(path, encoding="utf-8", newline="")
+
+        with source as lines:
+            result: ImportResult = import_products(
+                lines, import_format, batch_size=options["batch_size"]
+            )
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            f"{result.created} created, {result.updated} updated, "
+            f"{result.error_count} rows with errors."
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-17 20:11
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicated_categories(apps, schema_editor):
+    """Move the products of the repeated categories to the first one"""
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+
+    duplicates = (
+        Category.objects.values('category_name')
+        .annotate(categories=Count('id'), first_id=Min('id'))
+        .filter(categories__gt=1)
+    )
+    for duplicate in duplicates:
+        repeated = Category.objects.filter(category_name=duplicate['category_name']).exclude(pk=duplicate['first_id'])
+        Product.objects.filter(category__in=repeated).update(category_id=duplicate['first_id'])
+        repeated.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_categories, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='category_name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
@@ -5,19 +5,23 @@ from typing import override
 from django.db.models import (
     Model,
     CharField,
+    DateTimeField,
     TextField,
     FloatField,
     IntegerField,
     ForeignKey,
     SET_NULL,
     Manager,
+    Index,
 )
 
 
 class Category(Model):
     """Categories model"""
 
-    category_name: CharField = CharField(max_length=100)
+    category_name: CharField = CharField(max_length=100, unique=True)
+    # Validator of the conditional GETs, not serialized
+    updated_at: DateTimeField = DateTimeField(auto_now=True)
     objects = Manager()
 
 
@@ -31,9 +35,20 @@ class Product(Model):
     category: ForeignKey = ForeignKey(
         Category, null=True, blank=True, on_delete=SET_NULL
     )
+    # Validator of the conditional GETs, not serialized. Bulk updates that
+    # bypass save() must set it themselves.
+    updated_at: DateTimeField = DateTimeField(auto_now=True)
 
     objects = Manager()
 
+    class Meta:
+        """Indexes for the filters of the products list"""
+
+        indexes = [
+            Index(fields=["category", "price"], name="product_category_price_idx"),
+            Index(fields=["quantity_in_stock"], name="product_stock_idx"),
+        ]
+
     @override
     def __str__(self) -> str:
         return str(self.name)
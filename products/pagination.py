@@ -0,0 +1,39 @@
+"""Pagination classes for the products app"""
+
+from typing import override
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+
+
+class ProductCursorPagination(CursorPagination):
+    """Keyset pagination for the products catalog
+
+    Each page is fetched with a `WHERE <sort key> > <cursor>` filter instead of
+    an OFFSET, so deep pages cost the same as the first one. The `next` and
+    `previous` links carry opaque cursors that must be passed back as they are.
+    """
+
+    page_size: int = 50
+    page_size_query_param: str = "page_size"
+    max_page_size: int = 500
+
+    ordering: tuple[str, ...] = ("id",)
+    ordering_query_param: str = "ordering"
+
+    # Allowed sort keys, "id" is always appended as a tie breaker so the
+    # order is stable across pages.
+    ORDERINGS: dict[str, tuple[str, ...]] = {
+        "id": ("id",),
+        "-id": ("-id",),
+        "price": ("price", "id"),
+        "-price": ("-price", "-id"),
+        "name": ("name", "id"),
+        "-name": ("-name", "-id"),
+    }
+
+    @override
+    def get_ordering(self, request: Request, queryset, view) -> tuple[str, ...]:
+        """Return the ordering requested by the client if it is allowed"""
+        requested: str | None = request.query_params.get(self.ordering_query_param)
+        return self.ORDERINGS.get(requested or "", self.ordering)
@@ -0,0 +1,201 @@
+"""Full text search over the products name and description
+
+SQLite uses an FTS5 external content table kept in sync by triggers.
+PostgreSQL uses a GIN index over the weighted tsvector of the product, which
+the database keeps up to date by itself. Other databases fall back to a
+non ranked icontains search.
+"""
+
+import html
+import re
+from typing import Any
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Q
+
+from products.models import Product
+
+HIGHLIGHT_START: str = "<mark>"
+HIGHLIGHT_END: str = "</mark>"
+# Private use characters the database wraps the matches with, replaced by
+# the tags once the product text is HTML escaped
+MATCH_START: str = "\ue000"
+MATCH_END: str = "\ue001"
+
+FTS_TABLE: str = "products_product_fts"
+
+SQLITE_SEARCH_INDEX: list[str] = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='products_product', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON products_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON products_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF name, description ON products_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+SQLITE_TRIGGERS: tuple[str, ...] = (
+    f"{FTS_TABLE}_insert",
+    f"{FTS_TABLE}_delete",
+    f"{FTS_TABLE}_update",
+)
+
+# The index and the queries must use exactly the same expression
+POSTGRESQL_DOCUMENT: str = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+POSTGRESQL_SEARCH_INDEX: list[str] = [
+    f"""
+    CREATE INDEX IF NOT EXISTS products_product_search_idx
+    ON products_product USING GIN (({POSTGRESQL_DOCUMENT}))
+    """,
+]
+
+
+def create_search_index(connection: BaseDatabaseWrapper) -> None:
+    """Create the search index of the products and fill it"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for statement in SQLITE_SEARCH_INDEX:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == "postgresql":
+            for statement in POSTGRESQL_SEARCH_INDEX:
+                cursor.execute(statement)
+
+
+def drop_search_index(connection: BaseDatabaseWrapper) -> None:
+    """Drop the search index of the products"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == "postgresql":
+            cursor.execute("DROP INDEX IF EXISTS products_product_search_idx")
+
+
+def ensure_search_index(using: str = "default", **_kwargs: Any) -> None:
+    """Recreate the SQLite triggers if a migration dropped them
+
+    SQLite migrations that rebuild the products table drop its triggers, so
+    this runs after every migrate and rebuilds the index when they are gone.
+    """
+    connection: BaseDatabaseWrapper = connections[using]
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f"{FTS_TABLE}%"],
+        )
+        existing: set[str] = {name for (name,) in cursor.fetchall()}
+
+    if FTS_TABLE in existing and not set(SQLITE_TRIGGERS) <= existing:
+        create_search_index(connection)
+
+
+def _fts5_query(text: str) -> str:
+    """Build a FTS5 query matching all the words, the last one as a prefix"""
+    words: list[str] = re.findall(r"\w+", text)
+    terms: list[str] = [f'"{word}"' for word in words]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _highlight(text: str | None) -> str | None:
+    """Return the text HTML escaped, with its matches wrapped in <mark> tags"""
+    if text is None:
+        return None
+    return (
+        html.escape(text).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+    )
+
+
+def search_products(text: str, limit: int, using: str = "default") -> list[dict[str, Any]]:
+    """Search the products matching the text, the best ranked first
+
+    Returns dicts with the product id, its rank (higher is better) and the
+    name and description HTML escaped, with the matches wrapped in <mark>
+    tags.
+    """
+    connection: BaseDatabaseWrapper = connections[using]
+
+    if connection.vendor == "sqlite":
+        query: str = _fts5_query(text)
+        if not query:
+            return []
+        sql: str = f"""
+            SELECT rowid,
+                   -bm25({FTS_TABLE}, 10.0, 1.0),
+                   highlight({FTS_TABLE}, 0, %s, %s),
+                   snippet({FTS_TABLE}, 1, %s, %s, '...', 16)
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)
+            LIMIT %s
+        """
+        params: list[Any] = [MATCH_START, MATCH_END, MATCH_START, MATCH_END, query, limit]
+    elif connection.vendor == "postgresql":
+        options: str = f"StartSel={MATCH_START}, StopSel={MATCH_END}"
+        sql = f"""
+            SELECT id,
+                   ts_rank({POSTGRESQL_DOCUMENT}, query),
+                   ts_headline('english', name, query, %s),
+                   ts_headline('english', coalesce(description, ''), query, %s)
+            FROM products_product, websearch_to_tsquery('english', %s) query
+            WHERE ({POSTGRESQL_DOCUMENT}) @@ query
+            ORDER BY 2 DESC
+            LIMIT %s
+        """
+        params = [f"{options}, HighlightAll=true", f"{options}, MaxWords=16", text, limit]
+    else:
+        return [
+            {
+                "id": pk,
+                "rank": 0.0,
+                "name": html.escape(name),
+                "description": description and html.escape(description),
+            }
+            for pk, name, description in Product.objects.using(using)
+            .filter(Q(name__icontains=text) | Q(description__icontains=text))
+            .values_list("pk", "name", "description")[:limit]
+        ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            {
+                "id": pk,
+                "rank": rank,
+                "name": _highlight(name),
+                "description": _highlight(description),
+            }
+            for pk, rank, name, description in cursor.fetchall()
+        ]
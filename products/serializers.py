@@ -1,7 +1,14 @@
 """Product app Serializers"""
 
-from rest_framework.serializers import ModelSerializer
-
+from rest_framework.serializers import (
+    ModelSerializer,
+    Serializer,
+    IntegerField,
+    FloatField,
+    BooleanField,
+)
+
+from ecomerce_project.fieldsets import DynamicFieldsMixin
 from products.models import Category, Product
 
 
@@ -12,10 +19,10 @@ class CategorySerializer(ModelSerializer):
         """create the class fields automatically"""
 
         model = Category
-        fields = "__all__"
+        exclude = ("updated_at",)
 
 
-class ProductSerializer(ModelSerializer):
+class ProductSerializer(DynamicFieldsMixin, ModelSerializer):
     """Product for each categories"""
 
     category: CategorySerializer = CategorySerializer(required=False)
@@ -24,4 +31,14 @@ class ProductSerializer(ModelSerializer):
         """Create the class fields automatically"""
 
         model = Product
-        fields = "__all__"
+        exclude = ("updated_at",)
+
+
+class ProductFilterSerializer(Serializer):
+    """Query parameters to filter the products list"""
+
+    category: IntegerField = IntegerField(required=False)
+    price__gte: FloatField = FloatField(required=False)
+    price__lte: FloatField = FloatField(required=False)
+    in_stock: BooleanField = BooleanField(required=False, allow_null=True, default=None)
+    facets: BooleanField = BooleanField(required=False, default=False)
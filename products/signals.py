@@ -0,0 +1,54 @@
+"""Signal receivers for the products app"""
+
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ecomerce_project.conditional import record_deletion
+
+from products.autocomplete import product_name_index
+from products.cache_tags import purge_category, purge_products
+from products.models import Category, Product
+
+
+@receiver(post_save, sender=Product)
+def index_product_name(instance: Product, **_kwargs: Any) -> None:
+    """Add the saved product to the autocomplete index"""
+    product_name_index.update(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product_name(instance: Product, **_kwargs: Any) -> None:
+    """Take the deleted product out of the autocomplete index"""
+    product_name_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def purge_product_responses(instance: Product, **_kwargs: Any) -> None:
+    """Purge the cached responses showing the product"""
+    purge_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category_responses(instance: Category, **_kwargs: Any) -> None:
+    """Purge the cached responses showing the category"""
+    purge_category(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def touch_category_products(instance: Category, **_kwargs: Any) -> None:
+    """Move the Last-Modified of the products losing the category past the deletion
+
+    SET_NULL updates their category without touching updated_at.
+    """
+    Product.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Category)
+def record_category_deletion(**_kwargs: Any) -> None:
+    """Move the Last-Modified of the categories list past the deletion"""
+    record_deletion("products.Category")
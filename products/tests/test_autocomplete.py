@@ -0,0 +1,167 @@
+"""Test module for the products name autocomplete"""
+
+from typing import Any, override
+from unittest import mock
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.autocomplete import ProductNameIndex, _Snapshot, product_name_index
+from products.models import Product
+from products.tests.test_setup import BaseTestCaseSetUp
+from shopping_and_payments.models import CartItem, ShoppingCart
+from users.models import User
+
+
+class ProductAutocompleteTest(BaseTestCaseSetUp):
+    """Test class to test the autocomplete of the products name"""
+
+    @override
+    def setUp(self) -> None:
+        product_name_index.reset()
+        return super().setUp()
+
+    def _create_catalog(self) -> list[Product]:
+        """Create some products, the running shoes in two carts"""
+        products: list[Product] = [
+            Product.objects.create(name=name, price=10, quantity_in_stock=1)
+            for name in ("Rain jacket", "Running shoes", "Running socks", "Shorts")
+        ]
+        for i in range(2):
+            user: User = User.objects.create_user(
+                username=f"user{i}", email=f"{i}user@test.com", password="test123"
+            )
+            CartItem.objects.create(
+                cart=ShoppingCart.objects.create(user=user), product=products[1]
+            )
+        return products
+
+    def _suggested_names(self, prefix: str, **params: int) -> list[str]:
+        """Return the names suggested for a prefix"""
+        response: Response = self.client.get(
+            self.products_autocomplete_url, {"q": prefix, **params}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [suggestion["name"] for suggestion in response.data]
+
+    def test_suggestions_by_popularity(self) -> None:
+        """Test if the most popular products come first"""
+        self._create_catalog()
+
+        self.assertEqual(
+            self._suggested_names("r"), ["Running shoes", "Rain jacket", "Running socks"]
+        )
+        self.assertEqual(self._suggested_names("RUN", limit=1), ["Running shoes"])
+
+    def test_suggestions_match_any_word(self) -> None:
+        """Test if a prefix matches the start of any word of the name"""
+        self._create_catalog()
+
+        self.assertEqual(self._suggested_names("so"), ["Running socks"])
+        self.assertEqual(self._suggested_names("running sh"), ["Running shoes"])
+        self.assertEqual(self._suggested_names("x"), [])
+        self.assertEqual(self._suggested_names(" "), [])
+
+    def test_suggestions_follow_product_changes(self) -> None:
+        """Test if the index is updated when products are saved or deleted"""
+        products: list[Product] = self._create_catalog()
+        self.assertEqual(self._suggested_names("sh"), ["Running shoes", "Shorts"])
+
+        products[3].name = "Swim shorts"
+        products[3].save()
+        products[1].delete()
+        Product.objects.create(name="Shirt", price=10, quantity_in_stock=1)
+
+        self.assertEqual(self._suggested_names("sh"), ["Swim shorts", "Shirt"])
+        self.assertEqual(self._suggested_names("swi"), ["Swim shorts"])
+
+    def test_suggestions_with_wrong_limit(self) -> None:
+        """Test if the api returns a 400 error with a wrong limit"""
+        response: Response = self.client.get(
+            self.products_autocomplete_url, {"q": "r", "limit": "all"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_is_rebuilt_when_too_old(self) -> None:
+        """Test if the index picks up the changes made out of this process"""
+        self._create_catalog()
+        index: ProductNameIndex = ProductNameIndex()
+        self.assertEqual(index.suggest("sh", 10), [(2, "Running shoes"), (4, "Shorts")])
+
+        Product.objects.filter(name="Shorts").update(name="Trousers")
+        with self.settings(AUTOCOMPLETE_MAX_AGE=-1):
+            self.assertEqual(index.suggest("sh", 10), [(2, "Running shoes")])
+
+    def test_writes_publish_a_new_snapshot(self) -> None:
+        """Test if a search reading the index is not changed under it"""
+        self._create_catalog()
+        index: ProductNameIndex = ProductNameIndex()
+        index.build()
+        snapshot: _Snapshot = index._snapshot
+
+        index.remove(2)
+        index.update(4, "Trousers")
+
+        entries: list[tuple[str, int, str, int]] = [
+            entry for bucket in snapshot.buckets for entry in bucket
+        ]
+        self.assertIn(("shoes", 2, "Running shoes", 2), entries)
+        self.assertIn(("shorts", 4, "Shorts", 0), entries)
+        self.assertEqual(index.suggest("sh", 10), [])
+
+    def test_writes_split_and_empty_buckets(self) -> None:
+        """Test if the buckets stay sorted as the writes fill and empty them"""
+        index: ProductNameIndex = ProductNameIndex()
+        index.build()
+        with mock.patch("products.autocomplete.BUCKET_SIZE", 2):
+            for pk in range(1, 11):
+                index.update(pk, f"Item {pk:02}")
+            for pk in range(1, 9):
+                index.remove(pk)
+
+        self.assertEqual(index.suggest("item", 10), [(9, "Item 09"), (10, "Item 10")])
+        self.assertEqual(index.suggest("1", 10), [(10, "Item 10")])
+
+    def test_writes_during_a_build_are_kept(self) -> None:
+        """Test if a build applies again the writes made while it read the database"""
+        products: list[Product] = self._create_catalog()
+        index: ProductNameIndex = ProductNameIndex()
+        index.build()
+        read = Product.objects.annotate
+
+        def write_while_reading(*args: Any, **kwargs: Any) -> Any:
+            index.update(products[3].pk, "Shirt")
+            index.remove(products[0].pk)
+            return read(*args, **kwargs)
+
+        with mock.patch.object(Product.objects, "annotate", side_effect=write_while_reading):
+            index.build()
+
+        self.assertEqual(index.suggest("sh", 10), [(2, "Running shoes"), (4, "Shirt")])
+        self.assertEqual(index.suggest("rain", 10), [])
+
+    def test_reset_during_a_build_drops_it(self) -> None:
+        """Test if a reset while a build reads the database, like an import, wins"""
+        self._create_catalog()
+        index: ProductNameIndex = ProductNameIndex()
+        read = Product.objects.annotate
+
+        def reset_while_reading(*args: Any, **kwargs: Any) -> Any:
+            index.reset()
+            return read(*args, **kwargs)
+
+        with mock.patch.object(Product.objects, "annotate", side_effect=reset_while_reading):
+            index.build()
+
+        self.assertIsNone(index._built_at)
+        self.assertEqual(index._snapshot.buckets, [])
+
+    def test_old_index_is_searched_while_another_thread_builds(self) -> None:
+        """Test if only one thread rebuilds an old index"""
+        self._create_catalog()
+        index: ProductNameIndex = ProductNameIndex()
+        index.build()
+
+        with self.settings(AUTOCOMPLETE_MAX_AGE=-1), index._build_lock:
+            with self.assertNumQueries(0):
+                self.assertEqual(index.suggest("sho", 10), [(2, "Running shoes"), (4, "Shorts")])
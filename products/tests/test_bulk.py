@@ -0,0 +1,140 @@
+"""Test module for the bulk update and delete of products"""
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.bulk import bulk_update_products, parse_bulk_updates
+from products.models import Product
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductBulkUpdateTest(BaseTestCaseSetUp):
+    """Test class to test the bulk update of prices and stock"""
+
+    def test_bulk_update(self) -> None:
+        """Test that each product gets its own changes and the rest is kept"""
+        self._create_products(3)
+        self.set_headers_as_admin()
+
+        response: Response = self.client.patch(
+            self.products_bulk_url,
+            [
+                {"id": 1, "price": 12.5, "quantity_in_stock": 3},
+                {"id": 2, "quantity_in_stock": 0},
+                {"id": 99, "price": 1},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 2, "not_found": [99]})
+        self.assertEqual(
+            list(Product.objects.order_by("pk").values_list("price", "quantity_in_stock")),
+            [(12.5, 3), (10.0, 0), (10.0, 10)],
+        )
+
+    def test_bulk_update_invalid_items(self) -> None:
+        """Test that nothing is changed when an item is invalid"""
+        self._create_products(2)
+        self.set_headers_as_admin()
+
+        response: Response = self.client.patch(
+            self.products_bulk_url,
+            {"items": [{"id": 1, "price": 5}, {"id": "x", "price": -1}, {"id": 2}, 3]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data["errors"]), {1, 2, 3})
+        self.assertEqual(set(response.data["errors"][1]), {"id", "price"})
+        self.assertEqual(Product.objects.get(pk=1).price, 10.0)
+
+        response = self.client.patch(self.products_bulk_url, {"items": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_values_out_of_range(self) -> None:
+        """Test that numbers the columns cannot store are errors, not overflows"""
+        self._create_products(1)
+        self.set_headers_as_admin()
+
+        response: Response = self.client.patch(
+            self.products_bulk_url,
+            [
+                {"id": 1, "quantity_in_stock": 2**63},
+                {"id": 1, "quantity_in_stock": 1e30},
+                {"id": 2**63, "price": 1},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [set(response.data["errors"][index]) for index in range(3)],
+            [{"quantity_in_stock"}, {"quantity_in_stock"}, {"id"}],
+        )
+        # Too large for a float, the standard json module reads it as an int
+        self.assertEqual(set(parse_bulk_updates([{"id": 1, "price": 10**400}])[1][0]), {"price"})
+
+        response = self.client.delete(self.products_bulk_url, [2**63], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_as_normal_user(self) -> None:
+        """Test that only admins can change products in bulk"""
+        self._create_products(1)
+        self.set_headers_as_normal_user()
+
+        response: Response = self.client.patch(
+            self.products_bulk_url, [{"id": 1, "price": 1}], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Product.objects.get(pk=1).price, 10.0)
+
+    def test_bulk_update_queries(self) -> None:
+        """Test that each batch runs one select and one update"""
+        self._create_products(10)
+        updates = {pk: {"price": pk * 2.0} for pk in range(1, 11)}
+
+        with CaptureQueriesContext(connection) as queries:
+            updated, not_found = bulk_update_products(updates, batch_size=4)
+
+        self.assertEqual((updated, not_found), (10, []))
+        statements: list[str] = [
+            query["sql"] for query in queries.captured_queries if "SAVEPOINT" not in query["sql"]
+        ]
+        self.assertEqual(len(statements), 6)
+        self.assertEqual(Product.objects.get(pk=7).price, 14.0)
+
+
+class ProductBulkDeleteTest(BaseTestCaseSetUp):
+    """Test class to test the bulk delete of products"""
+
+    @override_settings(BULK_UPDATE_BATCH_SIZE=2)
+    def test_bulk_delete(self) -> None:
+        """Test that the products are deleted and the unknown ids listed"""
+        self._create_products(5)
+        self.set_headers_as_admin()
+
+        response: Response = self.client.delete(
+            self.products_bulk_url, {"ids": [1, 3, 5, 3, 42]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"deleted": 3, "not_found": [42]})
+        self.assertEqual(list(Product.objects.values_list("pk", flat=True)), [2, 4])
+
+    def test_bulk_delete_invalid_ids(self) -> None:
+        """Test that a list with an invalid id deletes nothing"""
+        self._create_products(2)
+        self.set_headers_as_admin()
+
+        response: Response = self.client.delete(
+            self.products_bulk_url, [1, "two"], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Product.objects.count(), 2)
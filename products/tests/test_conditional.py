@@ -0,0 +1,140 @@
+"""Test module for the conditional GETs of the catalog"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.bulk import bulk_update_products
+from products.models import Category, Product
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductConditionalGetTest(BaseTestCaseSetUp):
+    """Test class to test the ETag and Last-Modified of a product"""
+
+    def test_not_modified(self) -> None:
+        """Test that the current ETag gets an empty 304 without serializing"""
+        self._create_products(1)
+        response: Response = self.client.get(self.product_detail_url(1))
+        etag: str = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+        # Without the cached response only the product is read
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.product_detail_url(1), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self) -> None:
+        """Test that Last-Modified is revalidated without an ETag"""
+        self._create_products(1)
+        last_modified: str = self.client.get(self.product_detail_url(1))["Last-Modified"]
+
+        response: Response = self.client.get(
+            self.product_detail_url(1), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        earlier: str = http_date(
+            (Product.objects.get(pk=1).updated_at - timedelta(minutes=1)).timestamp()
+        )
+        response = self.client.get(self.product_detail_url(1), HTTP_IF_MODIFIED_SINCE=earlier)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_category_deleted(self) -> None:
+        """Test that a product losing its category is modified since before"""
+        self._create_products(1)
+        Product.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        Category.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        last_modified: str = self.client.get(self.product_detail_url(1))["Last-Modified"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.get(pk=1).delete()
+        response: Response = self.client.get(
+            self.product_detail_url(1), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["category"])
+
+    def test_etag_changes(self) -> None:
+        """Test that every change of the product as it is sent changes its ETag"""
+        self._create_products(1)
+        etags: set[str] = {self.client.get(self.product_detail_url(1))["ETag"]}
+
+        product: Product = Product.objects.get(pk=1)
+        product.price = 12
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        etags.add(self.client.get(self.product_detail_url(1))["ETag"])
+
+        category: Category = Category.objects.get(pk=1)
+        category.category_name = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+        etags.add(self.client.get(self.product_detail_url(1))["ETag"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_update_products({1: {"quantity_in_stock": 3}})
+        etags.add(self.client.get(self.product_detail_url(1))["ETag"])
+
+        etags.add(self.client.get(self.product_detail_url(1), {"fields": "id"})["ETag"])
+
+        self.assertEqual(len(etags), 5)
+
+
+class CategoryConditionalGetTest(BaseTestCaseSetUp):
+    """Test class to test the ETag of the categories list"""
+
+    def test_not_modified(self) -> None:
+        """Test that the list is revalidated until a category is added"""
+        self._create_categories(2)
+        etag: str = self.client.get(self.categories_list_url)["ETag"]
+
+        response: Response = self.client.get(self.categories_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(category_name="new")
+        response = self.client.get(self.categories_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertNotIn("updated_at", response.data[0])
+
+    @mock.patch("ecomerce_project.conditional.cache_is_shared", return_value=True)
+    def test_deleted_category_modifies_the_list(self, _shared: mock.Mock) -> None:
+        """Test that a deletion is seen by the clients sending only If-Modified-Since"""
+        self._create_categories(2)
+        Category.objects.update(updated_at=timezone.now() - timedelta(minutes=2))
+        cache.set("conditional:products.Category:deleted_at", timezone.now() - timedelta(minutes=2))
+        last_modified: str = self.client.get(self.categories_list_url)["Last-Modified"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.get(pk=2).delete()
+        response: Response = self.client.get(
+            self.categories_list_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_local_cache_validates_by_etag_only(self) -> None:
+        """Test that the list has no Last-Modified without a shared deletion time"""
+        self._create_categories(2)
+        response: Response = self.client.get(self.categories_list_url)
+        self.assertNotIn("Last-Modified", response)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.get(pk=2).delete()
+        response = self.client.get(self.categories_list_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
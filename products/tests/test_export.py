@@ -0,0 +1,105 @@
+"""Test module for the products export"""
+
+import csv
+import gzip
+import json
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+
+from rest_framework import status
+
+from products.models import Category, Product
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductExportTest(BaseTestCaseSetUp):
+    """Test class to test the streaming export of the products"""
+
+    def _create_catalog(self) -> None:
+        """Create a few products, one of them without category"""
+        self._create_products(3)
+        Product.objects.create(
+            name="Rain jacket",
+            description='Waterproof, with "quotes"\nand two lines',
+            price=60.5,
+            quantity_in_stock=0,
+        )
+
+    def _content(self, response: StreamingHttpResponse) -> bytes:
+        """Consume the streamed content of a response"""
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b"".join(response.streaming_content)
+
+    def test_export_csv(self) -> None:
+        """Test that the CSV export has a header and every product"""
+        self._create_catalog()
+
+        response = self.client.get(self.products_export_url("csv"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="products.csv"', response["Content-Disposition"])
+        rows: list[dict[str, str]] = list(
+            csv.DictReader(StringIO(self._content(response).decode()))
+        )
+        self.assertEqual([row["id"] for row in rows], ["1", "2", "3", "4"])
+        self.assertEqual(rows[0]["category"], "category1")
+        self.assertEqual(rows[3]["category"], "")
+        self.assertEqual(rows[3]["description"], 'Waterproof, with "quotes"\nand two lines')
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_ndjson_gzip(self) -> None:
+        """Test that the NDJSON export can be gzip compressed"""
+        self._create_catalog()
+
+        response = self.client.get(
+            self.products_export_url("ndjson"), {"compress": "gzip", "in_stock": "true"}
+        )
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="products.ndjson.gz"', response["Content-Disposition"])
+        lines: list[dict[str, Any]] = [
+            json.loads(line)
+            for line in gzip.decompress(self._content(response)).decode().splitlines()
+        ]
+        self.assertEqual([line["id"] for line in lines], [1, 2, 3])
+        self.assertEqual(
+            lines[0],
+            {
+                "id": 1,
+                "name": "product1",
+                "description": None,
+                "price": 10.0,
+                "quantity_in_stock": 10,
+                "category": "category1",
+            },
+        )
+
+    def test_export_with_wrong_parameters(self) -> None:
+        """Test that unknown formats and compressions are refused"""
+        response = self.client.get(self.products_export_url("xml"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(self.products_export_url("csv"), {"compress": "zip"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self) -> None:
+        """Test that the command writes the export to a file"""
+        self._create_catalog()
+        Category.objects.filter(category_name="category2").delete()
+
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "products.ndjson"
+            call_command("export_products", str(path), format="ndjson", chunk_size=1)
+            lines: list[dict[str, Any]] = [
+                json.loads(line) for line in path.read_text().splitlines()
+            ]
+
+        self.assertEqual(len(lines), 4)
+        self.assertIsNone(lines[1]["category"])
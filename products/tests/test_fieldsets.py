@@ -0,0 +1,70 @@
+"""Test module for the sparse fieldsets of the products"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductFieldsTest(BaseTestCaseSetUp):
+    """Test class to test the fields parameter of the products views"""
+
+    def test_list_with_fields(self) -> None:
+        """Test that only the given fields are returned and loaded"""
+        self._create_products(3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(
+                self.products_list_url, {"fields": "id,name,price"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][0], {"id": 1, "name": "product1", "price": 10.0}
+        )
+        sql: str = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("description", sql)
+        self.assertNotIn("products_category", sql)
+
+    def test_list_with_fields_sorted_by_an_other_field(self) -> None:
+        """Test that the sort key is loaded for the cursors"""
+        self._create_products(3)
+
+        response: Response = self.client.get(
+            self.products_list_url, {"fields": "id", "ordering": "-price", "page_size": 2}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [{"id": 3}, {"id": 2}])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [{"id": 1}])
+
+    def test_detail_with_fields(self) -> None:
+        """Test that the category is joined only when it is requested"""
+        self._create_products(1)
+
+        response: Response = self.client.get(
+            self.product_detail_url(1), {"fields": "name,category"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {"name": "product1", "category": {"id": 1, "category_name": "category1"}},
+        )
+
+    def test_unknown_fields(self) -> None:
+        """Test that unknown or empty fields are rejected"""
+        self._create_products(1)
+
+        response: Response = self.client.get(
+            self.products_list_url, {"fields": "id,colour"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Unknown fields: colour.")
+
+        response = self.client.get(self.product_detail_url(1), {"fields": ","})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
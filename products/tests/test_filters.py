@@ -0,0 +1,106 @@
+"""Test module for the filters and facets of the products list"""
+
+from typing import Any
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.filters import product_facets
+from products.models import Category, Product
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductFilterTest(BaseTestCaseSetUp):
+    """Test class to test the filters and facets of the products list"""
+
+    def _create_catalog(self) -> None:
+        """Create products with different categories, prices and stock"""
+        self._create_categories(2)
+        first, second = Category.objects.order_by("pk")
+        for name, price, stock, category in (
+            ("socks", 5, 10, first),
+            ("shirt", 20, 0, first),
+            ("jacket", 120, 3, second),
+            ("boots", 600, 1, second),
+            ("gift card", 50, 100, None),
+        ):
+            Product.objects.create(
+                name=name, price=price, quantity_in_stock=stock, category=category
+            )
+
+    def _names(self, params: dict[str, Any]) -> list[str]:
+        """Return the names of the products listed with some query parameters"""
+        response: Response = self.client.get(self.products_list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product["name"] for product in response.data.get("results")]
+
+    def test_filter_products(self) -> None:
+        """Test if the products are filtered by each parameter"""
+        self._create_catalog()
+
+        self.assertEqual(self._names({"category": 1}), ["socks", "shirt"])
+        self.assertEqual(self._names({"price__gte": 50}), ["jacket", "boots", "gift card"])
+        self.assertEqual(self._names({"price__lte": 20}), ["socks", "shirt"])
+        self.assertEqual(self._names({"in_stock": "false"}), ["shirt"])
+        self.assertEqual(
+            self._names({"category": 2, "price__lte": 200, "in_stock": "true"}), ["jacket"]
+        )
+
+    def test_filter_products_with_no_matches(self) -> None:
+        """Test if the api returns a 404 error when no product matches"""
+        self._create_catalog()
+
+        response: Response = self.client.get(self.products_list_url, {"price__gte": 1000})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_products_with_wrong_values(self) -> None:
+        """Test if the api returns a 400 error with invalid filters"""
+        self._create_catalog()
+
+        response: Response = self.client.get(
+            self.products_list_url, {"price__gte": "cheap", "category": "shoes"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data.get("price__gte")[0].code, "invalid")
+        self.assertEqual(response.data.get("category")[0].code, "invalid")
+
+    def test_facet_counts(self) -> None:
+        """Test if the facets count the filtered products"""
+        self._create_catalog()
+
+        response: Response = self.client.get(
+            self.products_list_url, {"facets": "true", "in_stock": "true"}
+        )
+        facets: dict[str, Any] = response.data.get("facets")
+
+        self.assertEqual(facets.get("total"), 4)
+        self.assertEqual(facets.get("in_stock"), 4)
+        self.assertEqual(
+            {category["category_name"]: category["count"] for category in facets.get("categories")},
+            {None: 1, "category1": 1, "category2": 2},
+        )
+        self.assertEqual(
+            {(bucket["min"], bucket["max"]): bucket["count"] for bucket in facets.get("price") if bucket["count"]},
+            {(0, 10): 1, (50, 100): 1, (100, 250): 1, (500, None): 1},
+        )
+
+    def test_facet_counts_take_two_queries(self) -> None:
+        """Test if the number of queries does not grow with the categories"""
+        self._create_catalog()
+        for category in Category.objects.bulk_create(
+            Category(category_name=f"extra{i}") for i in range(5)
+        ):
+            Product.objects.create(name="extra", price=1, quantity_in_stock=1, category=category)
+
+        with self.assertNumQueries(2):
+            product_facets(Product.objects.all())
+
+    def test_facets_are_optional(self) -> None:
+        """Test if the facets are only computed when they are requested"""
+        self._create_catalog()
+
+        response: Response = self.client.get(self.products_list_url)
+
+        self.assertNotIn("facets", response.data)
@@ -0,0 +1,213 @@
+"""Test module for the products import"""
+
+import gzip
+import json
+from pathlib import Path
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.importer import import_products
+from products.models import Category, Product
+from products.search import search_products
+from products.tests.test_setup import BaseTestCaseSetUp
+
+CSV_FILE: str = (
+    "id,name,description,price,quantity_in_stock,category\n"
+    "1,Running shoes,Light shoes,80,5,category1\n"
+    ",Socks,,5.5,50,\n"
+    ',Rain jacket,"Waterproof,\nwith a hood",60,3,category2\n'
+    ",,no name,abc,1.5,unknown\n"
+)
+
+
+class ProductImportTest(BaseTestCaseSetUp):
+    """Test class to test the bulk import of products"""
+
+    def test_import_csv(self) -> None:
+        """Test that the rows with an id are upserted and the others created"""
+        self._create_products(2)
+
+        result = import_products(CSV_FILE.splitlines(keepends=True), "csv", batch_size=2)
+
+        self.assertEqual((result.created, result.updated, result.error_count), (2, 1, 1))
+        self.assertEqual(result.errors[0]["line"], 6)
+        self.assertEqual(
+            set(result.errors[0]["errors"]),
+            {"name", "price", "quantity_in_stock", "category"},
+        )
+        product: Product = Product.objects.get(pk=1)
+        self.assertEqual(
+            (product.name, product.price, product.quantity_in_stock),
+            ("Running shoes", 80, 5),
+        )
+        jacket: Product = Product.objects.get(name="Rain jacket")
+        self.assertEqual(jacket.description, "Waterproof,\nwith a hood")
+        self.assertEqual(jacket.category.category_name, "category2")
+        self.assertIsNone(Product.objects.get(name="Socks").category)
+        self.assertEqual([match["id"] for match in search_products("running", 10)], [1])
+
+    def test_import_ndjson_with_new_ids(self) -> None:
+        """Test that rows with unknown ids are created with those ids"""
+        lines: list[str] = [
+            json.dumps({"id": 40, "name": "Mug", "price": 8, "quantity_in_stock": 2}),
+            "not json",
+            json.dumps({"name": "Lamp", "price": 20, "quantity_in_stock": 1}),
+        ]
+
+        result = import_products(lines, "ndjson")
+
+        self.assertEqual((result.created, result.updated, result.error_count), (2, 0, 1))
+        self.assertEqual(result.errors[0]["line"], 2)
+        self.assertTrue(Product.objects.filter(pk=40, name="Mug").exists())
+        self.assertGreater(Product.objects.get(name="Lamp").pk, 40)
+
+    def test_integers_out_of_range(self) -> None:
+        """Test that ids and quantities the column cannot store are row errors"""
+        lines: list[str] = [
+            json.dumps({"id": 2**64, "name": "Mug", "price": 8, "quantity_in_stock": 2}),
+            json.dumps({"name": "Lamp", "price": 20, "quantity_in_stock": 10**30}),
+            json.dumps({"name": "Desk", "price": 90, "quantity_in_stock": 1}),
+        ]
+
+        result = import_products(lines, "ndjson")
+
+        self.assertEqual((result.created, result.error_count), (1, 2))
+        self.assertEqual(
+            [(error["line"], set(error["errors"])) for error in result.errors],
+            [(1, {"id"}), (2, {"quantity_in_stock"})],
+        )
+
+    def test_rejected_batch_is_saved_row_by_row(self) -> None:
+        """Test that only the rows the database rejects are reported"""
+        lines: list[str] = [
+            json.dumps({"name": "Mug", "price": 8, "quantity_in_stock": 2}),
+            json.dumps({"name": "Lamp", "price": 20, "quantity_in_stock": 10**30}),
+            json.dumps({"name": "Desk", "price": 90, "quantity_in_stock": 1}),
+        ]
+
+        with mock.patch("products.importer.integer_range", return_value=(-(10**40), 10**40)):
+            result = import_products(lines, "ndjson")
+
+        self.assertEqual((result.created, result.error_count), (2, 1))
+        self.assertEqual(result.errors[0]["line"], 2)
+        self.assertEqual(
+            sorted(Product.objects.values_list("name", flat=True)), ["Desk", "Mug"]
+        )
+
+    def test_category_is_looked_up_once(self) -> None:
+        """Test that a category name repeated in the file is not looked up again"""
+        Category.objects.create(category_name="shoes")
+        lines: list[str] = ["name,price,quantity_in_stock,category\n"] + [
+            f"Shoes {i},10,1,shoes\n" for i in range(20)
+        ]
+        import_products(lines, "csv")
+
+        # The batch is inserted in a savepoint, the category comes from the cache
+        with self.assertNumQueries(3):
+            result = import_products(lines, "csv", batch_size=100)
+
+        self.assertEqual(result.created, 20)
+
+    @override_settings(IMPORT_BATCH_SIZE=2)
+    def test_import_endpoint(self) -> None:
+        """Test the import as an uploaded file and as a gzipped body"""
+        self._create_products(2)
+        self.set_headers_as_admin()
+
+        response: Response = self.client.post(
+            self.products_import_url("csv"),
+            {"file": SimpleUploadedFile("products.csv", CSV_FILE.encode())},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(response.data["error_count"], 1)
+
+        response = self.client.generic(
+            "POST",
+            self.products_import_url("ndjson") + "?compress=gzip",
+            gzip.compress(b'{"id": 1, "name": "Boots", "price": 90, "quantity_in_stock": 1}\n'),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(Product.objects.get(pk=1).name, "Boots")
+
+    @override_settings(IMPORT_BATCH_SIZE=1)
+    def test_import_endpoint_with_unreadable_lines(self) -> None:
+        """Test that bad UTF-8 lines and truncated files keep the rows saved before"""
+        self.set_headers_as_admin()
+        lines: list[bytes] = [
+            b'{"name": "Boots", "price": 90, "quantity_in_stock": 1}\n',
+            b'{"name": "\xff", "price": 1, "quantity_in_stock": 1}\n',
+            b'{"name": "Socks", "price": 5, "quantity_in_stock": 1}\n',
+        ]
+
+        response: Response = self.client.generic(
+            "POST",
+            self.products_import_url("ndjson"),
+            b"".join(lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["errors"][0]["line"], 2)
+
+        response = self.client.generic(
+            "POST",
+            self.products_import_url("ndjson") + "?compress=gzip",
+            gzip.compress(b"".join(lines))[:-4],
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["error_count"], 2)
+
+    def test_import_endpoint_permissions_and_errors(self) -> None:
+        """Test that only admins can import and that bad requests are refused"""
+        response: Response = self.client.post(self.products_import_url("csv"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.set_headers_as_normal_user()
+        response = self.client.post(self.products_import_url("csv"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials()
+        self.set_headers_as_admin()
+        response = self.client.post(self.products_import_url("xml"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(self.products_import_url("csv"), {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_command(self) -> None:
+        """Test that the command imports a gzipped file"""
+        self._create_products(2)
+        output: StringIO = StringIO()
+
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "products.csv.gz"
+            path.write_bytes(gzip.compress(CSV_FILE.encode()))
+            call_command("import_products", str(path), stdout=output, stderr=StringIO())
+
+        self.assertIn("2 created, 1 updated, 1 rows with errors.", output.getvalue())
+
+    def test_import_command_from_stdin(self) -> None:
+        """Test that the command does not close the standard input"""
+        stdin: StringIO = StringIO('{"name": "Boots", "price": 90, "quantity_in_stock": 1}\n')
+        output: StringIO = StringIO()
+
+        with mock.patch("sys.stdin", stdin):
+            call_command("import_products", "-", format="ndjson", stdout=output)
+
+        self.assertFalse(stdin.closed)
+        self.assertIn("1 created", output.getvalue())
@@ -3,9 +3,12 @@
 from typing import Any
 
 from rest_framework.response import Response
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 from rest_framework import status
 
 from products.models import Product
+from products.pagination import ProductCursorPagination
 from products.tests.test_setup import BaseTestCaseSetUp
 
 
@@ -84,7 +87,60 @@ class ProductGetTest(BaseTestCaseSetUp):
         response: Response = self.client.get(self.products_list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), products_quantity)
+        self.assertEqual(len(response.data.get("results")), products_quantity)
+        self.assertIsNone(response.data.get("next"))
+        self.assertIsNone(response.data.get("previous"))
+
+    def test_get_products_paginated_with_cursor(self) -> None:
+        """Test if the api walks through all the products with the cursors"""
+        self._create_products(7)
+
+        response: Response = self.client.get(self.products_list_url, {"page_size": 3})
+        ids: list[int] = [product["id"] for product in response.data.get("results")]
+
+        while response.data.get("next"):
+            response = self.client.get(response.data.get("next"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [product["id"] for product in response.data.get("results")]
+
+        self.assertEqual(ids, list(range(1, 8)))
+
+        response = self.client.get(response.data.get("previous"))
+        self.assertEqual(
+            [product["id"] for product in response.data.get("results")], [4, 5, 6]
+        )
+
+    def test_get_products_page_size_is_capped(self) -> None:
+        """Test if the api does not allow a page size bigger than the maximum"""
+        paginator: ProductCursorPagination = ProductCursorPagination()
+        request: Request = Request(
+            APIRequestFactory().get(self.products_list_url, {"page_size": 10**6})
+        )
+
+        self.assertEqual(paginator.get_page_size(request), paginator.max_page_size)
+
+    def test_get_products_ordered_by_price(self) -> None:
+        """Test if the api return the products ordered by price"""
+        self._create_products(4)
+        Product.objects.filter(pk=3).update(price=1.0)
+
+        response: Response = self.client.get(
+            self.products_list_url, {"ordering": "price", "page_size": 2}
+        )
+
+        self.assertEqual(
+            [product["id"] for product in response.data.get("results")], [3, 1]
+        )
+
+    def test_get_products_with_invalid_cursor(self) -> None:
+        """Test if the api return a 404 error if the cursor is not valid"""
+        self._create_products(2)
+
+        response: Response = self.client.get(
+            self.products_list_url, {"cursor": "invalid"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_get_products_with_no_products(self) -> None:
         """Test if the api return a 404 error if there is no products"""
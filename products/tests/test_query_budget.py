@@ -0,0 +1,48 @@
+"""Test that the products endpoints run a fixed number of queries"""
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.models import Category, Product
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductQueryBudgetTest(BaseTestCaseSetUp):
+    """The queries of the read endpoints must not grow with the products"""
+
+    def _check_budget(self, budget: int, url: str, data: dict | None = None) -> None:
+        """Check the budget of an url with a few products and with many"""
+        for quantity in (1, 30):
+            with self.subTest(products=quantity):
+                Product.objects.all().delete()
+                Category.objects.all().delete()
+                self._create_products(quantity)
+                Product.objects.update(name="product", description="shoes")
+
+                response: Response = self.assertQueryBudget(budget, url, data)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_products_list_budget(self) -> None:
+        """Test that the products list runs a single query"""
+        self._check_budget(1, self.products_list_url)
+
+    def test_products_list_with_facets_budget(self) -> None:
+        """Test that the facets add two queries to the products list"""
+        self._check_budget(3, self.products_list_url, {"facets": "true"})
+
+    def test_products_search_budget(self) -> None:
+        """Test that the search runs the search query and a products query"""
+        self._check_budget(2, self.products_search_url, {"q": "shoes"})
+
+    def test_categories_list_budget(self) -> None:
+        """Test that the categories list runs at most one query"""
+        self._check_budget(1, self.categories_list_url)
+
+    def test_product_detail_budget(self) -> None:
+        """Test that the product detail runs a single query"""
+        self._create_products(1)
+
+        response: Response = self.assertQueryBudget(1, self.product_detail_url(1))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
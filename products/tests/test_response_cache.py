@@ -0,0 +1,182 @@
+"""Test module for the cached anonymous responses of the catalog"""
+
+from unittest import mock
+
+from django.test import override_settings
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from ecomerce_project.response_cache import response_cache
+from products.bulk import bulk_update_products
+from products.importer import import_products
+from products.models import Category, Product
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ResponseCacheTest(BaseTestCaseSetUp):
+    """Test class to test the response cache and its purges"""
+
+    def test_product_detail_hit(self) -> None:
+        """Test that a hit is served without any query"""
+        self._create_products(1)
+        response: Response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response["X-Response-Cache"], "miss")
+
+        with self.assertNumQueries(0):
+            hit: Response = self.client.get(self.product_detail_url(1))
+
+        self.assertEqual(hit["X-Response-Cache"], "hit")
+        self.assertEqual(hit.content, response.content)
+        self.assertEqual(hit["Content-Type"], response["Content-Type"])
+        self.assertEqual(hit["ETag"], response["ETag"])
+
+        hit = self.client.get(self.product_detail_url(1), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(hit.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_product_purge_is_precise(self) -> None:
+        """Test that saving a product purges its responses and no others"""
+        self._create_products(2)
+        self.client.get(self.product_detail_url(1))
+        self.client.get(self.product_detail_url(2))
+        self.client.get(self.products_list_url)
+
+        product: Product = Product.objects.get(pk=1)
+        product.price = 99
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+
+        response: Response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertEqual(response.data["price"], 99)
+        self.assertEqual(self.client.get(self.products_list_url)["X-Response-Cache"], "miss")
+        self.assertEqual(self.client.get(self.product_detail_url(2))["X-Response-Cache"], "hit")
+
+    def test_category_purge(self) -> None:
+        """Test that renaming a category purges the products showing it"""
+        self._create_products(2)
+        for url in (
+            self.product_detail_url(1),
+            self.product_detail_url(2),
+            self.categories_list_url,
+            self.products_list_url,
+        ):
+            self.client.get(url)
+
+        category: Category = Category.objects.get(pk=1)
+        category.category_name = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+
+        response: Response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertEqual(response.data["category"]["category_name"], "renamed")
+        self.assertEqual(self.client.get(self.categories_list_url)["X-Response-Cache"], "miss")
+        self.assertEqual(self.client.get(self.products_list_url)["X-Response-Cache"], "miss")
+        self.assertEqual(self.client.get(self.product_detail_url(2))["X-Response-Cache"], "hit")
+
+    def test_bulk_writes_purge(self) -> None:
+        """Test that the writes without signals purge the responses too"""
+        self._create_products(1)
+        self.client.get(self.product_detail_url(1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_update_products({1: {"price": 7}})
+        response: Response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response.data["price"], 7)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_products(
+                ['{"id": 1, "name": "new", "price": 8, "quantity_in_stock": 1}'], "ndjson"
+            )
+        response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response.data["name"], "new")
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "shop.example.com"])
+    def test_query_string_and_users(self) -> None:
+        """Test that each url is cached apart and only for anonymous users"""
+        self._create_products(3)
+        self.client.get(self.products_list_url, {"page_size": 1})
+
+        response: Response = self.client.get(self.products_list_url, {"page_size": 2})
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertEqual(len(response.data["results"]), 2)
+
+        # The pages link to each other with absolute urls
+        response = self.client.get(
+            self.products_list_url, {"page_size": 2}, HTTP_HOST="shop.example.com"
+        )
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertIn("//shop.example.com/", response.data["next"])
+        response = self.client.get(self.products_list_url, {"page_size": 2}, secure=True)
+        self.assertEqual(response["X-Response-Cache"], "miss")
+
+        self.set_headers_as_normal_user()
+        response = self.client.get(self.products_list_url, {"page_size": 2})
+        self.assertNotIn("X-Response-Cache", response)
+
+    def test_purge_waits_for_commit(self) -> None:
+        """Test that a response built before the commit is not cached as current"""
+        self._create_products(1)
+        self.client.get(self.product_detail_url(1))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            bulk_update_products({1: {"price": 7}})
+            # Still the response of the old row until the transaction commits
+            self.assertEqual(
+                self.client.get(self.product_detail_url(1))["X-Response-Cache"], "hit"
+            )
+        for callback in callbacks:
+            callback()
+
+        response: Response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertEqual(response.data["price"], 7)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_stale_while_revalidate(self) -> None:
+        """Test that an expired response is served while another worker builds it"""
+        self._create_products(1)
+        self.client.get(self.product_detail_url(1))
+
+        with mock.patch.object(response_cache.flights, "acquire", return_value=None):
+            with self.assertNumQueries(0):
+                response: Response = self.client.get(self.product_detail_url(1))
+            self.assertEqual(response["X-Response-Cache"], "stale")
+
+            # A purged response is not served stale
+            product: Product = Product.objects.get(pk=1)
+            product.price = 5
+            with self.captureOnCommitCallbacks(execute=True):
+                product.save()
+            response = self.client.get(self.product_detail_url(1))
+            self.assertEqual(response["X-Response-Cache"], "miss")
+            self.assertEqual(response.data["price"], 5)
+
+        response = self.client.get(self.product_detail_url(1))
+        self.assertEqual(response["X-Response-Cache"], "miss")
+
+    def test_flight_released(self) -> None:
+        """Test that the key is released once the response is stored, or not cached"""
+        self._create_products(1)
+        self.client.get(self.product_detail_url(1))
+        self.client.get(self.product_detail_url(2))
+        self.client.get(self.categories_list_url)
+
+        self.assertEqual(response_cache.flights._held, {})
+
+    def test_uncached_response_does_not_serialize_workers(self) -> None:
+        """Test that a response that was not cached is built without waiting"""
+        self._create_products(1)
+        response: Response = self.client.get(self.product_detail_url(2))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with mock.patch.object(response_cache.flights, "acquire") as acquire:
+            response = self.client.get(self.product_detail_url(2))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        acquire.assert_not_called()
+
+        # A cached response is not marked
+        self.client.get(self.product_detail_url(1))
+        self.assertEqual(self.client.get(self.product_detail_url(1))["X-Response-Cache"], "hit")
@@ -0,0 +1,118 @@
+"""Test module for the products search"""
+
+from django.db import connection
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from products.models import Product
+from products.search import SQLITE_TRIGGERS, ensure_search_index
+from products.tests.test_setup import BaseTestCaseSetUp
+
+
+class ProductSearchTest(BaseTestCaseSetUp):
+    """Test class to test the full text search of products"""
+
+    def _create_catalog(self) -> None:
+        """Create some products to search"""
+        Product.objects.create(
+            name="Running shoes",
+            description="Light shoes for long distance running",
+            price=80,
+            quantity_in_stock=5,
+        )
+        Product.objects.create(
+            name="Socks",
+            description="Cotton socks, great with running shoes",
+            price=5,
+            quantity_in_stock=50,
+        )
+        Product.objects.create(
+            name="Rain jacket", description=None, price=60, quantity_in_stock=3
+        )
+
+    def test_search_products_ranked(self) -> None:
+        """Test if the matches in the name rank above the description ones"""
+        self._create_catalog()
+
+        response: Response = self.client.get(self.products_search_url, {"q": "shoes"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([product["name"] for product in response.data], ["Running shoes", "Socks"])
+        self.assertGreater(response.data[0]["rank"], response.data[1]["rank"])
+        self.assertEqual(response.data[0]["highlight"]["name"], "Running <mark>shoes</mark>")
+        self.assertIn("<mark>shoes</mark>", response.data[1]["highlight"]["description"])
+
+    def test_search_highlights_are_escaped(self) -> None:
+        """Test if the product text is HTML escaped around the marks"""
+        Product.objects.create(
+            name="<b>Bold</b> shoes", description="Fits <script>", price=1, quantity_in_stock=1
+        )
+
+        response: Response = self.client.get(self.products_search_url, {"q": "shoes"})
+
+        self.assertEqual(
+            response.data[0]["highlight"]["name"], "&lt;b&gt;Bold&lt;/b&gt; <mark>shoes</mark>"
+        )
+        self.assertEqual(response.data[0]["highlight"]["description"], "Fits &lt;script&gt;")
+        self.assertEqual(response.data[0]["name"], "<b>Bold</b> shoes")
+
+    def test_search_products_by_prefix_and_stem(self) -> None:
+        """Test if the last word matches as a prefix and words match by stem"""
+        self._create_catalog()
+
+        response: Response = self.client.get(self.products_search_url, {"q": "jack"})
+        self.assertEqual([product["name"] for product in response.data], ["Rain jacket"])
+
+        response = self.client.get(self.products_search_url, {"q": "run shoe"})
+        self.assertEqual(len(response.data), 2)
+
+    def test_search_follows_product_changes(self) -> None:
+        """Test if the index is updated when the products are saved or deleted"""
+        self._create_catalog()
+        product: Product = Product.objects.get(name="Rain jacket")
+        product.name = "Winter coat"
+        product.save()
+
+        self.assertEqual(self.client.get(self.products_search_url, {"q": "jacket"}).data, [])
+        self.assertEqual(len(self.client.get(self.products_search_url, {"q": "coat"}).data), 1)
+
+        product.delete()
+        self.assertEqual(self.client.get(self.products_search_url, {"q": "coat"}).data, [])
+
+    def test_search_with_limit(self) -> None:
+        """Test if the api returns at most limit results"""
+        self._create_catalog()
+
+        response: Response = self.client.get(self.products_search_url, {"q": "shoes", "limit": 1})
+
+        self.assertEqual(len(response.data), 1)
+
+    def test_search_with_wrong_parameters(self) -> None:
+        """Test if the api returns a 400 error with missing or wrong parameters"""
+        response: Response = self.client.get(self.products_search_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.products_search_url, {"q": "shoes", "limit": "ten"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_with_only_symbols(self) -> None:
+        """Test if a query with no words returns no results"""
+        self._create_catalog()
+
+        response: Response = self.client.get(self.products_search_url, {"q": '"*'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_missing_triggers_are_recreated(self) -> None:
+        """Test if the index is repaired when a migration dropped its triggers"""
+        with connection.cursor() as cursor:
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {trigger}")
+        self._create_catalog()
+
+        ensure_search_index()
+
+        response: Response = self.client.get(self.products_search_url, {"q": "socks"})
+        self.assertEqual([product["name"] for product in response.data], ["Socks"])
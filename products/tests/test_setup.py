@@ -2,8 +2,12 @@
 
 from typing import override, Any
 
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from rest_framework.response import Response
 from rest_framework.test import APITestCase
 from rest_framework.authtoken.models import Token
 
@@ -17,6 +21,9 @@ class BaseTestCaseSetUp(APITestCase):
     # URLs
     categories_list_url: str = reverse("categories-list")
     products_list_url: str = reverse("products-list")
+    products_search_url: str = reverse("products-search")
+    products_autocomplete_url: str = reverse("products-autocomplete")
+    products_bulk_url: str = reverse("products-bulk")
 
     category_data: dict[str, str] = {"category_name": "underwears"}
     product_data: dict[str, Any] = {
@@ -59,8 +66,30 @@ class BaseTestCaseSetUp(APITestCase):
     def tearDown(self) -> None:
         self.client.logout()
         self.client.credentials()
+        cache.clear()
         return super().tearDown()
 
+    def assertQueryBudget(
+        self, budget: int, url: str, data: dict[str, Any] | None = None
+    ) -> Response:
+        """Get an url and check that it runs at most budget queries"""
+        with CaptureQueriesContext(connection) as queries:
+            response: Response = self.client.get(url, data)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        return response
+
+    def products_export_url(self, export_format: str) -> str:
+        """Return the url for the products export view"""
+        return reverse("products-export", kwargs={"export_format": export_format})
+
+    def products_import_url(self, import_format: str) -> str:
+        """Return the url for the products import view"""
+        return reverse("products-import", kwargs={"import_format": import_format})
+
     def product_detail_url(self, pk: int) -> str:
         """Return the url for the product detail view"""
         return reverse("product-detail", kwargs={"pk": pk})
@@ -75,17 +104,23 @@ class BaseTestCaseSetUp(APITestCase):
 
     def _create_categories(self, quantity: int) -> None:
         """Create a some of categories"""
-        for i in range(1, quantity + 1):
-            Category.objects.create(category_name="category" + str(i))
+        Category.objects.bulk_create(
+            Category(category_name="category" + str(i)) for i in range(1, quantity + 1)
+        )
 
     def _create_products(self, quantity: int) -> None:
         """Create a some of products"""
         self._create_categories(quantity)
+        categories: dict[str, Category] = Category.objects.in_bulk(
+            field_name="category_name"
+        )
 
-        for i in range(1, quantity + 1):
-            Product.objects.create(
+        Product.objects.bulk_create(
+            Product(
                 name="product" + str(i),
-                category=Category.objects.get(category_name="category" + str(i)),
+                category=categories["category" + str(i)],
                 quantity_in_stock=10,
                 price=10.0,
             )
+            for i in range(1, quantity + 1)
+        )
@@ -7,11 +7,51 @@ from products.views import (
     ProductListView,
     ProductDetailView,
     CategoryDetailView,
+    ProductSearchView,
+    ProductAutocompleteView,
+    ProductExportView,
+    ProductImportView,
+    ProductBulkView,
 )
 
 urlpatterns: list[URLPattern | URLResolver] = [
     path("categories", CategoryListView.as_view(), name="categories-list"),
     path("categories/<int:pk>", CategoryDetailView.as_view(), name="category-detail"),
     path("", ProductListView.as_view(), name="products-list"),
+    path("search", ProductSearchView.as_view(), name="products-search"),
+    path(
+        "autocomplete",
+        ProductAutocompleteView.as_view(),
+        name="products-autocomplete",
+    ),
+    path(
+        "export/<str:export_format>",
+        ProductExportView.as_view(),
+        name="products-export",
+    ),
+    path(
+        "import/<str:import_format>",
+        ProductImportView.as_view(),
+        name="products-import",
+    ),
+    path("bulk", ProductBulkView.as_view(), name="products-bulk"),
     path("<int:pk>", ProductDetailView.as_view(), name="product-detail"),
 ]
+
+# Maximum number of queries of a request to each url, authentication included
+query_budgets: dict[str, int | None] = {
+    "categories-list": 3,
+    # A deletion also touches the products losing the category
+    "category-detail": 5,
+    "products-list": 4,
+    "products-search": 3,
+    "products-autocomplete": 2,
+    # A deletion also reads the carts losing the product, and empties its
+    # cart items and order lines
+    "product-detail": 6,
+    # The export queries run while the response streams, after the count
+    "products-export": 1,
+    # The import and bulk queries grow with the batches, not with the rows
+    "products-import": None,
+    "products-bulk": None,
+}
@@ -1,8 +1,14 @@
 """Views to manage the products app"""
 
-from typing import Iterable
+import gzip
+import io
+from datetime import datetime
+from typing import Any, Iterable
 
-from django.shortcuts import get_list_or_404, get_object_or_404
+from django.db.models import QuerySet
+from django.conf import settings
+from django.http import Http404, HttpResponseBase, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -10,8 +16,36 @@ from rest_framework.request import Request
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
+from ecomerce_project.conditional import (
+    deleted_at,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from ecomerce_project.fieldsets import project, requested_fields
+from ecomerce_project.reference_cache import category_cache
+from ecomerce_project.response_cache import response_cache
+from ecomerce_project.row_mappers import RowMapper, get_row_mapper
+from products.autocomplete import product_name_index
+from products.bulk import (
+    bulk_delete_products,
+    bulk_update_products,
+    parse_bulk_ids,
+    parse_bulk_updates,
+)
+from products.cache_tags import CATEGORIES_TAG, PRODUCTS_TAG, category_tag, product_tag
+from products.export import COMPRESSIONS, EXPORT_FORMATS, export_products
+from products.filters import filter_products, product_facets
+from products.importer import IMPORT_FORMATS, ImportResult, import_products
 from products.models import Product, Category
-from products.serializers import ProductSerializer, CategorySerializer
+from products.pagination import ProductCursorPagination
+from products.search import search_products
+from products.serializers import (
+    ProductSerializer,
+    CategorySerializer,
+    ProductFilterSerializer,
+)
+from shopping_and_payments.cart_cache import bump_cart_versions, carts_holding
 from users.models import User
 
 PERMISION_ERROR: str = "You do not have permission to perform this action."
@@ -20,13 +54,38 @@ PERMISION_ERROR: str = "You do not have permission to perform this action."
 class CategoryListView(APIView):
     """To get all the categories and create a new one"""
 
-    def get(self, _request: Request) -> Response:
-        """Get all the categories"""
-        categories: Iterable = get_list_or_404(Category)
-        serializer: CategorySerializer = CategorySerializer(
-            instance=categories, many=True
+    @response_cache.coalesce
+    def get(self, request: Request) -> Response:
+        """Get all the categories, or a 304 if the client has them already
+
+        The anonymous responses are cached until a category changes, and
+        built by one worker at a time.
+        """
+        versions: dict[str, Any] = response_cache.versions(CATEGORIES_TAG)
+
+        categories: list[Category] = category_cache.all()
+        if not categories:
+            raise Http404("No Category matches the given query.")
+
+        etag: str = make_etag(
+            "categories", *[(category.pk, category.updated_at) for category in categories]
         )
-        return Response(serializer.data, status.HTTP_200_OK)
+        # Without the time of the last deletion the list has no Last-Modified
+        deleted: datetime | None = deleted_at("products.Category")
+        last_modified: datetime | None = (
+            max(deleted, *[category.updated_at for category in categories]) if deleted else None
+        )
+        cached: HttpResponseBase | None = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+
+        mapper: RowMapper = get_row_mapper(CategorySerializer)
+        response: Response = set_validators(
+            Response(mapper.map_instances(categories), status.HTTP_200_OK),
+            etag,
+            last_modified,
+        )
+        return response_cache.set(request, response, versions)
 
     def post(self, request: Request) -> Response:
         """Create a new Category"""
@@ -50,7 +109,7 @@ class CategoryDetailView(APIView):
 
     def get(self, _request: Request, pk: int) -> Response:
         """Get a single category by id"""
-        category: Category = get_object_or_404(Category, pk=pk)
+        category: Category = category_cache.get_or_404(pk=pk)
         serializer: CategorySerializer = CategorySerializer(instance=category)
         return Response(serializer.data, status.HTTP_200_OK)
 
@@ -76,11 +135,64 @@ class CategoryDetailView(APIView):
 class ProductListView(APIView):
     """View class to create a product and get a list of all of them"""
 
-    def get(self, _request: Request) -> Response:
-        """Get all the products"""
-        products: Iterable = get_list_or_404(Product)
-        serializer: ProductSerializer = ProductSerializer(instance=products, many=True)
-        return Response(serializer.data, status.HTTP_200_OK)
+    pagination_class = ProductCursorPagination
+
+    @response_cache.coalesce
+    def get(self, request: Request) -> Response:
+        """Get a page of products
+
+        The products can be filtered by category, price__gte, price__lte and
+        in_stock, and facets=true adds the facet counts of the filtered list.
+        fields=id,name,price returns, and loads, only those fields. The
+        anonymous responses are cached until a product or one of the
+        categories they show changes.
+        """
+        versions: dict[str, Any] = response_cache.versions(PRODUCTS_TAG)
+
+        filters: ProductFilterSerializer = ProductFilterSerializer(
+            data=request.query_params
+        )
+        if not filters.is_valid():
+            return Response(filters.errors, status.HTTP_400_BAD_REQUEST)
+        try:
+            fields: list[str] | None = requested_fields(request, ProductSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status.HTTP_400_BAD_REQUEST)
+
+        queryset: QuerySet = filter_products(
+            Product.objects.all(), filters.validated_data
+        )
+        paginator: ProductCursorPagination = self.pagination_class()
+        # The rows skip the serializer, the cursors read their sort keys
+        mapper: RowMapper = get_row_mapper(
+            ProductSerializer, None if fields is None else tuple(fields)
+        )
+        sort_keys: list[str] = [
+            key.lstrip("-") for key in paginator.get_ordering(request, queryset, self)
+        ]
+        rows: list[tuple] = paginator.paginate_queryset(
+            mapper.rows(queryset, *sort_keys), request, view=self
+        )
+
+        # An empty first page means no product matches the filters
+        if not rows and paginator.cursor is None:
+            raise Http404("No Product matches the given query.")
+
+        response: Response = paginator.get_paginated_response(mapper.map(rows))
+        categories: set[int] = {
+            row.category for row in rows if getattr(row, "category", None) is not None
+        }
+
+        if filters.validated_data.get("facets"):
+            response.data["facets"] = product_facets(queryset)
+            categories.update(
+                facet["id"]
+                for facet in response.data["facets"]["categories"]
+                if facet["id"] is not None
+            )
+        return response_cache.set(
+            request, response, versions, *[category_tag(pk) for pk in categories]
+        )
 
     def post(self, request: Request) -> Response:
         """Create a new product"""
@@ -89,7 +201,7 @@ class ProductListView(APIView):
             return Response({"error": PERMISION_ERROR}, status.HTTP_403_FORBIDDEN)
 
         category_name: str = request.data.pop("category")
-        category: Category = get_object_or_404(Category, category_name=category_name)
+        category: Category = category_cache.get_or_404(name=category_name)
         serializer: ProductSerializer = ProductSerializer(data=request.data)
 
         if serializer.is_valid():
@@ -102,17 +214,63 @@ class ProductListView(APIView):
 class ProductDetailView(APIView):
     """View to manage get,put and delete products by id"""
 
-    def get(self, _request: Request, pk: int) -> Response:
-        """Get a single product by id"""
-        products: Product = get_object_or_404(Product, pk=pk)
-        serializer: ProductSerializer = ProductSerializer(instance=products)
-        return Response(serializer.data, status.HTTP_200_OK)
+    @response_cache.coalesce
+    def get(self, request: Request, pk: int) -> Response:
+        """Get a single product by id, only its fields=... if given
+
+        Answers with a 304 if the client has the current version already.
+        The anonymous responses are cached until the product or its category
+        changes, and built by one worker at a time, so a hot product expiring
+        does not send every waiting request to the database.
+        """
+        versions: dict[str, Any] = response_cache.versions(product_tag(pk))
+
+        try:
+            fields: list[str] | None = requested_fields(request, ProductSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status.HTTP_400_BAD_REQUEST)
+
+        products: Product = get_object_or_404(
+            project(
+                Product.objects.all(),
+                fields,
+                select_related=("category",),
+                required=("updated_at",),
+            ),
+            pk=pk,
+        )
+
+        # The nested category is part of the product as it is sent
+        category: Category | None = (
+            products.category if fields is None or "category" in fields else None
+        )
+        etag: str = make_etag(
+            "product",
+            products.pk,
+            products.updated_at,
+            category.updated_at if category else None,
+            fields,
+        )
+        last_modified: datetime = max(
+            products.updated_at, category.updated_at if category else products.updated_at
+        )
+        cached: HttpResponseBase | None = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+
+        serializer: ProductSerializer = ProductSerializer(instance=products, fields=fields)
+        response: Response = set_validators(
+            Response(serializer.data, status.HTTP_200_OK), etag, last_modified
+        )
+        return response_cache.set(
+            request, response, versions, *([category_tag(category.pk)] if category else [])
+        )
 
     def put(self, request: Request, pk: int) -> Response:
         """Update a product"""
         self.permission_classes = [IsAuthenticated]
         category_name: str = request.data.pop("category")
-        category: Category = get_object_or_404(Category, category_name=category_name)
+        category: Category = category_cache.get_or_404(name=category_name)
         product: Product = get_object_or_404(Product, pk=pk)
         serializer: ProductSerializer = ProductSerializer(
             instance=product, data=request.data
@@ -126,5 +284,214 @@ class ProductDetailView(APIView):
         """Delete a product by id"""
         self.permission_classes = [IsAuthenticated]
         product: Product = get_object_or_404(Product, pk=pk)
+        # The cascade deletes the cart items without bumping their carts
+        cart_ids: set[int] = carts_holding([product.pk])
         product.delete()
+        bump_cart_versions(cart_ids)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProductSearchView(APIView):
+    """Full text search over the products name and description"""
+
+    default_limit: int = 20
+    max_limit: int = 100
+
+    def get(self, request: Request) -> Response:
+        """Get the products matching the q parameter, the best ranked first"""
+        text: str = request.query_params.get("q", "").strip()
+        if not text:
+            return Response(
+                {"error": "The q parameter is required."}, status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit: int = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response(
+                {"error": "The limit must be a positive integer."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        matches: list[dict[str, Any]] = search_products(text, min(limit, self.max_limit))
+        products: dict[int, Product] = Product.objects.select_related("category").in_bulk(
+            [match["id"] for match in matches]
+        )
+        matches = [match for match in matches if match["id"] in products]
+
+        serializer: ProductSerializer = ProductSerializer(
+            instance=[products[match["id"]] for match in matches], many=True
+        )
+        results: list[dict[str, Any]] = [
+            {
+                **product,
+                "rank": match["rank"],
+                "highlight": {
+                    "name": match["name"],
+                    "description": match["description"],
+                },
+            }
+            for product, match in zip(serializer.data, matches)
+        ]
+        return Response(results, status.HTTP_200_OK)
+
+
+class ProductAutocompleteView(APIView):
+    """Suggestions for the products name as the user types"""
+
+    default_limit: int = 10
+    max_limit: int = 50
+
+    def get(self, request: Request) -> Response:
+        """Get the most popular products whose name has a word starting with q"""
+        try:
+            limit: int = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response(
+                {"error": "The limit must be a positive integer."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        suggestions: list[tuple[int, str]] = product_name_index.suggest(
+            request.query_params.get("q", ""), min(limit, self.max_limit)
+        )
+        return Response(
+            [{"id": pk, "name": name} for pk, name in suggestions], status.HTTP_200_OK
+        )
+
+
+class ProductExportView(APIView):
+    """Stream the whole catalog as CSV or NDJSON"""
+
+    def get(self, request: Request, export_format: str) -> Response | StreamingHttpResponse:
+        """Stream the products, with the filters of the products list
+
+        The export is sent while it is read from the database, so its memory
+        use does not depend on the size of the catalog. compress=gzip sends it
+        gzip compressed.
+        """
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unknown export format {export_format}."},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        compress: str | None = request.query_params.get("compress") or None
+        if compress is not None and compress not in COMPRESSIONS:
+            return Response(
+                {"error": f"Unknown compression {compress}."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        filters: ProductFilterSerializer = ProductFilterSerializer(
+            data=request.query_params
+        )
+        if not filters.is_valid():
+            return Response(filters.errors, status.HTTP_400_BAD_REQUEST)
+
+        filename: str = f"products.{export_format}"
+        content_type: str = EXPORT_FORMATS[export_format][1]
+        if compress == "gzip":
+            filename, content_type = f"{filename}.gz", "application/gzip"
+
+        response: StreamingHttpResponse = StreamingHttpResponse(
+            export_products(
+                export_format,
+                compress,
+                settings.EXPORT_CHUNK_SIZE,
+                filter_products(Product.objects.all(), filters.validated_data),
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ProductImportView(APIView):
+    """Create or update products from an uploaded CSV or NDJSON file"""
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request: Request, import_format: str) -> Response:
+        """Import the products of the file
+
+        The file is sent as the "file" field of a multipart form, or as the
+        raw body of the request. compress=gzip tells that it is gzipped.
+        Invalid rows, and lines that are not UTF-8, do not stop the import,
+        they are listed in the response with their line number.
+        """
+        if import_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"Unknown import format {import_format}."},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        source: Iterable[bytes]
+        if request.content_type.startswith("multipart/form-data"):
+            if "file" not in request.FILES:
+                return Response(
+                    {"error": "The file field is required."}, status.HTTP_400_BAD_REQUEST
+                )
+            source = request.FILES["file"]
+        else:
+            source = request.stream or io.BytesIO()
+
+        if request.query_params.get("compress") == "gzip":
+            source = gzip.GzipFile(fileobj=source)
+
+        result: ImportResult = import_products(
+            source, import_format, batch_size=settings.IMPORT_BATCH_SIZE
+        )
+        return Response(result.as_dict(), status.HTTP_200_OK)
+
+
+class ProductBulkView(APIView):
+    """Change the price and stock of many products, or delete many of them"""
+
+    permission_classes = [IsAdminUser]
+
+    def patch(self, request: Request) -> Response:
+        """Update the products of a list of {id, price?, quantity_in_stock?}
+
+        The list is the body or its "items". Nothing is changed if any item
+        is invalid. The ids that do not exist are skipped and listed in the
+        response.
+        """
+        items: Any = request.data
+        if isinstance(items, dict):
+            items = items.get("items")
+        try:
+            updates, errors = parse_bulk_updates(items)
+        except ValueError as error:
+            return Response({"error": str(error)}, status.HTTP_400_BAD_REQUEST)
+        if errors:
+            return Response({"errors": errors}, status.HTTP_400_BAD_REQUEST)
+
+        updated, not_found = bulk_update_products(
+            updates, settings.BULK_UPDATE_BATCH_SIZE
+        )
+        return Response(
+            {"updated": updated, "not_found": not_found}, status.HTTP_200_OK
+        )
+
+    def delete(self, request: Request) -> Response:
+        """Delete the products of the list of ids sent as the body or its "ids"
+
+        The ids that do not exist are skipped and listed in the response.
+        """
+        ids: Any = request.data
+        if isinstance(ids, dict):
+            ids = ids.get("ids")
+        try:
+            ids = parse_bulk_ids(ids)
+        except ValueError as error:
+            return Response({"error": str(error)}, status.HTTP_400_BAD_REQUEST)
+
+        deleted, not_found = bulk_delete_products(ids, settings.BULK_UPDATE_BATCH_SIZE)
+        return Response(
+            {"deleted": deleted, "not_found": not_found}, status.HTTP_200_OK
+        )
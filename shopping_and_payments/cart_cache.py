@@ -0,0 +1,120 @@
+""" This module contains the cached read model of the shopping carts """
+
+from time import time_ns
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.fields import DateTimeField
+
+from shopping_and_payments.models import CartItem, ShoppingCart
+
+
+def _version_key(cart_id: int) -> str:
+    """Return the cache key of the version counter of a cart"""
+    return f"cart:{cart_id}:version"
+
+
+def _read_model_key(cart_id: int, version: int) -> str:
+    """Return the cache key of a version of the read model of a cart"""
+    return f"cart:{cart_id}:v{version}"
+
+
+def get_cart_version(cart_id: int) -> int:
+    """Return the current version of a cart
+
+    A missing counter (never set or evicted) starts from the current time in
+    nanoseconds, so it never goes back to a version cached before.
+    """
+    version: int | None = cache.get(_version_key(cart_id))
+    if version is None:
+        cache.add(_version_key(cart_id), time_ns(), timeout=None)
+        version = cache.get(_version_key(cart_id), time_ns())
+    return version
+
+
+def bump_cart_version(cart_id: int) -> None:
+    """Invalidate the cached read model of a cart
+
+    Must be called after every write to the items of the cart.
+    """
+    try:
+        cache.incr(_version_key(cart_id))
+    except ValueError:
+        cache.add(_version_key(cart_id), time_ns(), timeout=None)
+
+
+def bump_cart_versions(cart_ids: Iterable[int]) -> None:
+    """Invalidate the cached read models of many carts"""
+    for cart_id in cart_ids:
+        bump_cart_version(cart_id)
+
+
+def carts_holding(product_ids: Iterable[int]) -> set[int]:
+    """Return the ids of the carts holding any of the products
+
+    Deleting a product deletes the items holding it by cascade, without
+    going through the cart views: the carts are read before the delete and
+    their versions bumped after it.
+    """
+    return set(
+        CartItem.objects.filter(product__in=product_ids).values_list("cart_id", flat=True)
+    )
+
+
+def build_cart_read_model(cart_id: int) -> dict[str, Any] | None:
+    """Build the read model of a cart from the database"""
+    cart: dict[str, Any] | None = (
+        ShoppingCart.objects.filter(pk=cart_id)
+        .values("id", "user_id", "created_at")
+        .first()
+    )
+    if cart is None:
+        return None
+
+    lines: list[dict[str, Any]] = [
+        {
+            "id": item_id,
+            "product": product_id,
+            "product_name": product_name,
+            "unit_price": unit_price,
+            "quantity": quantity,
+            "line_total": unit_price * quantity,
+        }
+        for item_id, product_id, product_name, unit_price, quantity in CartItem.objects.filter(
+            cart_id=cart_id, product__isnull=False
+        )
+        .order_by("pk")
+        .values_list("pk", "product_id", "product__name", "product__price", "quantity")
+    ]
+
+    return {
+        "id": cart["id"],
+        "created_at": DateTimeField().to_representation(cart["created_at"]),
+        "user": cart["user_id"],
+        "products": [line["product"] for line in lines],
+        "lines": lines,
+        "item_count": len(lines),
+        "total_quantity": sum(line["quantity"] for line in lines),
+        "total_price": sum(line["line_total"] for line in lines),
+    }
+
+
+def get_cart_read_model(cart_id: int) -> dict[str, Any] | None:
+    """Return the read model of a cart, from the cache when possible
+
+    The cached entries expire after CART_CACHE_TIMEOUT seconds, which bounds
+    how long a product price change takes to show up in the totals.
+    """
+    version: int = get_cart_version(cart_id)
+    key: str = _read_model_key(cart_id, version)
+
+    read_model: dict[str, Any] | None = cache.get(key)
+    if read_model is None:
+        read_model = build_cart_read_model(cart_id)
+        if read_model is not None:
+            read_model["version"] = version
+            cache.set(key, read_model, settings.CART_CACHE_TIMEOUT)
+
+    return read_model
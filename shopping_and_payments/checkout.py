@@ -0,0 +1,186 @@
+""" This module contains the checkout logic for the shopping_and_payments app """
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.db.models import Case, F, IntegerField, QuerySet, Value, When
+from django.utils import timezone
+
+from shopping_and_payments.models import CartItem, OrderLine, ShoppingCart, ShopOrder
+
+from products.cache_tags import purge_products
+from products.models import Product
+
+# Arguments given to select_for_update() for each lock mode.
+# "wait" blocks until the rows are free, "nowait" fails straight away if any
+# row is locked and "skip_locked" treats locked rows as sold out, which keeps
+# the throughput up during flash sales.
+LOCK_MODES: dict[str, dict[str, bool]] = {
+    "wait": {},
+    "nowait": {"nowait": True},
+    "skip_locked": {"skip_locked": True},
+}
+
+
+class OutOfStockError(Exception):
+    """Raised when there is not enough stock to place an order"""
+
+    def __init__(self, product_ids: list[int]) -> None:
+        self.product_ids: list[int] = product_ids
+        super().__init__(f"Not enough stock for the products {product_ids}.")
+
+
+class _NotEnoughStock(Exception):
+    """Raised to roll back a stock update that did not match every product"""
+
+
+class StockLockedError(Exception):
+    """Raised when the stock is locked by another checkout in nowait mode, or
+    when the lock of the database is not released in time"""
+
+
+def checkout(cart: ShoppingCart, lock_mode: str | None = None) -> ShopOrder:
+    """Create an order for the cart and take its products out of stock
+
+    The cart items are read before the transaction starts: on SQLite a
+    transaction that reads before it writes cannot wait for the write lock
+    of another one, it fails with "database is locked" straight away.
+
+    Where the database has row locks, the product rows are locked with
+    SELECT ... FOR UPDATE in primary key order, so concurrent checkouts
+    always lock them in the same order and cannot deadlock. The stock is
+    then decremented with a single UPDATE that only matches the rows with
+    enough stock left, which on SQLite is the statement taking the lock.
+
+    The cart items are copied into order lines (product, unit price and
+    quantity at the moment of the purchase) with a single bulk insert, and
+    the order total is stored along with the order.
+    """
+    lock_mode = lock_mode or settings.CHECKOUT_LOCK_MODE
+    quantities: dict[int, int] = dict(
+        CartItem.objects.filter(cart=cart, product__isnull=False).values_list(
+            "product_id", "quantity"
+        )
+    )
+
+    try:
+        with transaction.atomic():
+            return _place_order(cart, quantities, lock_mode)
+    except OperationalError as error:
+        # The database lock was not released before the timeout
+        raise StockLockedError("The stock is locked by another checkout.") from error
+    except _NotEnoughStock:
+        # The UPDATE did not match every product and is rolled back: read
+        # which products are short of stock only now, on the failing path
+        stock: dict[int, int] = dict(
+            Product.objects.filter(pk__in=quantities).values_list("pk", "quantity_in_stock")
+        )
+        raise OutOfStockError(
+            sorted(pk for pk, quantity in quantities.items() if stock.get(pk, 0) < quantity)
+        ) from None
+
+
+def _place_order(cart: ShoppingCart, quantities: dict[int, int], lock_mode: str) -> ShopOrder:
+    """Take the quantities out of stock and create the order, in a transaction"""
+    if connection.features.has_select_for_update:
+        try:
+            locked: set[int] = set(
+                Product.objects.select_for_update(**LOCK_MODES[lock_mode])
+                .filter(pk__in=quantities)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+        except DatabaseError as error:
+            raise StockLockedError("The stock is locked by another checkout.") from error
+
+        # In skip_locked mode the rows locked by another checkout are sold out
+        unlocked: list[int] = sorted(pk for pk in quantities if pk not in locked)
+        if unlocked:
+            raise OutOfStockError(unlocked)
+
+    if quantities:
+        _take_out_of_stock(quantities)
+
+    lines: list[OrderLine] = [
+        OrderLine(
+            product_id=pk,
+            product_name=name,
+            unit_price=price,
+            quantity=quantities[pk],
+        )
+        for pk, name, price in Product.objects.filter(pk__in=quantities)
+        .order_by("pk")
+        .values_list("pk", "name", "price")
+    ]
+
+    order: ShopOrder = ShopOrder.objects.create(
+        cart=cart, total=sum(line.unit_price * line.quantity for line in lines)
+    )
+
+    for line in lines:
+        line.order = order
+    OrderLine.objects.bulk_create(lines)
+
+    return order
+
+
+def _take_out_of_stock(quantities: dict[int, int]) -> None:
+    """Decrement the stock of the products, if they all have enough of it"""
+    wanted: Case = Case(
+        *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+    updated: int = Product.objects.filter(
+        pk__in=quantities, quantity_in_stock__gte=wanted
+    ).update(
+        quantity_in_stock=F("quantity_in_stock") - wanted,
+        updated_at=timezone.now(),
+    )
+    if updated < len(quantities):
+        raise _NotEnoughStock
+
+    # update() does not send the signals purging the cached responses
+    purge_products(quantities)
+
+
+def cancel_order(order: ShopOrder) -> None:
+    """Put the products of an order back in stock and delete the order
+
+    The order lines are locked before they are read, with SELECT ... FOR
+    UPDATE or, on SQLite, with an UPDATE leaving them as they are, which
+    takes the write lock first. So an order cancelled twice at the same
+    time only gives its stock back once: the second cancel finds no lines
+    left. The stock is incremented with a single UPDATE from the lines.
+    """
+    try:
+        with transaction.atomic():
+            _give_back_stock(order)
+    except OperationalError as error:
+        # The database lock was not released before the timeout
+        raise StockLockedError("The stock is locked by another checkout.") from error
+
+
+def _give_back_stock(order: ShopOrder) -> None:
+    """Increment the stock from the order lines and delete the order, in a transaction"""
+    lines: QuerySet = OrderLine.objects.filter(order=order, product__isnull=False)
+    if connection.features.has_select_for_update:
+        lines = lines.select_for_update()
+    else:
+        lines.update(quantity=F("quantity"))
+
+    quantities: dict[int, int] = {}
+    for product_id, quantity in lines.values_list("product_id", "quantity"):
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+    if quantities:
+        Product.objects.filter(pk__in=quantities).update(
+            quantity_in_stock=F("quantity_in_stock")
+            + Case(
+                *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+                output_field=IntegerField(),
+            ),
+            updated_at=timezone.now(),
+        )
+        # update() does not send the signals purging the cached responses
+        purge_products(quantities)
+
+    order.delete()
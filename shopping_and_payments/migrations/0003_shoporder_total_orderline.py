@@ -0,0 +1,54 @@
+# Generated by Django 5.0.7 on 2026-10-17 20:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing_orders(apps, schema_editor):
+    """Create the order lines and the stored total of the existing orders"""
+    ShopOrder = apps.get_model('shopping_and_payments', 'ShopOrder')
+    CartItem = apps.get_model('shopping_and_payments', 'CartItem')
+    OrderLine = apps.get_model('shopping_and_payments', 'OrderLine')
+
+    for order in ShopOrder.objects.iterator():
+        lines = [
+            OrderLine(
+                order=order,
+                product_id=item.product_id,
+                product_name=item.product.name,
+                unit_price=item.product.price,
+                quantity=item.quantity,
+            )
+            for item in CartItem.objects.filter(cart_id=order.cart_id, product__isnull=False).select_related('product')
+        ]
+        OrderLine.objects.bulk_create(lines)
+        order.total = sum(line.unit_price * line.quantity for line in lines)
+        order.save(update_fields=['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('shopping_and_payments', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoporder',
+            name='total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.CreateModel(
+            name='OrderLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_name', models.CharField(max_length=50)),
+                ('unit_price', models.FloatField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='shopping_and_payments.shoporder')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='products.product')),
+            ],
+        ),
+        migrations.RunPython(snapshot_existing_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.7 on 2026-10-17 20:04
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicated_cart_items(apps, schema_editor):
+    """Merge the cart items repeated for the same cart and product"""
+    CartItem = apps.get_model('shopping_and_payments', 'CartItem')
+
+    duplicates = (
+        CartItem.objects.filter(product__isnull=False)
+        .values('cart_id', 'product_id')
+        .annotate(items=Count('id'), first_id=Min('id'), total=Sum('quantity'))
+        .filter(items__gt=1)
+    )
+    for duplicate in duplicates:
+        CartItem.objects.filter(pk=duplicate['first_id']).update(quantity=duplicate['total'])
+        CartItem.objects.filter(
+            cart_id=duplicate['cart_id'], product_id=duplicate['product_id']
+        ).exclude(pk=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('shopping_and_payments', '0003_shoporder_total_orderline'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='unique_cart_product'),
+        ),
+    ]
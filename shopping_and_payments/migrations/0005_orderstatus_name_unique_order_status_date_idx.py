@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-17 20:11
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicated_order_status(apps, schema_editor):
+    """Move the orders of the repeated order status to the first one"""
+    OrderStatus = apps.get_model('shopping_and_payments', 'OrderStatus')
+    ShopOrder = apps.get_model('shopping_and_payments', 'ShopOrder')
+
+    duplicates = (
+        OrderStatus.objects.values('name')
+        .annotate(statuses=Count('id'), first_id=Min('id'))
+        .filter(statuses__gt=1)
+    )
+    for duplicate in duplicates:
+        repeated = OrderStatus.objects.filter(name=duplicate['name']).exclude(pk=duplicate['first_id'])
+        ShopOrder.objects.filter(status__in=repeated).update(status_id=duplicate['first_id'])
+        repeated.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping_and_payments', '0004_cartitem_unique_cart_product'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicated_order_status, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderstatus',
+            name='name',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='shoporder',
+            index=models.Index(fields=['status', 'order_date'], name='order_status_date_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 """This module contains the models for the shopping_and_payments app"""
 
-from typing import override
+from typing import override, Any
 
+from django.db import IntegrityError, connections, router, transaction
 from django.db.models import (
     CharField,
     Model,
@@ -9,17 +10,26 @@ from django.db.models import (
     OneToOneField,
     ForeignKey,
     CASCADE,
+    SET_NULL,
     DateTimeField,
     ManyToManyField,
     PositiveIntegerField,
+    FloatField,
     Manager,
+    QuerySet,
+    F,
+    Sum,
+    Value,
+    UniqueConstraint,
+    Index,
 )
+from django.db.models.functions import Coalesce
 
 
 class OrderStatus(Model):
     """Order status model"""
 
-    name: CharField = CharField(max_length=50)
+    name: CharField = CharField(max_length=50, unique=True)
 
     objects = Manager()
 
@@ -44,6 +54,76 @@ class ShoppingCart(Model):
         return f"Cart #{self.pk} and belongs to {self.user}"
 
 
+class CartItemManager(Manager):
+    """Cart items manager"""
+
+    # Most rows sent in each INSERT, fewer where the database limits the
+    # parameters of a statement, like the 999 of SQLite
+    BATCH_SIZE: int = 500
+
+    def add(self, cart_id: int, product_id: int, quantity: int) -> None:
+        """Add a quantity of a product to a cart in a single statement"""
+        self.add_many(cart_id, {product_id: quantity})
+
+    def add_many(self, cart_id: int, quantities: dict[int, int]) -> None:
+        """Add quantities of many products to a cart
+
+        Uses INSERT ... ON CONFLICT DO UPDATE where the database supports it,
+        so concurrent adds of the same product never lose an increment or
+        create a duplicate row. Other databases fall back to an F() increment.
+        Big additions are split in batches, call it inside a transaction to
+        apply them all or nothing.
+        """
+        connection = connections[router.db_for_write(self.model)]
+
+        if connection.vendor not in ("sqlite", "postgresql"):
+            for product_id, quantity in quantities.items():
+                self._increment(connection.alias, cart_id, product_id, quantity)
+            return
+
+        opts = self.model._meta
+        table: str = connection.ops.quote_name(opts.db_table)
+        cart_column: str = connection.ops.quote_name(opts.get_field("cart").column)
+        product_column: str = connection.ops.quote_name(opts.get_field("product").column)
+        quantity_column: str = connection.ops.quote_name(
+            opts.get_field("quantity").column
+        )
+        items: list[tuple[int, int]] = list(quantities.items())
+        batch_size: int = min(
+            self.BATCH_SIZE,
+            connection.ops.bulk_batch_size(["cart", "product", "quantity"], items) or 1,
+        )
+
+        with connection.cursor() as cursor:
+            for start in range(0, len(items), batch_size):
+                batch: list[tuple[int, int]] = items[start : start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {table} ({cart_column}, {product_column}, {quantity_column}) "
+                    f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                    f"ON CONFLICT ({cart_column}, {product_column}) "
+                    f"DO UPDATE SET {quantity_column} = {table}.{quantity_column} + excluded.{quantity_column}",
+                    [
+                        value
+                        for product_id, quantity in batch
+                        for value in (cart_id, product_id, quantity)
+                    ],
+                )
+
+    def _increment(
+        self, using: str, cart_id: int, product_id: int, quantity: int
+    ) -> None:
+        """Add a quantity of a product to a cart with an F() increment"""
+        increment: dict[str, Any] = {"quantity": F("quantity") + quantity}
+        if self.filter(cart_id=cart_id, product_id=product_id).update(**increment):
+            return
+        try:
+            with transaction.atomic(using=using):
+                self.create(cart_id=cart_id, product_id=product_id, quantity=quantity)
+        except IntegrityError:
+            # Another request created the row in the meantime
+            self.filter(cart_id=cart_id, product_id=product_id).update(**increment)
+
+
 class CartItem(Model):
     """Cart items model"""
 
@@ -53,33 +133,97 @@ class CartItem(Model):
     )
     quantity: IntegerField = PositiveIntegerField(default=1)
 
-    objects = Manager()
+    objects = CartItemManager()
+
+    class Meta:
+        """A product can only be once in each cart"""
+
+        constraints = [
+            UniqueConstraint(fields=["cart", "product"], name="unique_cart_product")
+        ]
 
     @override
     def __str__(self) -> str:
         return f"CartItem #{self.pk} in {self.cart}"
 
 
-class ShopOrder(Model):
-    """Shop order model"""
+class ShopOrderQuerySet(QuerySet):
+    """Shop order queryset"""
 
-    def total_price(self) -> int:
-        """Return the total price of the order"""
-        result:int|float = 0
+    def with_total_price(self) -> "ShopOrderQuerySet":
+        """Annotate each order with the total price of its cart items
 
-        for product in self.cart.products.all():
-            result += product.price
-        
-        return result
+        The total is computed by the database as the sum of
+        price * quantity over the cart items, so it costs no extra queries.
+        """
+        return self.annotate(
+            cart_total=Coalesce(
+                Sum(
+                    F("cart__cartitem__product__price")
+                    * F("cart__cartitem__quantity"),
+                    output_field=FloatField(),
+                ),
+                Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+
+class ShopOrder(Model):
+    """Shop order model"""
 
     cart: OneToOneField = OneToOneField(ShoppingCart, on_delete=CASCADE)
-    status: ForeignKey = ForeignKey(OrderStatus, on_delete=CASCADE,default=1)
-    total_price: int = total_price
+    status: ForeignKey = ForeignKey(OrderStatus, on_delete=CASCADE, default=1)
     order_date: DateTimeField = DateTimeField(auto_now_add=True)
+    total: FloatField = FloatField(default=0)
 
-    objects = Manager()
+    objects = ShopOrderQuerySet.as_manager()
+
+    class Meta:
+        """Index to list the orders by status and date"""
+
+        indexes = [
+            Index(fields=["status", "order_date"], name="order_status_date_idx"),
+        ]
 
+    def total_price(self) -> float:
+        """Return the current total price of the order's cart
 
+        Uses the `cart_total` annotation when the order was loaded through
+        `ShopOrder.objects.with_total_price()`, otherwise aggregates it.
+        """
+        if hasattr(self, "cart_total"):
+            return self.cart_total
 
+        return (
+            ShopOrder.objects.filter(pk=self.pk)
+            .with_total_price()
+            .values_list("cart_total", flat=True)
+            .get()
+        )
+
+    @override
     def __str__(self) -> str:
         return f"shop order # {self.pk}"
+
+
+class OrderLine(Model):
+    """Order line model
+
+    Immutable snapshot of a cart item taken at checkout, so reading an order
+    never needs to join the live cart and product tables.
+    """
+
+    order: ForeignKey = ForeignKey(ShopOrder, on_delete=CASCADE, related_name="lines")
+    product: ForeignKey = ForeignKey(
+        "products.Product", on_delete=SET_NULL, null=True, blank=True
+    )
+    product_name: CharField = CharField(max_length=50)
+    unit_price: FloatField = FloatField()
+    quantity: IntegerField = PositiveIntegerField()
+
+    objects = Manager()
+
+    @override
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_name} in {self.order}"
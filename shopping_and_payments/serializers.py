@@ -6,11 +6,16 @@ from rest_framework.serializers import (
     SerializerMethodField,
     Serializer,
     IntegerField,
-    StringRelatedField
+    FloatField,
+    Field,
 )
 
+from ecomerce_project.fieldsets import DynamicFieldsMixin
+from ecomerce_project.reference_cache import order_status_cache
+
 from shopping_and_payments.models import (
     CartItem,
+    OrderLine,
     OrderStatus,
     ShoppingCart,
     ShopOrder,
@@ -50,15 +55,47 @@ class ShoppingCartSerializer(ModelSerializer):
         fields = "__all__"
 
 
-class ShopOrderSerializer(ModelSerializer):
-    """Shop order serializer"""
-    status:StringRelatedField = StringRelatedField()
+class OrderLineSerializer(ModelSerializer):
+    """Order line serializer"""
+
+    class Meta:
+        """This class is used to define the fields that will be serialized"""
+
+        model = OrderLine
+        fields = ("product", "product_name", "unit_price", "quantity")
+        read_only_fields = fields
+
+
+class OrderStatusNameField(Field):
+    """Read only name of the order status, taken from the reference cache"""
+
+    def __init__(self, **kwargs) -> None:
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance: ShopOrder) -> int:
+        return instance.status_id
+
+    def to_representation(self, value: int) -> str | None:
+        order_status: OrderStatus | None = order_status_cache.get(value)
+        return str(order_status) if order_status is not None else None
+
+
+class ShopOrderSerializer(DynamicFieldsMixin, ModelSerializer):
+    """Shop order serializer
+
+    total_price is the total stored at checkout, the same amount
+    ShopOrder.total_price() computed from the cart at that moment.
+    """
+    status: OrderStatusNameField = OrderStatusNameField()
+    total_price: FloatField = FloatField(source="total", read_only=True)
+    lines: OrderLineSerializer = OrderLineSerializer(many=True, read_only=True)
 
     class Meta:
         """This class is used to define the fields that will be serialized"""
 
         model = ShopOrder
-        fields = "__all__"
+        exclude = ("total",)
 
 class AddToCartSerializer(Serializer):
 
@@ -66,6 +103,16 @@ class AddToCartSerializer(Serializer):
     quantity: int = IntegerField(min_value=1)
 
 
+class BulkAddToCartSerializer(Serializer):
+    """Serializer to add many products to a cart at once"""
+
+    MAX_ITEMS: int = 1000
+
+    items: AddToCartSerializer = AddToCartSerializer(
+        many=True, allow_empty=False, max_length=MAX_ITEMS
+    )
+
+
 class CartItemSerializer(ModelSerializer):
     """Cart items serializer"""
 
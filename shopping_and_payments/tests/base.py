@@ -2,6 +2,7 @@
 
 from typing import override
 
+from django.core.cache import cache
 from django.urls import reverse
 
 from rest_framework.test import APITestCase
@@ -31,6 +32,7 @@ class BaseTestCase(APITestCase):
         """Tear down the test case"""
         self.client.logout()
         self.client.credentials()
+        cache.clear()
         super().tearDown()
 
     def update_products_in_cart_url(self, cart_id: int, item_id: int) -> str:
@@ -49,23 +51,25 @@ class BaseTestCase(APITestCase):
         """Return the cart items URL"""
         return reverse("add_products_to_cart", args=[pk])
 
+    def bulk_cart_items_url(self, pk: int) -> str:
+        """Return the bulk add products to cart URL"""
+        return reverse("bulk_add_products_to_cart", args=[pk])
+
     def shopping_cart_url_detail(self, pk: int) -> str:
         """Return the shopping cart URL"""
         return reverse("shopping_cart_detail", args=[pk])
 
     def create_products(self, number_of_products: int) -> list[Product]:
         """Create products"""
-        products: list[Product] = []
-        for i in range(1, number_of_products + 1):
-            products.append(
-                Product.objects.create(
-                    name=f"Product {i}",
-                    description=f"Description {i}",
-                    price=i * 10,
-                    quantity_in_stock=i * 10,
-                )
+        return Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                description=f"Description {i}",
+                price=i * 10,
+                quantity_in_stock=i * 10,
             )
-        return products
+            for i in range(1, number_of_products + 1)
+        )
 
     def create_superuser(self) -> User:
         """Create a superuser and return the token"""
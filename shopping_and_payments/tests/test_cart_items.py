@@ -2,12 +2,16 @@
 
 from random import randint
 from typing import Any
+from unittest.mock import patch
+
+from django.db import IntegrityError, connections, transaction
 
 from rest_framework.response import Response
 from rest_framework import status
 
 from shopping_and_payments.tests.base import BaseTestCase
 from shopping_and_payments.models import ShoppingCart, CartItem
+from shopping_and_payments.serializers import BulkAddToCartSerializer
 
 from users.models import User
 
@@ -140,6 +144,153 @@ class AddCartItemsTest(BaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual( response.data.get("error"), "Product with id 1 does not exist.")
 
+    def test_add_the_same_product_twice(self) -> None:
+        """Test that adding a product already in the cart increments its quantity"""
+        user: User = self.create_users(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+        cart: ShoppingCart = ShoppingCart.objects.create(user=user)
+        product: Product = self.create_products(1)[0]
+
+        for quantity in (2, 3):
+            response: Response = self.client.post(self.cart_items_url(cart.pk), {"product_id": product.pk, "quantity": quantity})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(list(CartItem.objects.filter(cart=cart).values_list("product_id", "quantity")), [(product.pk, 5)])
+
+
+class BulkAddCartItemsTest(BaseTestCase):
+    """Test that a user can add many cart items at once"""
+
+    def test_bulk_add_cart_items(self) -> None:
+        """Test that all the items are added with per line results"""
+        user: User = self.create_users(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+        cart: ShoppingCart = ShoppingCart.objects.create(user=user)
+        products: list[Product] = self.create_products(3)
+        CartItem.objects.create(cart=cart, product=products[0], quantity=1)
+
+        items: list[dict[str, int]] = [
+            {"product_id": products[0].pk, "quantity": 2},
+            {"product_id": products[1].pk, "quantity": 3},
+            {"product_id": products[1].pk, "quantity": 4},
+            {"product_id": 800, "quantity": 1},
+        ]
+        response: Response = self.client.post(self.bulk_cart_items_url(cart.pk), {"items": items}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result["added"] for result in response.data.get("results")], [True, True, True, False])
+        self.assertEqual(response.data.get("results")[3].get("error"), "Product with id 800 does not exist.")
+        self.assertEqual(
+            list(CartItem.objects.filter(cart=cart).order_by("product_id").values_list("product_id", "quantity")),
+            [(products[0].pk, 3), (products[1].pk, 7)],
+        )
+
+    def test_bulk_add_cart_items_with_no_valid_products(self) -> None:
+        """Test that the api returns a 404 error if no product exists"""
+        user: User = self.create_users(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+        cart: ShoppingCart = ShoppingCart.objects.create(user=user)
+
+        response: Response = self.client.post(
+            self.bulk_cart_items_url(cart.pk), {"items": [{"product_id": 1, "quantity": 1}]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(CartItem.objects.count(), 0)
+
+    def test_bulk_add_cart_items_with_invalid_data(self) -> None:
+        """Test that the api validates every line"""
+        user: User = self.create_users(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+        cart: ShoppingCart = ShoppingCart.objects.create(user=user)
+        product: Product = self.create_products(1)[0]
+
+        response: Response = self.client.post(
+            self.bulk_cart_items_url(cart.pk), {"items": [{"product_id": product.pk, "quantity": 0}]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(CartItem.objects.count(), 0)
+
+        response = self.client.post(self.bulk_cart_items_url(cart.pk), {"items": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        too_many: list[dict[str, int]] = [
+            {"product_id": product.pk, "quantity": 1}
+        ] * (BulkAddToCartSerializer.MAX_ITEMS + 1)
+        response = self.client.post(self.bulk_cart_items_url(cart.pk), {"items": too_many}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_add_cart_items_as_no_owner(self) -> None:
+        """Test that a user cannot add items to the cart of another user"""
+        users: list[User] = self.create_users(2)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {users[0].auth_token}")
+        cart: ShoppingCart = ShoppingCart.objects.create(user=users[1])
+        product: Product = self.create_products(1)[0]
+
+        response: Response = self.client.post(
+            self.bulk_cart_items_url(cart.pk), {"items": [{"product_id": product.pk, "quantity": 1}]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(CartItem.objects.count(), 0)
+
+
+class CartItemManagerTest(BaseTestCase):
+    """Test the single statement add to cart"""
+
+    def test_add_creates_and_increments_the_item(self) -> None:
+        """Test that the upsert creates the item and then increments it"""
+        cart: ShoppingCart = ShoppingCart.objects.create(user=self.create_users(1)[0])
+        product: Product = self.create_products(1)[0]
+
+        with self.assertNumQueries(1):
+            CartItem.objects.add(cart.pk, product.pk, 4)
+        CartItem.objects.add(cart.pk, product.pk, 6)
+
+        self.assertEqual(CartItem.objects.get(cart=cart, product=product).quantity, 10)
+
+    def test_add_fallback_without_upsert_support(self) -> None:
+        """Test the F() increment used by the databases without ON CONFLICT"""
+        cart: ShoppingCart = ShoppingCart.objects.create(user=self.create_users(1)[0])
+        product: Product = self.create_products(1)[0]
+
+        with patch.object(connections["default"], "vendor", "mysql"):
+            CartItem.objects.add(cart.pk, product.pk, 4)
+            CartItem.objects.add(cart.pk, product.pk, 6)
+
+        self.assertEqual(CartItem.objects.get(cart=cart, product=product).quantity, 10)
+
+    def test_add_many_in_batches(self) -> None:
+        """Test that the additions bigger than a batch are all applied"""
+        cart: ShoppingCart = ShoppingCart.objects.create(user=self.create_users(1)[0])
+        products: list[Product] = self.create_products(5)
+
+        with patch.object(CartItem.objects, "BATCH_SIZE", 2), self.assertNumQueries(3):
+            CartItem.objects.add_many(cart.pk, {product.pk: 1 for product in products})
+
+        self.assertEqual(CartItem.objects.filter(cart=cart).count(), 5)
+
+    def test_add_many_under_the_parameters_limit(self) -> None:
+        """Test that a batch never sends more parameters than SQLite allows"""
+        cart: ShoppingCart = ShoppingCart.objects.create(user=self.create_users(1)[0])
+        products: list[Product] = self.create_products(400)
+
+        # 3 parameters per row, 333 rows fit in the 999 of SQLite
+        with self.assertNumQueries(2 if connections["default"].vendor == "sqlite" else 1):
+            CartItem.objects.add_many(cart.pk, {product.pk: 1 for product in products})
+
+        self.assertEqual(CartItem.objects.filter(cart=cart).count(), 400)
+
+    def test_cart_and_product_are_unique(self) -> None:
+        """Test that the database rejects a repeated product in a cart"""
+        cart: ShoppingCart = ShoppingCart.objects.create(user=self.create_users(1)[0])
+        product: Product = self.create_products(1)[0]
+        CartItem.objects.create(cart=cart, product=product)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CartItem.objects.create(cart=cart, product=product)
+
 
 class UpdateProductsInCart(BaseTestCase):
     def test_update_products_in_cart(self) -> None:
@@ -171,3 +322,21 @@ class UpdateProductsInCart(BaseTestCase):
         self.assertEqual(
             response.data.get("message"), "Products updated in the cart successfully."
         )
+
+    def test_update_to_a_product_already_in_the_cart(self) -> None:
+        """Test that the updated item is merged with the one with the same product"""
+        user: User = self.create_users(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+
+        products: list[Product] = self.create_products(2)
+        cart: ShoppingCart = ShoppingCart.objects.create(user=user)
+        cart.products.set(products, through_defaults={"quantity": 1})
+        item: CartItem = CartItem.objects.get(cart=cart, product=products[0])
+
+        response: Response = self.client.put(
+            self.update_products_in_cart_url(cart.pk, item.pk), {"new_product_id": products[1].pk, "quantity": 7}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(CartItem.objects.filter(cart=cart).values_list("pk", "product_id", "quantity")), [(item.pk, products[1].pk, 8)])
+        self.assertEqual(response.data.get("item").get("quantity"), 8)
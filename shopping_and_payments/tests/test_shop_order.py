@@ -1,12 +1,18 @@
 
 from typing import override
+from unittest import mock
+
+from django.db import OperationalError
 
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from shopping_and_payments.tests.base import BaseTestCase
-from shopping_and_payments.models import ShopOrder,ShoppingCart,OrderStatus
+from shopping_and_payments.checkout import checkout, LOCK_MODES, OutOfStockError, StockLockedError
+from shopping_and_payments.models import ShopOrder,ShoppingCart,OrderStatus,OrderLine
+
+from products.models import Product
 
 from users.models import User
 
@@ -104,6 +110,20 @@ class OrderGetTest(BaseTestCase):
 
         self.assertEqual(response.data.get('status'), 'Completed')
 
+    def test_get_order_with_fields(self)->None:
+        user:User = self.create_users(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {user.auth_token}')
+        cart:ShoppingCart = ShoppingCart.objects.create(user=user)
+        order:ShopOrder = ShopOrder.objects.create(cart=cart, status=OrderStatus.objects.get(name='Processing'))
+
+        response:Response = self.client.get(self.order_detail_url(order.pk), {'fields': 'id,status'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'id': order.pk, 'status': 'Processing'})
+
+        response = self.client.get(self.order_detail_url(order.pk), {'fields': 'total_price'})
+        self.assertEqual(response.data, {'total_price': 0})
+
     def test_get_order_as_no_owner(self)->None:
         users:list[User] = self.create_users(2)
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {users[0].auth_token}')
@@ -282,3 +302,174 @@ class CancelOrderTest(BaseTestCase):
         self.assertEqual(response.data.get('detail'), 'No ShopOrder matches the given query.')
 
 
+
+class OrderTotalPriceTest(BaseTestCase):
+    """Test that the order total is computed by the database"""
+
+    def test_total_price_uses_the_cart_items_quantity(self) -> None:
+        carts: list[ShoppingCart] = self.create_shopping_carts(3)
+        order: ShopOrder = ShopOrder.objects.create(cart=carts[2], status=OrderStatus.objects.create(name='Pending'))
+
+        # Cart 3 has products 1, 2 and 3 (prices 10, 20, 30) three times each
+        self.assertEqual(order.total_price(), 180)
+
+    def test_total_price_of_an_empty_cart(self) -> None:
+        user: User = self.create_users(1)[0]
+        cart: ShoppingCart = ShoppingCart.objects.create(user=user)
+        order: ShopOrder = ShopOrder.objects.create(cart=cart, status=OrderStatus.objects.create(name='Pending'))
+
+        self.assertEqual(order.total_price(), 0)
+
+    def test_total_price_annotation_in_a_single_query(self) -> None:
+        order_status: OrderStatus = OrderStatus.objects.create(name='Pending')
+        for cart in self.create_shopping_carts(4):
+            ShopOrder.objects.create(cart=cart, status=order_status)
+
+        with self.assertNumQueries(1):
+            totals: list[float] = [order.total_price() for order in ShopOrder.objects.with_total_price().order_by('pk')]
+
+        self.assertEqual(totals, [10, 60, 180, 400])
+
+
+    def test_get_order_returns_the_total_price(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        OrderStatus.objects.get_or_create(name='Pending')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {cart.user.auth_token}')
+        order_id: int = self.client.post(self.create_order_url, data={'cart': cart.pk}).data.get('id')
+
+        response: Response = self.client.get(self.order_detail_url(order_id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('total_price'), 60)
+        self.assertEqual(response.data.get('total_price'), ShopOrder.objects.get(pk=order_id).total_price())
+        self.assertNotIn('total', response.data)
+
+
+class OrderSnapshotTest(BaseTestCase):
+    """Test that the orders keep a snapshot of the cart at checkout"""
+
+    @override
+    def setUp(self)->None:
+        OrderStatus.objects.get_or_create(name='Pending')
+        return super().setUp()
+
+    def test_order_creation_stores_lines_and_total(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {cart.user.auth_token}')
+
+        response: Response = self.client.post(self.create_order_url, data={'cart': cart.pk})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data.get('total_price'), 60)
+        self.assertEqual(
+            [(line['product'], line['unit_price'], line['quantity']) for line in response.data.get('lines')],
+            [(1, 10, 2), (2, 20, 2)],
+        )
+        self.assertEqual(OrderLine.objects.filter(order_id=response.data.get('id')).count(), 2)
+
+    def test_get_order_does_not_change_with_the_catalog(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {cart.user.auth_token}')
+        order_id: int = self.client.post(self.create_order_url, data={'cart': cart.pk}).data.get('id')
+
+        Product.objects.update(price=1000, name='Renamed')
+
+        response: Response = self.client.get(self.order_detail_url(order_id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('total_price'), 60)
+        self.assertEqual([line['product_name'] for line in response.data.get('lines')], ['Product 1', 'Product 2'])
+        self.assertEqual([line['unit_price'] for line in response.data.get('lines')], [10, 20])
+
+
+class OrderStockTest(BaseTestCase):
+    """Test that placing an order takes the products out of stock"""
+
+    @override
+    def setUp(self)->None:
+        OrderStatus.objects.get_or_create(name='Pending')
+        return super().setUp()
+
+    def test_order_creation_decrements_the_stock(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {cart.user.auth_token}')
+
+        response: Response = self.client.post(self.create_order_url, data={'cart': cart.pk})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [8, 18])
+
+    def test_order_creation_with_not_enough_stock(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        Product.objects.filter(pk=2).update(quantity_in_stock=1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {cart.user.auth_token}')
+
+        response: Response = self.client.post(self.create_order_url, data={'cart': cart.pk})
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data.get('products'), [2])
+        self.assertEqual(ShopOrder.objects.count(), 0)
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [10, 1])
+
+    def test_cancelled_order_gives_the_stock_back(self) -> None:
+        carts: list[ShoppingCart] = self.create_shopping_carts(2)
+        OrderStatus.objects.get_or_create(name='Cancelled')
+        first: ShopOrder = checkout(carts[0])
+        second: ShopOrder = checkout(carts[1])
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [7, 18])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {carts[0].user.auth_token}')
+        response: Response = self.client.put(self.order_detail_url(first.pk), data={'status': 'Cancelled'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [8, 18])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {carts[1].user.auth_token}')
+        response = self.client.delete(self.order_detail_url(second.pk))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [10, 20])
+        self.assertEqual(ShopOrder.objects.count(), 0)
+
+    def test_checkout_in_every_lock_mode(self) -> None:
+        carts: list[ShoppingCart] = self.create_shopping_carts(3)
+
+        for cart, lock_mode in zip(carts, LOCK_MODES):
+            checkout(cart, lock_mode=lock_mode)
+
+        self.assertEqual(ShopOrder.objects.count(), 3)
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [4, 15, 27])
+
+    def test_checkout_fails_when_the_stock_is_sold_out(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(1)[0]
+        Product.objects.update(quantity_in_stock=0)
+
+        with self.assertRaises(OutOfStockError):
+            checkout(cart)
+
+        self.assertEqual(ShopOrder.objects.count(), 0)
+
+    def test_checkout_fails_only_for_the_products_short_of_stock(self) -> None:
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        Product.objects.filter(pk=1).update(quantity_in_stock=0)
+
+        with self.assertRaises(OutOfStockError) as error:
+            checkout(cart)
+
+        self.assertEqual(error.exception.product_ids, [1])
+        # The products with enough stock are not decremented either
+        self.assertEqual(list(Product.objects.order_by('pk').values_list('quantity_in_stock', flat=True)), [0, 20])
+
+    def test_database_locked_is_a_conflict(self) -> None:
+        carts: list[ShoppingCart] = self.create_shopping_carts(2)
+        OrderStatus.objects.get_or_create(name='Cancelled')
+        order: ShopOrder = checkout(carts[0])
+        locked: OperationalError = OperationalError('database is locked')
+
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=locked):
+            with self.assertRaises(StockLockedError):
+                checkout(carts[1])
+
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {carts[0].user.auth_token}')
+            response: Response = self.client.delete(self.order_detail_url(order.pk))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(ShopOrder.objects.filter(pk=order.pk).exists())
@@ -4,10 +4,16 @@ from typing import Any
 
 from random import randint
 
+from django.test import override_settings
+from django.urls import reverse
+
 from rest_framework import status
 from rest_framework.response import Response
 
 from shopping_and_payments.tests.base import BaseTestCase
+from shopping_and_payments.models import ShoppingCart, CartItem
+from products.bulk import bulk_delete_products
+from products.models import Product
 
 from users.models import User
 
@@ -144,6 +150,123 @@ class ShoppingCartGetTest(BaseTestCase):
         print(response.data)
 
 
+class ShoppingCartReadModelTest(BaseTestCase):
+    """Test the cached read model served by the shopping cart detail"""
+
+    def test_get_cart_lines_and_totals(self) -> None:
+        """Test that the cart comes with its lines, counts and totals"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+
+        response: Response = self.client.get(self.shopping_cart_url(cart.pk))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get("products"), [1, 2])
+        self.assertEqual(
+            [(line["product"], line["quantity"], line["line_total"]) for line in response.data.get("lines")],
+            [(1, 2, 20), (2, 2, 40)],
+        )
+        self.assertEqual(response.data.get("item_count"), 2)
+        self.assertEqual(response.data.get("total_quantity"), 4)
+        self.assertEqual(response.data.get("total_price"), 60)
+
+    def test_get_cart_is_served_from_the_cache(self) -> None:
+        """Test that a second read of the cart does not query the cart tables"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        self.client.get(self.shopping_cart_url(cart.pk))
+
+        # Only the token authentication query is left
+        with self.assertNumQueries(1):
+            response: Response = self.client.get(self.shopping_cart_url(cart.pk))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get("total_price"), 60)
+
+    def test_get_cart_after_adding_products(self) -> None:
+        """Test that adding products to the cart invalidates the cached cart"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        version: int = self.client.get(self.shopping_cart_url(cart.pk)).data.get("version")
+
+        self.client.post(self.cart_items_url(cart.pk), {"product_id": 1, "quantity": 3})
+        response: Response = self.client.get(self.shopping_cart_url(cart.pk))
+
+        self.assertGreater(response.data.get("version"), version)
+        self.assertEqual(response.data.get("total_quantity"), 7)
+        self.assertEqual(response.data.get("total_price"), 90)
+
+    def test_get_cart_after_updating_products(self) -> None:
+        """Test that updating the cart items invalidates the cached cart"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        self.client.get(self.shopping_cart_url(cart.pk))
+        item: CartItem = CartItem.objects.get(cart=cart, product_id=2)
+
+        self.client.put(self.update_products_in_cart_url(cart.pk, item.pk), {"new_product_id": 2, "quantity": 1})
+        response: Response = self.client.get(self.shopping_cart_url(cart.pk))
+
+        self.assertEqual(response.data.get("total_price"), 40)
+
+    def test_get_cart_not_modified(self) -> None:
+        """Test that the cart version is its ETag and is revalidated with a 304"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        etag: str = self.client.get(self.shopping_cart_url(cart.pk))["ETag"]
+
+        response: Response = self.client.get(self.shopping_cart_url(cart.pk), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+        self.client.post(self.cart_items_url(cart.pk), {"product_id": 1, "quantity": 3})
+        response = self.client.get(self.shopping_cart_url(cart.pk), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_get_cart_after_deleting_products(self) -> None:
+        """Test that deleting products in the cart invalidates the cached cart"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        self.client.get(self.shopping_cart_url(cart.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response: Response = self.client.delete(reverse("product-detail", args=[2]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(self.shopping_cart_url(cart.pk)).data.get("products"), [1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_delete_products([1])
+        self.assertEqual(self.client.get(self.shopping_cart_url(cart.pk)).data.get("products"), [])
+
+    @override_settings(CART_CACHE_TIMEOUT=0)
+    def test_get_cart_etag_follows_the_prices(self) -> None:
+        """Test that a rebuilt cart with new prices is not revalidated with a 304"""
+        cart: ShoppingCart = self.create_shopping_carts(2)[1]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        etag: str = self.client.get(self.shopping_cart_url(cart.pk))["ETag"]
+
+        # Without a write to the cart, so its version stays the same
+        Product.objects.filter(pk=1).update(price=99)
+        response: Response = self.client.get(self.shopping_cart_url(cart.pk), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_get_cart_after_deleting_it(self) -> None:
+        """Test that a deleted cart is not served from the cache"""
+        cart: ShoppingCart = self.create_shopping_carts(1)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {cart.user.auth_token}")
+        self.client.get(self.shopping_cart_url(cart.pk))
+
+        self.client.delete(self.shopping_cart_url(cart.pk))
+        response: Response = self.client.get(self.shopping_cart_url(cart.pk))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class ShoppingCartDeleteTest(BaseTestCase):
     """Test that a user can delete a shopping cart"""
 
@@ -7,6 +7,7 @@ from shopping_and_payments.views import (
     ShoppingCartCreationView,
     ShoppingCartDetailView,
     AddProductsToCartView,
+    BulkAddProductsToCartView,
     UpdateProductsInCartView,
     CreateOrderView,
     OrderDetailView
@@ -33,6 +34,11 @@ urlpatterns = [
         AddProductsToCartView.as_view(),
         name="add_products_to_cart",
     ),
+    path(
+        "add-products-to-cart/<int:pk>/bulk/",
+        BulkAddProductsToCartView.as_view(),
+        name="bulk_add_products_to_cart",
+    ),
     path(
         "update-products-in-cart/<int:cart_id>/<int:item_id>/",
         UpdateProductsInCartView.as_view(),
@@ -41,3 +47,17 @@ urlpatterns = [
     path('create-order', CreateOrderView.as_view(),name='create_order'),
     path('order/<int:pk>/', OrderDetailView.as_view(), name='order_detail')
 ]
+
+# Maximum number of queries of a request to each url, authentication included
+query_budgets: dict[str, int] = {
+    "order_status_create": 3,
+    "create_shopping_cart": 5,
+    "shopping_cart": 6,
+    "add_products_to_cart": 4,
+    "bulk_add_products_to_cart": 6,
+    # Moving an item to a product already in the cart merges both lines
+    "update_products_in_cart": 9,
+    "create_order": 12,
+    # Cancelling locks and reads the order lines and puts their stock back
+    "order_detail": 12,
+}
@@ -1,8 +1,9 @@
 """ This file contains the views for the shopping_and_payments app. """
 
 from typing import Any
-from django.http import Http404
+from django.http import Http404, HttpResponseBase
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Model
 
 from rest_framework.views import APIView
@@ -12,8 +13,13 @@ from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework import status
 
 
+from ecomerce_project.conditional import make_etag, not_modified, set_validators
+from ecomerce_project.fieldsets import project, requested_fields
+from ecomerce_project.reference_cache import order_status_cache
+from shopping_and_payments.cart_cache import bump_cart_version, get_cart_read_model
+from shopping_and_payments.checkout import cancel_order, checkout, OutOfStockError, StockLockedError
 from shopping_and_payments.models import CartItem, ShoppingCart,ShopOrder,OrderStatus
-from shopping_and_payments.serializers import  OrderStatusSerializer, ShoppingCartSerializer, CartItemSerializer,AddToCartSerializer, ShopOrderSerializer
+from shopping_and_payments.serializers import  OrderStatusSerializer, ShoppingCartSerializer, CartItemSerializer,AddToCartSerializer, BulkAddToCartSerializer, ShopOrderSerializer
 
 from products.models import Product
 from users.models import User
@@ -55,7 +61,7 @@ class AddProductsToCartView(APIView):
         except ShoppingCart.DoesNotExist:
             return Response( {"error": "Shopping cart does not exist."}, status=status.HTTP_404_NOT_FOUND,)
 
-        if ( isinstance(request.user, User) and cart.user != request.user and not request.user.is_staff):
+        if ( isinstance(request.user, User) and cart.user_id != request.user.pk and not request.user.is_staff):
             return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN,)
 
         serializer:AddToCartSerializer = AddToCartSerializer(data=request.data)
@@ -64,23 +70,64 @@ class AddProductsToCartView(APIView):
             product_id:int = serializer.validated_data.get("product_id")
             quantity:int = serializer.validated_data.get("quantity")
 
-            try:
-                product: Product = Product.objects.get(pk=product_id)
-            except Product.DoesNotExist:
+            if not Product.objects.filter(pk=product_id).exists():
                 return Response( {"error": f"Product with id {product_id} does not exist."}, status=status.HTTP_404_NOT_FOUND,)
 
-            cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-
-            if not created:
-                cart_item.quantity += quantity
-                cart_item.save()
-            else:
-                cart_item.quantity = quantity
-                cart_item.save()
+            CartItem.objects.add(cart.pk, product_id, quantity)
+            bump_cart_version(cart.pk)
             return Response( {"message": "Products added to the cart successfully."}, status=status.HTTP_201_CREATED,)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST,)
 
 
+class BulkAddProductsToCartView(APIView):
+    """Add many products to a shopping cart at once"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Request, pk: int) -> Response:
+        """Add many products to a shopping cart
+
+        All the product ids are checked with a single query and all the cart
+        items are added in one transaction. The response has a result for
+        each line of the request.
+        """
+        cart: ShoppingCart = get_object_or_404(ShoppingCart, pk=pk)
+
+        if ( isinstance(request.user, User) and cart.user_id != request.user.pk and not request.user.is_staff):
+            return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN,)
+
+        serializer: BulkAddToCartSerializer = BulkAddToCartSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items: list[dict[str, int]] = serializer.validated_data.get("items")
+        existing: set[int] = set(
+            Product.objects.filter(pk__in={item["product_id"] for item in items}).values_list("pk", flat=True)
+        )
+
+        quantities: dict[int, int] = {}
+        results: list[dict[str, Any]] = []
+        for item in items:
+            result: dict[str, Any] = {"product_id": item["product_id"], "quantity": item["quantity"]}
+            if item["product_id"] in existing:
+                quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+                result["added"] = True
+            else:
+                result["added"] = False
+                result["error"] = f"Product with id {item['product_id']} does not exist."
+            results.append(result)
+
+        if not quantities:
+            return Response({"results": results}, status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            CartItem.objects.add_many(cart.pk, quantities)
+        bump_cart_version(cart.pk)
+
+        return Response({"results": results}, status=status.HTTP_201_CREATED)
+
+
 class UpdateProductsInCartView(APIView):
     """Update products in a shopping cart"""
 
@@ -90,10 +137,10 @@ class UpdateProductsInCartView(APIView):
         """Update products in a shopping cart"""
 
         cart: ShoppingCart = get_object_or_404(ShoppingCart, pk=cart_id)
-        cart_item: CartItem = get_object_or_404(CartItem, pk=item_id)
+        cart_item: CartItem = get_object_or_404(CartItem, pk=item_id, cart=cart)
 
         # Validate if the user has permission to update the cart
-        if (isinstance(request.user, User) and cart.user != request.user and not request.user.is_staff):
+        if (isinstance(request.user, User) and cart.user_id != request.user.pk and not request.user.is_staff):
             return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN,)
 
         # Validate if the request has data
@@ -114,8 +161,16 @@ class UpdateProductsInCartView(APIView):
         serializer: CartItemSerializer = CartItemSerializer(instance=cart_item, data={"product": new_product_id, "quantity": quantity},)
 
         if serializer.is_valid():
-            serializer.save()
-            return Response( {"message": "Products updated in the cart successfully."}, status=status.HTTP_200_OK)
+            with transaction.atomic():
+                # The item is merged with the one that already had the new product
+                other: CartItem | None = CartItem.objects.select_for_update().filter(cart=cart, product_id=new_product_id).exclude(pk=cart_item.pk).first()
+                if other is not None:
+                    other.delete()
+                    serializer.save(quantity=quantity + other.quantity)
+                else:
+                    serializer.save()
+            bump_cart_version(cart.pk)
+            return Response( {"message": "Products updated in the cart successfully.", "item": serializer.data}, status=status.HTTP_200_OK)
 
         return Response( serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -146,19 +201,43 @@ class ShoppingCartDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request: Request, pk: int) -> Response:
-        """Get all shopping carts"""
-        cart: ShoppingCart = get_object_or_404(ShoppingCart, pk=pk)
+        """Get a shopping cart with its lines, counts and totals
+
+        Served from the cached read model, which is invalidated by every
+        write to the cart items. The ETag hashes its lines, which change
+        with the product prices and names when the read model is rebuilt.
+        """
+        cart: dict[str, Any] | None = get_cart_read_model(pk)
+        if cart is None:
+            raise Http404("No ShoppingCart matches the given query.")
         if (
             isinstance(request.user, User)
-            and cart.user != request.user
+            and cart["user"] != request.user.pk
             and not request.user.is_staff
         ):
             return Response(
                 {"error": "You are not allowed to access this cart."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        serializer = ShoppingCartSerializer(instance=cart)
-        return Response(serializer.data)
+
+        etag: str = make_etag(
+            "cart",
+            cart["id"],
+            *[
+                (
+                    line["id"],
+                    line["product"],
+                    line["product_name"],
+                    line["unit_price"],
+                    line["quantity"],
+                )
+                for line in cart["lines"]
+            ],
+        )
+        cached: HttpResponseBase | None = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        return set_validators(Response(cart), etag)
 
     def delete(self, request: Request, pk: int) -> Response:
         """Delete a shopping cart"""
@@ -174,6 +253,7 @@ class ShoppingCartDetailView(APIView):
             )
 
         cart.delete()
+        bump_cart_version(pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class CreateOrderView(APIView):
@@ -188,13 +268,19 @@ class CreateOrderView(APIView):
 
         if serializer.is_valid():
             print('Serializer was Valid')
-            cart:ShoppingCart = ShoppingCart.objects.get(pk=serializer.validated_data.get('cart').pk)
+            cart:ShoppingCart = serializer.validated_data.get('cart')
 
-            if cart.user != request.user:
+            if cart.user_id != request.user.pk:
                 return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN)
-            
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+            try:
+                order:ShopOrder = checkout(cart)
+            except OutOfStockError as error:
+                return Response( {"error": str(error), "products": error.product_ids}, status=status.HTTP_409_CONFLICT)
+            except StockLockedError as error:
+                return Response( {"error": str(error)}, status=status.HTTP_409_CONFLICT)
+
+            return Response(ShopOrderSerializer(instance=order).data, status=status.HTTP_201_CREATED)
 
         print('Serializer was not Valid')
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -204,25 +290,34 @@ class OrderDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request: Request, pk: int) -> Response:
-        """Get an order"""
-
-        order:ShopOrder = get_object_or_404(ShopOrder, pk=pk)
+        """Get an order, only its fields=... if given"""
+        try:
+            fields: list[str] | None = requested_fields(request, ShopOrderSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The cart is always needed to check who the order belongs to
+        order:ShopOrder = get_object_or_404(
+            # total_price is read from the total column
+            project(ShopOrder.objects.all(), fields, select_related=('cart',), prefetch_related=('lines',), required=('cart', 'total')),
+            pk=pk,
+        )
 
-        if order.cart.user != request.user and not request.user.is_staff:
+        if order.cart.user_id != request.user.pk and not request.user.is_staff:
             return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer: ShopOrderSerializer = ShopOrderSerializer(instance=order)
+        serializer: ShopOrderSerializer = ShopOrderSerializer(instance=order, fields=fields)
         return Response(serializer.data)
     
     def put(self,request:Request, pk:int)->Response:
 
-        order:ShopOrder = get_object_or_404(ShopOrder, pk=pk)
+        order:ShopOrder = get_object_or_404(ShopOrder.objects.select_related('cart'), pk=pk)
 
 
-        if order.cart.user != request.user and not request.user.is_staff:
+        if order.cart.user_id != request.user.pk and not request.user.is_staff:
             return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN)
 
-        order_status:OrderStatus = get_object_or_404(OrderStatus, name=request.data.get('status'))
+        order_status:OrderStatus = order_status_cache.get_or_404(name=request.data.get('status'))
 
         request.data.setdefault('cart',order.cart.pk)
         serializer: ShopOrderSerializer = ShopOrderSerializer(instance=order, data=request.data)
@@ -230,21 +325,28 @@ class OrderDetailView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer.save(status=order_status)
-        if order.status.name == 'Cancelled':
-            order.delete()
+        if order_status.name == 'Cancelled':
+            # A cancelled order gives its stock back and is deleted
+            try:
+                cancel_order(order)
+            except StockLockedError as error:
+                return Response( {"error": str(error)}, status=status.HTTP_409_CONFLICT)
             return Response({'message':'Order cancelled successfully.'}, status.HTTP_200_OK)
+        serializer.save(status=order_status)
 
         return Response(serializer.data, status.HTTP_200_OK)
 
 
     def delete(self,request:Request, pk:int) -> Response:
-        order : ShopOrder = get_object_or_404(ShopOrder, pk=pk)
+        order : ShopOrder = get_object_or_404(ShopOrder.objects.select_related('cart'), pk=pk)
 
-        if order.cart.user != request.user and not request.user.is_staff:
+        if order.cart.user_id != request.user.pk and not request.user.is_staff:
             return Response( {"error": "You do not have permission to perform this action."}, status=status.HTTP_403_FORBIDDEN)
 
-        order.delete()
+        try:
+            cancel_order(order)
+        except StockLockedError as error:
+            return Response( {"error": str(error)}, status=status.HTTP_409_CONFLICT)
 
         return Response({'message':'Order cancelled successfully.'}, status=status.HTTP_200_OK)
 
@@ -6,6 +6,7 @@ from rest_framework.serializers import ModelSerializer
 from rest_framework.authtoken.models import Token
 
 
+from ecomerce_project.fieldsets import DynamicFieldsMixin
 from users.models import User, Address
 
 
@@ -19,7 +20,7 @@ class AddressSerializer(ModelSerializer):
         fields = "__all__"
 
 
-class UserSerializer(ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, ModelSerializer):
     """Serializer for each users"""
 
     address: AddressSerializer = AddressSerializer(required=False)
@@ -39,3 +40,4 @@ class UserSerializer(ModelSerializer):
 
         model = User
         fields = "__all__"
+        extra_kwargs = {"password": {"write_only": True}}
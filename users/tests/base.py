@@ -2,6 +2,7 @@
 
 from typing import override, Any
 
+from django.contrib.auth.hashers import make_password
 from django.urls import reverse
 
 from rest_framework.test import APITestCase
@@ -89,14 +90,15 @@ class BaseTest(APITestCase):
         """
         Create many users base on the quantity
         """
-        user: User
-        for i in range(1, quantity + 1):
-            user = User.objects.create_user(
-                username=USERNAME + str(i),
-                email=str(i) + EMAIL,
-                password=PASSWORD,
-            )
-            Token.objects.get_or_create(user=user)
+        # Hashing the password is slow, all the users share the same hash
+        password: str = make_password(PASSWORD)
+        users: list[User] = User.objects.bulk_create(
+            User(username=USERNAME + str(i), email=str(i) + EMAIL, password=password)
+            for i in range(1, quantity + 1)
+        )
+        Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user=user) for user in users
+        )
 
     def create_address(self, quantity: int) -> None:
         """
@@ -106,12 +108,15 @@ class BaseTest(APITestCase):
         and so on until the quantity is reached
         """
 
-        for i in range(1, quantity + 1):
-            Address.objects.create(
+        users: dict[int, User] = User.objects.in_bulk(range(1, quantity + 1))
+        Address.objects.bulk_create(
+            Address(
                 street="teststreet" + str(i),
                 city="testcity" + str(i),
                 state="CA",
                 zip_code="l5859",
                 number="testnumber" + str(i),
-                user=User.objects.get(pk=i),
+                user=users[i],
             )
+            for i in range(1, quantity + 1)
+        )
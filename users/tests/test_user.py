@@ -204,6 +204,44 @@ class UserGetTest(BaseTest):
         self.assertEqual(response.data.get("username"), "testuser3")
         self.assertEqual(response.data.get("email"), "3test@test.com")
 
+    def test_get_user_without_password(self) -> None:
+        """Test that the password hash is never sent"""
+        self.create_users(1)
+        self.client.login(username="testuser1", password="testpassword")
+
+        response: Response = self.client.get(self.user_detail_url(1))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("password", response.data)
+
+    def test_get_users_with_fields(self) -> None:
+        """Test that fields=... returns only the given fields"""
+        self.create_users(3)
+        self.create_user_admin(
+            {
+                "username": "admin",
+                "email": "admin@admin.com",
+                "password": "adminpassword",
+            }
+        )
+        self.client.login(username="admin", password="adminpassword")
+
+        response: Response = self.client.get(
+            self.user_list_url, {"fields": "id,username"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn({"id": 1, "username": "testuser1"}, response.data)
+
+        response = self.client.get(self.user_detail_url(2), {"fields": "email,address"})
+
+        self.assertEqual(response.data, {"email": "2test@test.com", "address": None})
+
+        response = self.client.get(self.user_list_url, {"fields": "id,password"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data.get("error"), "Unknown fields: password.")
+
 
 class UserDeleteTest(BaseTest):
     """Test for the user delete view"""
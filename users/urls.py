@@ -19,3 +19,13 @@ urlpatterns: list[URLPattern | URLResolver] = [
     path("address/", AddressListView.as_view(), name="address-list"),
     path("address/<int:pk>/", AddressDetailView.as_view(), name="address-detail"),
 ]
+
+# Maximum number of queries of a request to each url, authentication included
+query_budgets: dict[str, int] = {
+    "user-list": 5,
+    "user-detail": 10,
+    "signup": 8,
+    "login": 2,
+    "address-list": 3,
+    "address-detail": 5,
+}
@@ -13,6 +13,8 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.authtoken.models import Token
 
+from ecomerce_project.fieldsets import project, requested_fields
+from ecomerce_project.row_mappers import RowMapper, get_row_mapper
 from users.models import User, Address
 from users.serializers import UserSerializer, AddressSerializer
 
@@ -47,12 +49,10 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        serializer: UserSerializer = UserSerializer(instance=request.data)
-
         user: User | AbstractBaseUser | None = authenticate(
-            username=serializer.data.get("username"),
-            password=serializer.data.get("password"),
-            email=serializer.data.get("email"),
+            username=request.data.get("username"),
+            password=request.data.get("password"),
+            email=request.data.get("email"),
         )
 
         if user is None:
@@ -67,7 +67,9 @@ class LoginView(APIView):
                 status=status.HTTP_200_OK,
             )
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED
+        )
 
 
 class UserListView(APIView):
@@ -75,10 +77,20 @@ class UserListView(APIView):
 
     permission_classes = [IsAdminUser]
 
-    def get(self, _request: Request) -> Response:
-        """Get all users."""
-        users: Iterable = User.objects.all()
-        serializer: UserSerializer = UserSerializer(users, many=True)
+    def get(self, request: Request) -> Response:
+        """Get all users, only their fields=... if given."""
+        try:
+            fields: list[str] | None = requested_fields(request, UserSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        users: Iterable = project(
+            User.objects.all(),
+            fields,
+            select_related=("address",),
+            prefetch_related=("groups", "user_permissions"),
+        )
+        serializer: UserSerializer = UserSerializer(users, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -88,8 +100,21 @@ class UserDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request: Request, pk: int) -> Response:
-        """Get a user."""
-        user: User = get_object_or_404(User, pk=pk)
+        """Get a user, only their fields=... if given."""
+        try:
+            fields: list[str] | None = requested_fields(request, UserSerializer)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        user: User = get_object_or_404(
+            project(
+                User.objects.all(),
+                fields,
+                select_related=("address",),
+                prefetch_related=("groups", "user_permissions"),
+            ),
+            pk=pk,
+        )
 
         if isinstance(request.user, User) and (
             request.user.pk != pk and not request.user.is_staff
@@ -98,7 +123,7 @@ class UserDetailView(APIView):
                 {"error": PERMISSION_ERROR}, status=status.HTTP_403_FORBIDDEN
             )
 
-        serializer: UserSerializer = UserSerializer(user)
+        serializer: UserSerializer = UserSerializer(user, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request: Request, pk: int) -> Response:
@@ -141,9 +166,9 @@ class AddressListView(APIView):
                 {"error": PERMISSION_ERROR},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        addresses: Iterable = Address.objects.all()
-        serializer: AddressSerializer = AddressSerializer(addresses, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        mapper: RowMapper = get_row_mapper(AddressSerializer)
+        addresses: Iterable = mapper.rows(Address.objects.all())
+        return Response(mapper.map(addresses), status=status.HTTP_200_OK)
 
     def post(self, request: Request) -> Response:
         """Create a new address."""